@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -90,6 +93,25 @@ DATABASES = {
     }
 }
 
+# Read replicas for get-table-data and aggregate queries: comma-separated host[:port][/name]
+# entries that share the default credentials, e.g. "replica1,replica2:5433", or
+# "localhost:5432/csv_demo_copy" to try the routing against a second database on one server.
+# Under test they mirror the test database; leave this unset to run the test suite, whose
+# TestCase data is not visible to other connections.
+CSV_INGEST_READ_REPLICAS = []
+for _i, _entry in enumerate(e.strip() for e in os.getenv("DB_READ_REPLICAS", "").split(",") if e.strip()):
+    _replica = urlsplit("//" + _entry)
+    DATABASES[f"replica_{_i + 1}"] = {
+        **DATABASES["default"],
+        "HOST": _replica.hostname,
+        "PORT": str(_replica.port or DATABASES["default"]["PORT"] or ""),
+        "NAME": _replica.path.lstrip("/") or DATABASES["default"]["NAME"],
+        "TEST": {"MIRROR": "default"},
+    }
+    CSV_INGEST_READ_REPLICAS.append(f"replica_{_i + 1}")
+
+DATABASE_ROUTERS = ["ingest.utils.replicas.ReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -134,8 +156,87 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     "DEFAULT_PARSER_CLASSES": ["rest_framework.parsers.MultiPartParser",
                                "rest_framework.parsers.FormParser"],
+    # ?format= is a get-table-data parameter (records/columnar), not a renderer override
+    "URL_FORMAT_OVERRIDE": None,
 }
 
+# Uploads up to this size stay in memory; larger ones are spooled to a temp file
+# by SpoolingUploadHandler and read back through mmap.
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("FILE_UPLOAD_MAX_MEMORY_SIZE", 2_621_440))
+CSV_INGEST_SPOOL_THRESHOLD = int(os.getenv("CSV_INGEST_SPOOL_THRESHOLD", FILE_UPLOAD_MAX_MEMORY_SIZE))
+
+FILE_UPLOAD_HANDLERS = [
+    "ingest.upload_handlers.SpoolingUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+# Non-strict uploads: rejected rows are spooled here and served by the quarantine endpoint
+CSV_INGEST_QUARANTINE_DIR = os.getenv(
+    "CSV_INGEST_QUARANTINE_DIR", os.path.join(tempfile.gettempdir(), "csv_ingest_quarantine")
+)
+CSV_INGEST_QUARANTINE_TTL = int(os.getenv("CSV_INGEST_QUARANTINE_TTL", 24 * 3600))
+# Bounds on the error details returned in the upload response
+CSV_INGEST_MAX_ERROR_MESSAGES = int(os.getenv("CSV_INGEST_MAX_ERROR_MESSAGES", 100))
+CSV_INGEST_ERROR_EXAMPLES = int(os.getenv("CSV_INGEST_ERROR_EXAMPLES", 5))
+
+# Seconds a process trusts its cached copy of the IngestTable registry
+CSV_INGEST_REGISTRY_TTL = float(os.getenv("CSV_INGEST_REGISTRY_TTL", 30))
+
+# Load the registry and table schemas when a gunicorn worker starts, before it serves
+CSV_INGEST_WARMUP = os.getenv("CSV_INGEST_WARMUP", "true").lower() == "true"
+
+# infer_schema uploads may create new tables, so the feature is opt-in
+CSV_INGEST_INFER_SCHEMA = os.getenv("CSV_INGEST_INFER_SCHEMA", "False").lower() == "true"
+CSV_INGEST_INFER_SAMPLE_ROWS = int(os.getenv("CSV_INGEST_INFER_SAMPLE_ROWS", 1000))
+
+# Aggregate results are cached per table and dropped when the table is loaded again;
+# the TTL bounds staleness for other processes when the cache is not shared.
+CSV_INGEST_RESULT_CACHE_TTL = int(os.getenv("CSV_INGEST_RESULT_CACHE_TTL", 300))
+CSV_INGEST_AGGREGATE_MAX_GROUPS = int(os.getenv("CSV_INGEST_AGGREGATE_MAX_GROUPS", 10000))
+
+# Keys per `key_hash = ANY(...)` lookup against the delta upload hash index
+CSV_INGEST_DELTA_PROBE_BATCH = int(os.getenv("CSV_INGEST_DELTA_PROBE_BATCH", 10_000))
+
+# Non-strict uploads COPY in chunks of this many rows under savepoints, so rows the database
+# rejects are isolated and reported instead of aborting the load
+CSV_INGEST_COPY_BATCH_ROWS = int(os.getenv("CSV_INGEST_COPY_BATCH_ROWS", 50_000))
+
+# Seconds between progress events of uploads sent with stream=true
+CSV_INGEST_PROGRESS_INTERVAL = float(os.getenv("CSV_INGEST_PROGRESS_INTERVAL", 1))
+
+# Replicas more than this many seconds behind the primary get no reads; lag is measured at
+# most every CSV_INGEST_REPLICA_LAG_CHECK seconds per replica and process
+CSV_INGEST_REPLICA_MAX_LAG = float(os.getenv("CSV_INGEST_REPLICA_MAX_LAG", 10))
+CSV_INGEST_REPLICA_LAG_CHECK = float(os.getenv("CSV_INGEST_REPLICA_LAG_CHECK", 5))
+# After an upload, the same client reads from the primary for this many seconds (0 to disable)
+CSV_INGEST_READ_YOUR_WRITES = float(os.getenv("CSV_INGEST_READ_YOUR_WRITES", 10))
+
+# Reference checks: parents estimated at up to this many rows are read into a set once per
+# upload; larger ones are probed for the distinct keys of every batch of this many rows
+CSV_INGEST_REFERENCE_SET_MAX_ROWS = int(os.getenv("CSV_INGEST_REFERENCE_SET_MAX_ROWS", 1_000_000))
+CSV_INGEST_REFERENCE_PROBE_BATCH = int(os.getenv("CSV_INGEST_REFERENCE_PROBE_BATCH", 10_000))
+
+# Upload admission control. The capacity is per process: each upload takes one slot per
+# CSV_INGEST_ADMISSION_SLOT_BYTES of file, capped at the capacity; with gthread workers
+# the threads beyond the capacity stay free for reads. Table parallelism limits are shared
+# by all processes through Postgres advisory locks.
+CSV_INGEST_ADMISSION_CAPACITY = int(os.getenv("CSV_INGEST_ADMISSION_CAPACITY", 4))
+CSV_INGEST_ADMISSION_SLOT_BYTES = int(os.getenv("CSV_INGEST_ADMISSION_SLOT_BYTES", 256 * 1024 * 1024))
+CSV_INGEST_ADMISSION_QUEUE = int(os.getenv("CSV_INGEST_ADMISSION_QUEUE", 16))
+CSV_INGEST_ADMISSION_TIMEOUT = float(os.getenv("CSV_INGEST_ADMISSION_TIMEOUT", 30))
+
+# Uploads into RANGE-partitioned tables are COPYed straight into the leaf partitions;
+# missing date/timestamp partitions are created per CSV_INGEST_PARTITION_INTERVAL (day, month or year)
+CSV_INGEST_PARTITION_ROUTING = os.getenv("CSV_INGEST_PARTITION_ROUTING", "True").lower() == "true"
+CSV_INGEST_CREATE_PARTITIONS = os.getenv("CSV_INGEST_CREATE_PARTITIONS", "True").lower() == "true"
+CSV_INGEST_PARTITION_INTERVAL = os.getenv("CSV_INGEST_PARTITION_INTERVAL", "month")
+if CSV_INGEST_PARTITION_INTERVAL not in ("day", "month", "year"):
+    raise ImproperlyConfigured("CSV_INGEST_PARTITION_INTERVAL must be day, month or year")
+
+# Largest `limit` get-table-data accepts
+CSV_INGEST_MAX_PAGE_SIZE = int(os.getenv("CSV_INGEST_MAX_PAGE_SIZE", 100_000))
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
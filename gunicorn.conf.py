@@ -0,0 +1,26 @@
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 2))
+# Threaded workers: uploads are limited by the admission controller
+# (CSV_INGEST_ADMISSION_CAPACITY), so the remaining threads keep serving reads.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 300))
+
+# Import Django, DRF and the views once in the master; workers fork with them loaded.
+# Nothing touches the database at import time, so no connection is shared across the fork.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+
+def post_worker_init(worker):
+    # Load the registry and table schemas before the worker accepts requests
+    from django.conf import settings
+
+    if settings.CSV_INGEST_WARMUP:
+        from ingest.utils.warmup import warm_up
+
+        try:
+            warm_up()
+        except Exception:
+            worker.log.exception("Warm-up failed; schemas will load on first use")
@@ -1,3 +1,27 @@
 from django.contrib import admin
 
-# Register your models here.
+from ingest.models import IngestTable, SummaryView, UploadLedger
+
+
+@admin.register(IngestTable)
+class IngestTableAdmin(admin.ModelAdmin):
+    list_display = ("name", "enabled", "load_mode", "conflict_key", "max_upload_bytes", "parallelism", "updated_at")
+    list_filter = ("enabled", "load_mode")
+    search_fields = ("name",)
+
+
+@admin.register(SummaryView)
+class SummaryViewAdmin(admin.ModelAdmin):
+    list_display = ("name", "table_name", "enabled", "unique_key", "refreshed_at")
+    list_filter = ("enabled", "table_name")
+    search_fields = ("name", "table_name")
+    readonly_fields = ("version", "refreshed_version", "refreshed_at")
+
+
+@admin.register(UploadLedger)
+class UploadLedgerAdmin(admin.ModelAdmin):
+    # Delete an entry to let the same file be loaded again without force=true
+    list_display = ("table_name", "checksum", "row_count", "size", "created_at")
+    list_filter = ("table_name",)
+    search_fields = ("checksum",)
+    readonly_fields = ("table_name", "checksum", "size", "row_count", "response", "created_at")
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class IngestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ingest'
+
+    def ready(self):
+        from ingest.models import IngestTable, SummaryView
+        from ingest.utils.table_registry import table_changed
+
+        post_save.connect(table_changed, sender=IngestTable, dispatch_uid="ingest_table_saved")
+        post_delete.connect(table_changed, sender=IngestTable, dispatch_uid="ingest_table_deleted")
+        post_save.connect(table_changed, sender=SummaryView, dispatch_uid="ingest_summary_saved")
+        post_delete.connect(table_changed, sender=SummaryView, dispatch_uid="ingest_summary_deleted")
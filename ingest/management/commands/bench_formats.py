@@ -0,0 +1,117 @@
+import io
+import json
+import platform
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+
+from ingest import renderers
+from ingest.utils.bench import check_bench_database, format_table, measure
+from ingest.utils.csv_validator import validate_csv
+from ingest.utils.db_insert import bulk_copy_into
+from ingest.utils.db_schema import get_table_schema, insertable_columns
+from ingest.utils.synthetic_csv import column_spec, create_table_sql, write_csv
+
+BENCH_TABLE = "bench_ingest"
+
+
+def available_formats():
+    """
+    [(name, renderer class, columnar), ...] for every format whose library is installed.
+    DRF's JSONRenderer is the baseline.
+    """
+    formats = [("drf_json", JSONRenderer, False)]
+    if renderers.orjson is not None:
+        formats += [("orjson", renderers.ORJSONRenderer, False), ("orjson_columnar", renderers.ORJSONRenderer, True)]
+    if renderers.msgpack is not None:
+        formats.append(("msgpack", renderers.MessagePackRenderer, False))
+    if renderers.pyarrow is not None:
+        formats += [("arrow", renderers.ArrowRenderer, True), ("parquet", renderers.ParquetRenderer, True)]
+    return formats
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark get-table-data response formats: serialization time and payload size per "
+        "renderer for pages fetched from a generated table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-sizes", default="1000,10000,100000")
+        parser.add_argument("--width", type=int, default=6, help="number of data columns")
+        parser.add_argument(
+            "--types", default="int,numeric,bool,timestamptz,jsonb,text",
+            help="comma separated column kinds, cycled across --width columns",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--rounds", type=int, default=3)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--output", help="write results as JSON to this path")
+        parser.add_argument("--keep", action="store_true", help="keep the benchmark table")
+        parser.add_argument(
+            "--database", metavar="NAME",
+            help="name of the configured database, required to run with DEBUG off",
+        )
+
+    def handle(self, *args, **opts):
+        check_bench_database(opts["database"])
+        try:
+            sizes = [int(s) for s in opts["page_sizes"].split(",") if s]
+            columns = column_spec(opts["width"], opts["types"].split(","))
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not sizes:
+            raise CommandError("--page-sizes needs at least one size")
+
+        buf = io.StringIO()
+        write_csv(buf, columns, max(sizes), seed=opts["seed"])
+        with connection.cursor() as cur:
+            cur.execute(create_table_sql(BENCH_TABLE, columns))
+
+        formats = available_formats()
+        results = {}
+        sizes_out = {}
+        try:
+            schema = get_table_schema(BENCH_TABLE)
+            rows, _ = validate_csv(File(io.BytesIO(buf.getvalue().encode())), schema, strict=True)
+            bulk_copy_into(BENCH_TABLE, rows, insertable_columns(schema))
+            del rows, buf
+
+            for n in sizes:
+                with connection.cursor() as cur:
+                    cur.execute(f"SELECT * FROM public.{BENCH_TABLE} ORDER BY id LIMIT %s", [n])
+                    names = [c[0] for c in cur.description]
+                    tuples = cur.fetchall()
+                records = {"results": [dict(zip(names, row)) for row in tuples]}
+                columnar = {"columns": names, "rows": tuples}
+
+                for name, renderer_class, is_columnar in formats:
+                    renderer = renderer_class()
+                    body = columnar if is_columnar else records
+                    key = f"{name}@{n}"
+                    results[key], payload = measure(lambda: renderer.render(body), opts["rounds"], opts["warmup"])
+                    results[key]["rows_per_sec"] = n / results[key]["mean"] if results[key]["mean"] else 0.0
+                    sizes_out[key] = len(payload)
+        finally:
+            if not opts["keep"]:
+                with connection.cursor() as cur:
+                    cur.execute(f"DROP TABLE IF EXISTS public.{BENCH_TABLE}")
+
+        self.stdout.write(format_table(results, title="render"))
+        for key, stats in results.items():
+            self.stdout.write(f"{key:<28}{sizes_out[key] / 1e6:>10.2f} MB{stats['rows_per_sec']:>14,.0f} rows/s")
+        missing = {"orjson", "msgpack", "arrow"} - {name for name, _, _ in formats}
+        if missing:
+            self.stdout.write(f"Skipped (library not installed): {', '.join(sorted(missing))}")
+
+        if opts["output"]:
+            report = {
+                "python": platform.python_version(),
+                "params": {"page_sizes": sizes, "columns": [kind for _, kind in columns], "seed": opts["seed"]},
+                "results": {k: {**v, "bytes": sizes_out[k]} for k, v in results.items()},
+            }
+            with open(opts["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Results written to {opts['output']}")
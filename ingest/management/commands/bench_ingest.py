@@ -0,0 +1,219 @@
+import cProfile
+import json
+import os
+import platform
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from ingest.models import IngestTable, UploadLedger
+from ingest.utils.bench import check_bench_database, format_table, measure
+from ingest.utils.csv_validator import validate_csv
+from ingest.utils.db_insert import bulk_copy_into
+from ingest.utils.db_schema import get_table_schema, insertable_columns
+from ingest.utils.synthetic_csv import column_spec, create_table_sql, write_csv
+
+BENCH_TABLE = "bench_ingest"
+STAGES = ("validate", "copy", "end_to_end")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark CSV ingestion on a generated dataset: validation, COPY and the full "
+        "upload-csv request are timed separately and the results can be written to JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--width", type=int, default=6, help="number of data columns")
+        parser.add_argument(
+            "--types", default="int,numeric,bool,timestamptz,jsonb,text",
+            help="comma separated column kinds, cycled across --width columns",
+        )
+        parser.add_argument("--null-ratio", type=float, default=0.0)
+        parser.add_argument("--error-ratio", type=float, default=0.0)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--rounds", type=int, default=3)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--stages", default=",".join(STAGES))
+        parser.add_argument("--output", help="write results as JSON to this path")
+        parser.add_argument("--compare", help="previous JSON results to compare throughput against")
+        parser.add_argument(
+            "--flamegraph", metavar="DIR",
+            help="capture one profile per stage (py-spy SVG when available, cProfile .prof otherwise)",
+        )
+        parser.add_argument("--keep", action="store_true", help="keep the benchmark table and CSV")
+        parser.add_argument(
+            "--database", metavar="NAME",
+            help="name of the configured database, required to run with DEBUG off",
+        )
+
+    def handle(self, *args, **opts):
+        check_bench_database(opts["database"])
+        stages = [s for s in opts["stages"].split(",") if s]
+        unknown = [s for s in stages if s not in STAGES]
+        if unknown:
+            raise CommandError(f"Unknown stages {unknown}; choose from {list(STAGES)}")
+        try:
+            columns = column_spec(opts["width"], opts["types"].split(","))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        fd, csv_path = tempfile.mkstemp(prefix="bench_ingest_", suffix=".csv")
+        with os.fdopen(fd, "w", newline="") as fh:
+            bad_rows = write_csv(
+                fh, columns, opts["rows"],
+                null_ratio=opts["null_ratio"], error_ratio=opts["error_ratio"], seed=opts["seed"],
+            )
+        file_size = os.path.getsize(csv_path)
+        self.stdout.write(f"Generated {opts['rows']} rows x {len(columns)} cols ({file_size / 1e6:.1f} MB) at {csv_path}")
+
+        with connection.cursor() as cur:
+            cur.execute(create_table_sql(BENCH_TABLE, columns))
+        # upload-csv only takes registered tables; registered for the run, not seeded
+        _, registered = IngestTable.objects.get_or_create(name=BENCH_TABLE)
+
+        # Error rows are only allowed through in non-strict mode
+        strict = bad_rows == 0
+        results = {}
+        try:
+            schema = get_table_schema(BENCH_TABLE)
+            cols = insertable_columns(schema)
+
+            def run_validate():
+                with open(csv_path, "rb") as fh:
+                    return validate_csv(File(fh), schema, strict=strict)
+
+            def truncate():
+                with connection.cursor() as cur:
+                    cur.execute(f"TRUNCATE public.{BENCH_TABLE}")
+
+            if "validate" in stages:
+                with self._capture(opts["flamegraph"], "validate"):
+                    results["validate"], _ = measure(run_validate, opts["rounds"], opts["warmup"])
+
+            if "copy" in stages:
+                rows, _ = run_validate()
+                with self._capture(opts["flamegraph"], "copy"):
+                    results["copy"], _ = measure(
+                        lambda: bulk_copy_into(BENCH_TABLE, rows, cols),
+                        opts["rounds"], opts["warmup"], setup=truncate,
+                    )
+                del rows
+
+            if "end_to_end" in stages:
+                client = Client()
+                url = reverse("upload-csv")
+
+                def post():
+                    with open(csv_path, "rb") as fh:
+                        # force: every round uploads the same file
+                        resp = client.post(
+                            url, {"table_name": BENCH_TABLE, "strict": strict, "force": True, "file": fh}
+                        )
+                    if resp.status_code != 201:
+                        raise CommandError(f"upload-csv returned {resp.status_code}: {resp.content[:500]!r}")
+                    return resp
+
+                with self._capture(opts["flamegraph"], "end_to_end"):
+                    results["end_to_end"], _ = measure(post, opts["rounds"], opts["warmup"], setup=truncate)
+        finally:
+            if not opts["keep"]:
+                with connection.cursor() as cur:
+                    cur.execute(f"DROP TABLE IF EXISTS public.{BENCH_TABLE}")
+                # the end_to_end rounds go through the upload ledger
+                UploadLedger.objects.filter(table_name=BENCH_TABLE).delete()
+                if registered:
+                    IngestTable.objects.filter(name=BENCH_TABLE).delete()
+                os.unlink(csv_path)
+
+        for stats in results.values():
+            stats["rows_per_sec"] = opts["rows"] / stats["mean"] if stats["mean"] else 0.0
+
+        self.stdout.write(format_table(results, title=f"ingest {opts['rows']} rows"))
+        for name, stats in results.items():
+            self.stdout.write(f"{name:<28}{stats['rows_per_sec']:>14,.0f} rows/s")
+
+        report = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": self._git_commit(),
+            "python": platform.python_version(),
+            "params": {
+                "rows": opts["rows"],
+                "columns": [kind for _, kind in columns],
+                "null_ratio": opts["null_ratio"],
+                "error_ratio": opts["error_ratio"],
+                "invalid_rows": bad_rows,
+                "seed": opts["seed"],
+                "file_bytes": file_size,
+            },
+            "results": results,
+        }
+        if opts["compare"]:
+            self._compare(opts["compare"], results)
+        if opts["output"]:
+            with open(opts["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Results written to {opts['output']}")
+
+    def _compare(self, path, results):
+        # Throughput rather than wall time so runs with different --rows stay comparable
+        with open(path) as fh:
+            previous = json.load(fh).get("results", {})
+        for name, stats in results.items():
+            if name not in previous:
+                continue
+            before = previous[name]["rows_per_sec"]
+            change = (stats["rows_per_sec"] - before) / before * 100 if before else 0.0
+            self.stdout.write(
+                f"{name:<28}{before:>12,.0f} -> {stats['rows_per_sec']:>12,.0f} rows/s ({change:+.1f}%)"
+            )
+
+    @contextmanager
+    def _capture(self, directory, stage):
+        if not directory:
+            yield
+            return
+        os.makedirs(directory, exist_ok=True)
+        py_spy = shutil.which("py-spy")
+        if py_spy:
+            out = os.path.join(directory, f"{stage}.svg")
+            proc = subprocess.Popen(
+                [py_spy, "record", "--pid", str(os.getpid()), "--output", out, "--format", "flamegraph"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            time.sleep(0.5)  # give py-spy time to attach
+            try:
+                yield
+            finally:
+                proc.send_signal(signal.SIGINT)
+                proc.wait()
+        else:
+            out = os.path.join(directory, f"{stage}.prof")
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                profiler.dump_stats(out)
+        self.stdout.write(f"Profile for {stage} written to {out}")
+
+    @staticmethod
+    def _git_commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,119 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ingest.utils.bench import format_table, summarize
+
+# Runs in a fresh interpreter per round; prints one JSON object of timings (seconds)
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+imported = time.perf_counter()
+
+from ingest.utils.table_registry import registry
+from ingest.utils.warmup import warm_up
+if sys.argv[1] == "warm":
+    warm_up()
+warmed = time.perf_counter()
+
+# What the first upload to each table pays: registry load and catalog lookups
+for name in registry.relations():
+    registry.schema(name)
+first = time.perf_counter()
+
+# The same lookups through an empty registry: after warm_up the ones above only hit its cache
+from ingest.utils.table_registry import TableRegistry
+uncached = TableRegistry()
+for name in uncached.relations():
+    uncached.schema(name)
+done = time.perf_counter()
+print(json.dumps({
+    "import": imported - start, "warm_up": warmed - imported,
+    "first_lookups": first - warmed, "uncached_lookups": done - first,
+}))
+"""
+
+
+def import_profile(env, top: int):
+    """
+    Self time of `python -X importtime` per top-level package, largest first: [(package, seconds)].
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, "cold"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    totals = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(self_us) / 1e6
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark worker start-up: import time of the app, warm_up() and the first schema "
+        "lookups, each in a fresh interpreter, cold and warmed, against the same lookups "
+        "through an empty registry; plus an import-time profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument("--top", type=int, default=10, help="packages to show in the import profile")
+        parser.add_argument("--output", help="write results as JSON to this path")
+
+    def handle(self, *args, **opts):
+        if opts["rounds"] < 1:
+            raise CommandError("--rounds must be at least 1")
+        # Children read the same settings and database as this process (the test database under tests)
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "csv_ingest.settings"),
+            "DB_NAME": connection.settings_dict["NAME"],
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(settings.BASE_DIR), os.environ.get("PYTHONPATH")])),
+        }
+
+        samples = {}
+        for mode in ("cold", "warm"):
+            for _ in range(opts["rounds"]):
+                proc = subprocess.run(
+                    [sys.executable, "-c", CHILD, mode], env=env, capture_output=True, text=True,
+                )
+                if proc.returncode:
+                    raise CommandError(f"Start-up child failed:\n{proc.stderr}")
+                for stage, seconds in json.loads(proc.stdout.splitlines()[-1]).items():
+                    if mode == "cold" and stage == "warm_up":
+                        continue
+                    key = f"{stage}_{mode}" if stage == "first_lookups" else stage
+                    samples.setdefault(key, []).append(seconds)
+        results = {key: summarize(values) for key, values in samples.items()}
+
+        profile = import_profile(env, opts["top"])
+
+        self.stdout.write(format_table(results, title="startup"))
+        self.stdout.write("-- import self time by package --")
+        for package, seconds in profile:
+            self.stdout.write(f"{package:<28}{seconds * 1000:>10.2f} ms")
+
+        if opts["output"]:
+            report = {
+                "python": platform.python_version(),
+                "params": {"rounds": opts["rounds"]},
+                "results": results,
+                "import_profile": dict(profile),
+            }
+            with open(opts["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Results written to {opts['output']}")
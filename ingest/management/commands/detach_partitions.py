@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ingest.utils.partitions import detach_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Detach the partitions of a range-partitioned table whose whole range ends on or before "
+        "--before, optionally dropping them. Detaching is a catalog change, not a delete."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("table")
+        parser.add_argument("--before", required=True, help="date, timestamp or integer bound")
+        parser.add_argument("--concurrently", action="store_true",
+                            help="DETACH ... CONCURRENTLY (no default partition allowed)")
+        parser.add_argument("--drop", action="store_true", help="drop the detached partitions")
+
+    def handle(self, *args, **opts):
+        before = opts["before"]
+        try:
+            before = int(before)
+        except ValueError:
+            try:
+                before = datetime.fromisoformat(before)
+            except ValueError:
+                raise CommandError(f"--before must be an integer or an ISO date, got {before!r}")
+        try:
+            detached = detach_partitions(opts["table"], before, opts["concurrently"], opts["drop"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        action = "Dropped" if opts["drop"] else "Detached"
+        for name in detached:
+            self.stdout.write(f"{action} {name}")
+        if not detached:
+            self.stdout.write("No partitions end before the cutoff")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from ingest.utils.delta import forget_table
+
+
+class Command(BaseCommand):
+    help = (
+        "Clear the delta-upload hash index of a table (e.g. after truncating it) so the next "
+        "delta upload loads every row again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("tables", nargs="+")
+
+    def handle(self, *args, **opts):
+        for table in opts["tables"]:
+            forget_table(table)
+            self.stdout.write(f"Cleared row hashes for {table}")
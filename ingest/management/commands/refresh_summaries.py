@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from ingest.models import SummaryView
+from ingest.utils.summaries import refresh_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Build or refresh the materialized summaries of the given tables (all tables with "
+        "summaries by default), e.g. after adding a summary or if a post-load refresh failed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("tables", nargs="*")
+
+    def handle(self, *args, **opts):
+        tables = opts["tables"] or sorted(
+            set(SummaryView.objects.filter(enabled=True).values_list("table_name", flat=True))
+        )
+        for table in tables:
+            refresh_summaries(table)
+            states = SummaryView.objects.filter(table_name=table, enabled=True).values_list(
+                "name", "refreshed_version", "version"
+            )
+            for name, refreshed, version in states:
+                state = "refreshed" if refreshed == version else "FAILED (see log)"
+                self.stdout.write(f"{table}: {name} {state}")
@@ -0,0 +1,61 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ingest.utils.replay import HTTPTransport, InProcessTransport, load_log, replay, summarize_replay
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a JSONL log of API calls (upload-csv, get-table-data, get-relations) in-process "
+        "or against a running server and report latency percentiles, throughput and errors per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("log", help="JSONL file, one request per line")
+        parser.add_argument(
+            "--base-url",
+            help="replay against a running server (e.g. http://localhost:8000/api/); in-process when omitted",
+        )
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument("--rate", type=float, default=0, help="requests per second, 0 = as fast as possible")
+        parser.add_argument("--repeat", type=int, default=1, help="replay the log this many times")
+        parser.add_argument("--output", help="write the report as JSON to this path")
+
+    def handle(self, *args, **opts):
+        try:
+            entries = load_log(opts["log"])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        if not entries:
+            raise CommandError("Replay log is empty")
+        entries = entries * max(1, opts["repeat"])
+
+        transport = HTTPTransport(opts["base_url"]) if opts["base_url"] else InProcessTransport()
+        samples, wall_time = replay(entries, transport, concurrency=opts["concurrency"], rate=opts["rate"])
+        report = summarize_replay(samples, wall_time)
+
+        header = f"{'Endpoint':<20}{'Reqs':>7}{'Err%':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for endpoint, r in sorted(report.items()):
+            self.stdout.write(
+                f"{endpoint:<20}{r['requests']:>7}{r['error_rate'] * 100:>8.1f}{r['p50_ms']:>10.1f}"
+                f"{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['throughput_rps']:>9.1f}"
+            )
+        self.stdout.write(f"{len(entries)} requests in {wall_time:.2f}s ({len(entries) / wall_time:.1f} req/s)")
+
+        if opts["output"]:
+            with open(opts["output"], "w") as fh:
+                json.dump(
+                    {
+                        "requests": len(entries),
+                        "concurrency": opts["concurrency"],
+                        "rate": opts["rate"],
+                        "wall_time": wall_time,
+                        "endpoints": report,
+                    },
+                    fh,
+                    indent=2,
+                )
+            self.stdout.write(f"Report written to {opts['output']}")
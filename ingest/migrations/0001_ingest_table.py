@@ -0,0 +1,30 @@
+# Generated by Django 5.0.3 on 2026-10-19 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestTable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=128, unique=True)),
+                ('enabled', models.BooleanField(default=True)),
+                ('max_upload_bytes', models.BigIntegerField(blank=True, null=True)),
+                ('load_mode', models.CharField(choices=[('append', 'append'), ('upsert', 'upsert')], default='append', max_length=16)),
+                ('conflict_key', models.CharField(blank=True, default='', max_length=256)),
+                ('parallelism', models.PositiveSmallIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.3 on 2026-10-19 18:59
+
+from django.db import migrations
+
+# The tables that used to be hard-coded in ingest.utils.constants.ALLOWED_TABLES
+INITIAL_TABLES = [
+    "products", "product_purchases", "products_query_test", "_t", "load_test_table",
+    "products_test", "notnull_test", "jsontest",
+]
+
+
+def seed(apps, schema_editor):
+    IngestTable = apps.get_model("ingest", "IngestTable")
+    for name in INITIAL_TABLES:
+        IngestTable.objects.get_or_create(name=name)
+
+
+def unseed(apps, schema_editor):
+    IngestTable = apps.get_model("ingest", "IngestTable")
+    IngestTable.objects.filter(name__in=INITIAL_TABLES).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0001_ingest_table'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed, unseed),
+    ]
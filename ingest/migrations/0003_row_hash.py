@@ -0,0 +1,26 @@
+# Generated by Django 5.0.3 on 2026-10-19 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0002_seed_ingest_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RowHash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.CharField(max_length=128)),
+                ('key_hash', models.BinaryField(max_length=16)),
+                ('row_hash', models.BinaryField(max_length=16)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='rowhash',
+            constraint=models.UniqueConstraint(fields=('table_name', 'key_hash'), name='ingest_rowhash_table_key'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.3 on 2026-10-19 19:07
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0003_row_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.CharField(max_length=128)),
+                ('checksum', models.CharField(max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('row_count', models.BigIntegerField()),
+                ('response', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='uploadledger',
+            constraint=models.UniqueConstraint(fields=('table_name', 'checksum'), name='ingest_uploadledger_table_checksum'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-19 19:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0004_upload_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingesttable',
+            name='json_schemas',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-19 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0005_ingest_table_json_schemas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingesttable',
+            name='transform',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
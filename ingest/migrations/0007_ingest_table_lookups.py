@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-19 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0006_ingest_table_transform'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingesttable',
+            name='lookups',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.3 on 2026-10-19 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0007_ingest_table_lookups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SummaryView',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=128, unique=True)),
+                ('table_name', models.CharField(max_length=128)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('fields', models.JSONField(blank=True, default=list)),
+                ('unique_key', models.CharField(blank=True, default='', max_length=256)),
+                ('enabled', models.BooleanField(default=True)),
+                ('version', models.BigIntegerField(default=0)),
+                ('refreshed_version', models.BigIntegerField(default=-1)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def unseed(apps, schema_editor):
+    # bench_ingest registers its table only for the duration of a run
+    IngestTable = apps.get_model("ingest", "IngestTable")
+    IngestTable.objects.filter(name="bench_ingest").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0008_summary_view'),
+    ]
+
+    operations = [
+        migrations.RunPython(unseed, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,102 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
-# Create your models here.
+from ingest.utils.constants import LOAD_APPEND, LOAD_MODES
+
+
+class IngestTable(models.Model):
+    """
+    A table clients may upload to and query, with its per-table load settings.
+    Read through ingest.utils.table_registry, which caches the enabled rows in memory.
+    """
+    name = models.CharField(max_length=128, unique=True)
+    enabled = models.BooleanField(default=True)
+    # Uploads larger than this are rejected with 413 (null = no limit)
+    max_upload_bytes = models.BigIntegerField(null=True, blank=True)
+    load_mode = models.CharField(max_length=16, choices=[(m, m) for m in LOAD_MODES], default=LOAD_APPEND)
+    # Comma separated column list used as the ON CONFLICT target in upsert mode
+    conflict_key = models.CharField(max_length=256, blank=True, default="")
+    # How many uploads may write to this table at the same time
+    parallelism = models.PositiveSmallIntegerField(default=1)
+    # {json column: JSON Schema} checked for every uploaded value (needs the jsonschema package)
+    json_schemas = models.JSONField(default=dict, blank=True)
+    # Row transform applied while validating uploads (see ingest.utils.transform.compile_transform)
+    transform = models.JSONField(default=dict, blank=True)
+    # {column: "table.column"} values must exist in, checked on upload without a foreign key
+    lookups = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return self.name
+
+
+class RowHash(models.Model):
+    """
+    Hash index for delta uploads: one entry per (table, row key) holding a digest of the
+    row as last loaded. Maintained by ingest.utils.delta; probed with key_hash = ANY(...).
+    """
+    table_name = models.CharField(max_length=128)
+    # 16-byte blake2b digests of the key columns (or of the whole row when the table has no key)
+    key_hash = models.BinaryField(max_length=16)
+    row_hash = models.BinaryField(max_length=16)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["table_name", "key_hash"], name="ingest_rowhash_table_key"),
+        ]
+
+
+class UploadLedger(models.Model):
+    """
+    One entry per file loaded through upload-csv, keyed by table and content checksum,
+    so a retried upload of the same file returns the original result instead of loading twice.
+    """
+    table_name = models.CharField(max_length=128)
+    # blake2b-256 hex digest of the uploaded bytes
+    checksum = models.CharField(max_length=64)
+    size = models.BigIntegerField()
+    row_count = models.BigIntegerField()
+    response = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["table_name", "checksum"], name="ingest_uploadledger_table_checksum"),
+        ]
+
+
+class SummaryView(models.Model):
+    """
+    A materialized view over part of an ingest table: the rows matching some get-table-data
+    filters, optionally only some columns. Refreshed after every load of the table and used
+    by get-table-data for the requests it covers; see ingest.utils.summaries.
+    """
+    name = models.CharField(max_length=128, unique=True)
+    table_name = models.CharField(max_length=128)
+    # get-table-data filters, e.g. {"status": "active", "price__gte": "10"}
+    filters = models.JSONField(default=dict, blank=True)
+    # Columns kept in the view (empty = all of them)
+    fields = models.JSONField(default=list, blank=True)
+    # Comma separated unique columns; with one the view is refreshed CONCURRENTLY, without
+    # blocking reads
+    unique_key = models.CharField(max_length=256, blank=True, default="")
+    enabled = models.BooleanField(default=True)
+    # Bumped after every load of the table; the view is only read while refreshed_version matches
+    version = models.BigIntegerField(default=0)
+    refreshed_version = models.BigIntegerField(default=-1)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        # A changed definition is not read until the view has been rebuilt from it
+        self.refreshed_version = -1
+        super().save(*args, **kwargs)
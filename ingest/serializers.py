@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from ingest.utils.constants import LOAD_MODES
+
 class CSVUploadSerializer(serializers.Serializer):
     table_name = serializers.CharField(max_length=128)
     file = serializers.FileField()
@@ -7,3 +9,36 @@ class CSVUploadSerializer(serializers.Serializer):
     # Optional: let clients pass a strict flag (fail-fast on first error)
     strict = serializers.BooleanField(required=False, default=True)
 
+    # append or upsert; defaults to the table's configured load mode
+    load_mode = serializers.ChoiceField(choices=LOAD_MODES, required=False)
+
+    # Validate only, no COPY. With `sample`, cast just the first N rows plus a
+    # reservoir sample of N more and project the results onto the whole file.
+    dry_run = serializers.BooleanField(required=False, default=False)
+    sample = serializers.IntegerField(required=False, min_value=1, max_value=1_000_000)
+
+    # Override encoding / dialect detection (e.g. encoding=latin-1, delimiter=";")
+    encoding = serializers.CharField(required=False, max_length=32)
+    delimiter = serializers.CharField(required=False, min_length=1, max_length=1, trim_whitespace=False)
+    quotechar = serializers.CharField(required=False, min_length=1, max_length=1, trim_whitespace=False)
+
+    # Load only rows that are new or changed since earlier delta uploads (by content hash)
+    delta = serializers.BooleanField(required=False, default=False)
+
+    # Check foreign keys against the referenced tables while validating, so violations are
+    # reported per row instead of failing the COPY (registry lookups are always checked)
+    check_references = serializers.BooleanField(required=False, default=False)
+
+    # Load even if this exact file was already loaded into the table (see UploadLedger)
+    force = serializers.BooleanField(required=False, default=False)
+
+    # Create the table from types inferred from the CSV when it does not exist yet
+    infer_schema = serializers.BooleanField(required=False, default=False)
+
+    # Answer with a text/event-stream of progress events, then the result, instead of one JSON body
+    stream = serializers.BooleanField(required=False, default=False)
+
+
+class CSVBatchUploadSerializer(serializers.Serializer):
+    # Files are sent as one multipart part per table, named after the table
+    strict = serializers.BooleanField(required=False, default=True)
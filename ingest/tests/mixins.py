@@ -0,0 +1,23 @@
+import io
+
+from django.urls import reverse
+
+
+class UploadMixin:
+    """
+    upload() for API test cases: POSTs `content` to upload-csv as the file for `table`
+    (upload_table by default), with upload_defaults and `extra` as the other form fields.
+    """
+
+    upload_table = None
+    upload_defaults = {}
+
+    def upload(self, content, table=None, **extra):
+        return self.client.post(
+            reverse("upload-csv"),
+            data={
+                "table_name": table or self.upload_table, "file": io.BytesIO(content),
+                **self.upload_defaults, **extra,
+            },
+            format="multipart",
+        )
@@ -0,0 +1,147 @@
+import io
+import threading
+import time
+
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from ingest.utils.admission import AdmissionController, AdmissionRejected, admission
+
+MB = 1024 * 1024
+
+
+@override_settings(
+    CSV_INGEST_ADMISSION_CAPACITY=4, CSV_INGEST_ADMISSION_SLOT_BYTES=MB,
+    CSV_INGEST_ADMISSION_QUEUE=4, CSV_INGEST_ADMISSION_TIMEOUT=5,
+)
+class AdmissionControllerTests(SimpleTestCase):
+
+    def test_weight_scales_with_size(self):
+        ctl = AdmissionController(shared=False)
+        self.assertEqual(ctl.weight(10), 1)
+        self.assertEqual(ctl.weight(3 * MB), 3)
+        self.assertEqual(ctl.weight(5000 * MB), 4)
+
+    def test_big_upload_waits_for_small_ones(self):
+        ctl = AdmissionController(shared=False)
+        order = []
+        small = ctl.admit({"a": 4}, MB)
+        small.__enter__()
+
+        def big():
+            with ctl.admit({"b": 1}, 4 * MB):
+                order.append("big")
+
+        t = threading.Thread(target=big)
+        t.start()
+        time.sleep(0.05)
+        self.assertEqual(ctl.stats()["waiting"], 1)
+        order.append("small done")
+        small.__exit__(None, None, None)
+        t.join(2)
+        self.assertEqual(order, ["small done", "big"])
+
+    def test_per_table_limit_does_not_block_other_tables(self):
+        ctl = AdmissionController(shared=False)
+        admitted = []
+        first = ctl.admit({"a": 1}, 1)
+        first.__enter__()
+
+        def same_table():
+            with ctl.admit({"a": 1}, 1):
+                admitted.append("a")
+
+        t = threading.Thread(target=same_table)
+        t.start()
+        time.sleep(0.05)
+        with ctl.admit({"b": 1}, 1):
+            admitted.append("b")
+        first.__exit__(None, None, None)
+        t.join(2)
+        self.assertEqual(admitted, ["b", "a"])
+
+    @override_settings(CSV_INGEST_ADMISSION_QUEUE=0)
+    def test_full_queue_is_rejected(self):
+        ctl = AdmissionController(shared=False)
+        with ctl.admit({"a": 4}, 4 * MB):
+            with self.assertRaises(AdmissionRejected) as cm:
+                with ctl.admit({"b": 1}, 1):
+                    pass
+        self.assertGreaterEqual(cm.exception.retry_after, 1)
+
+    @override_settings(CSV_INGEST_ADMISSION_TIMEOUT=0.05)
+    def test_wait_times_out(self):
+        ctl = AdmissionController(shared=False)
+        with ctl.admit({"a": 1}, 1):
+            with self.assertRaises(AdmissionRejected):
+                with ctl.admit({"a": 1}, 1):
+                    pass
+        self.assertEqual(ctl.stats(), {"used": 0, "waiting": 0, "running": {}})
+
+
+@override_settings(CSV_INGEST_ADMISSION_TIMEOUT=0.2)
+class SharedTableSlotTests(TestCase):
+
+    def setUp(self):
+        # another server process, as far as Postgres can tell
+        self.other = connections.create_connection("default")
+        self.addCleanup(self.other.close)
+
+    def other_takes(self, name):
+        with self.other.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_lock(hashtextextended(%s, 0))", [name])
+            return cur.fetchone()[0]
+
+    def test_table_limit_holds_across_processes(self):
+        self.assertTrue(self.other_takes("ingest-admission:a:0"))
+
+        with self.assertRaises(AdmissionRejected):
+            with AdmissionController().admit({"a": 1}, 1):
+                pass
+        with AdmissionController().admit({"a": 2}, 1):
+            self.assertFalse(self.other_takes("ingest-admission:a:1"))
+        # released on the way out
+        self.assertTrue(self.other_takes("ingest-admission:a:1"))
+
+    def test_slots_of_every_table_or_none(self):
+        self.assertTrue(self.other_takes("ingest-admission:b:0"))
+
+        with self.assertRaises(AdmissionRejected):
+            with AdmissionController().admit({"a": 1, "b": 1}, 1):
+                pass
+        self.assertTrue(self.other_takes("ingest-admission:a:0"))
+
+
+class UploadAdmissionTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public._t;
+                CREATE TABLE public._t(name text NOT NULL, qty integer NOT NULL);
+            """)
+
+    @override_settings(CSV_INGEST_ADMISSION_QUEUE=0)
+    def test_upload_gets_429_when_saturated(self):
+        with admission.admit({"_t": 1}, 1):
+            resp = self.client.post(
+                reverse("upload-csv"),
+                data={"table_name": "_t", "file": io.BytesIO(b"name,qty\nPen,1\n")},
+                format="multipart",
+            )
+
+        self.assertEqual(resp.status_code, 429)
+        self.assertGreaterEqual(int(resp["Retry-After"]), 1)
+
+    @override_settings(CSV_INGEST_ADMISSION_QUEUE=0)
+    def test_dry_run_is_not_gated(self):
+        with admission.admit({"_t": 1}, 1):
+            resp = self.client.post(
+                reverse("upload-csv"),
+                data={"table_name": "_t", "file": io.BytesIO(b"name,qty\nPen,1\n"), "dry_run": True},
+                format="multipart",
+            )
+        self.assertEqual(resp.status_code, 200)
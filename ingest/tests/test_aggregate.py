@@ -0,0 +1,109 @@
+import io
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from ingest.utils.build_where_clause import build_where_clause, filter_column
+from ingest.utils.table_registry import registry
+
+
+class AggregateAPITests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.product_purchases;
+                CREATE TABLE public.product_purchases (
+                    sku        text NOT NULL,
+                    qty        integer NOT NULL,
+                    price      numeric,
+                    bought_at  timestamptz NOT NULL
+                );
+                INSERT INTO public.product_purchases VALUES
+                    ('A', 1, 10.0, '2024-01-05T10:00:00Z'),
+                    ('A', 2, 10.0, '2024-01-20T10:00:00Z'),
+                    ('B', 5,  2.5, '2024-01-21T10:00:00Z'),
+                    ('B', 1,  2.5, '2024-02-02T10:00:00Z'),
+                    ('C', 3, NULL, '2024-03-15T10:00:00Z');
+            """)
+
+    def setUp(self):
+        cache.clear()
+        registry.invalidate()
+
+    def get(self, **params):
+        return self.client.get(reverse("aggregate"), {"table": "product_purchases", **params})
+
+    def test_total_count(self):
+        resp = self.get()
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["rows"], [{"count": 5}])
+
+    def test_group_by_with_metrics(self):
+        resp = self.get(group_by="sku", metrics="count,sum:qty,max:price")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["columns"], ["sku", "count", "sum_qty", "max_price"])
+        by_sku = {r["sku"]: r for r in resp.data["rows"]}
+        self.assertEqual(by_sku["A"]["sum_qty"], 3)
+        self.assertEqual(by_sku["B"]["count"], 2)
+        self.assertIsNone(by_sku["C"]["max_price"])
+
+    def test_time_buckets_with_filter(self):
+        resp = self.get(bucket="bought_at:month", metrics="sum:qty", sku__in="A,B")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([r["sum_qty"] for r in resp.data["rows"]], [8, 1])
+        self.assertEqual(resp.data["rows"][0]["bucket"].month, 1)
+
+    def test_result_cache_invalidated_by_load(self):
+        first = self.get(group_by="sku")
+        second = self.get(group_by="sku")
+        self.assertFalse(first.data["cached"])
+        self.assertTrue(second.data["cached"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                reverse("upload-csv"),
+                data={
+                    "table_name": "product_purchases",
+                    "file": io.BytesIO(b"sku,qty,price,bought_at\nD,1,1,2024-04-01 00:00:00\n"),
+                },
+                format="multipart",
+            )
+        self.assertEqual(resp.status_code, 201)
+
+        third = self.get(group_by="sku")
+        self.assertFalse(third.data["cached"])
+        self.assertEqual(len(third.data["rows"]), 4)
+
+    def test_validation_errors(self):
+        for params in (
+            {"group_by": "nope"},
+            {"metrics": "median:qty"},
+            {"metrics": "sum:sku"},
+            {"metrics": "sum"},
+            {"bucket": "sku:day"},
+            {"bucket": "bought_at:fortnight"},
+            {"nope__gte": "1"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.get(**params).status_code, 400)
+
+    def test_table_not_allowed(self):
+        resp = self.client.get(reverse("aggregate"), {"table": "pg_user"})
+        self.assertEqual(resp.status_code, 403)
+
+
+class FilterColumnTests(SimpleTestCase):
+
+    def test_keys_resolve_to_the_column_the_where_clause_uses(self):
+        for key in ("sku", "qty__gte", "sku__in", "sku__icontains", "note__in_x"):
+            with self.subTest(key=key):
+                where_clause, _ = build_where_clause({key: "1"})
+                self.assertTrue(where_clause.startswith(f"WHERE {filter_column(key)} "), where_clause)
@@ -0,0 +1,107 @@
+import io
+
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from ingest.models import IngestTable
+from ingest.utils.table_registry import registry
+
+
+class BatchUploadTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.product_purchases;
+                DROP TABLE IF EXISTS public.products;
+                CREATE TABLE public.products(
+                    id BIGSERIAL PRIMARY KEY,
+                    sku TEXT NOT NULL UNIQUE,
+                    price NUMERIC(10,2) NOT NULL
+                );
+                CREATE TABLE public.product_purchases(
+                    id BIGSERIAL PRIMARY KEY,
+                    sku TEXT NOT NULL REFERENCES public.products(sku),
+                    qty INTEGER NOT NULL
+                );
+                DROP TABLE IF EXISTS public.batch_orders;
+                DROP TABLE IF EXISTS public.batch_regions;
+                CREATE TABLE public.batch_regions(code TEXT PRIMARY KEY);
+                INSERT INTO public.batch_regions VALUES ('EU'), ('US');
+                CREATE TABLE public.batch_orders(region TEXT NOT NULL, qty INTEGER NOT NULL);
+            """)
+        IngestTable.objects.create(name="batch_orders", lookups={"region": "batch_regions.code"})
+
+    def setUp(self):
+        registry.invalidate()
+
+    def count(self, table):
+        with connection.cursor() as cur:
+            cur.execute(f"SELECT COUNT(*) FROM public.{table}")
+            return cur.fetchone()[0]
+
+    def test_batch_loads_parents_first(self):
+        # child file sent first; FK order must still load products before purchases
+        resp = self.client.post(
+            reverse("upload-csv-batch"),
+            data={
+                "product_purchases": io.BytesIO(b"sku,qty\nA1,2\nB2,1\nA1,5\n"),
+                "products": io.BytesIO(b"sku,price\nA1,9.99\nB2,5.00\n"),
+            },
+            format="multipart",
+        )
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["load_order"], ["products", "product_purchases"])
+        self.assertEqual(resp.data["inserted_rows"], 5)
+        self.assertEqual(self.count("product_purchases"), 3)
+
+    def test_batch_is_all_or_nothing(self):
+        resp = self.client.post(
+            reverse("upload-csv-batch"),
+            data={
+                "products": io.BytesIO(b"sku,price\nA1,9.99\n"),
+                "product_purchases": io.BytesIO(b"sku,qty\nMISSING,2\n"),
+            },
+            format="multipart",
+        )
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("product_purchases", resp.data["detail"])
+        self.assertEqual(self.count("products"), 0)
+
+    def test_batch_validation_error_names_table(self):
+        resp = self.client.post(
+            reverse("upload-csv-batch"),
+            data={"products": io.BytesIO(b"sku,price\nA1,abc\n"), "strict": True},
+            format="multipart",
+        )
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertTrue(resp.data["detail"].startswith("products:"))
+
+    def test_batch_checks_lookups(self):
+        resp = self.client.post(
+            reverse("upload-csv-batch"),
+            data={
+                "products": io.BytesIO(b"sku,price\nA1,9.99\n"),
+                "batch_orders": io.BytesIO(b"region,qty\nEU,1\nXX,2\n"),
+            },
+            format="multipart",
+        )
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertTrue(resp.data["detail"].startswith("batch_orders:"), resp.data)
+        self.assertIn("row 3", resp.data["detail"])
+        self.assertEqual(self.count("products"), 0)
+        self.assertEqual(self.count("batch_orders"), 0)
+
+    def test_batch_rejects_unknown_table(self):
+        resp = self.client.post(
+            reverse("upload-csv-batch"),
+            data={"fake_table": io.BytesIO(b"a\n1\n")},
+            format="multipart",
+        )
+        self.assertEqual(resp.status_code, 403)
@@ -0,0 +1,37 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from ingest.models import IngestTable, UploadLedger
+
+
+class BenchIngestCommandTests(TestCase):
+
+    def test_bench_writes_json_report(self):
+        fd, out = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            call_command(
+                "bench_ingest", rows=200, rounds=1, warmup=0,
+                null_ratio=0.1, error_ratio=0.05, output=out, database=connection.settings_dict["NAME"],
+                stdout=io.StringIO(),
+            )
+            with open(out) as fh:
+                report = json.load(fh)
+        finally:
+            os.unlink(out)
+
+        self.assertEqual(set(report["results"]), {"validate", "copy", "end_to_end"})
+        self.assertEqual(report["params"]["rows"], 200)
+        self.assertGreater(report["results"]["copy"]["rows_per_sec"], 0)
+        self.assertFalse(IngestTable.objects.filter(name="bench_ingest").exists())
+        self.assertFalse(UploadLedger.objects.filter(table_name="bench_ingest").exists())
+
+    def test_bench_needs_the_database_named_outside_debug(self):
+        with self.assertRaisesMessage(CommandError, "--database"):
+            call_command("bench_ingest", rows=10, stdout=io.StringIO())
@@ -0,0 +1,109 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from ingest.models import IngestTable
+from ingest.tests.mixins import UploadMixin
+from ingest.utils import db_insert
+from ingest.utils.db_insert import bulk_copy_batched
+from ingest.utils.table_registry import registry
+
+CREATE_TABLE = """
+    DROP TABLE IF EXISTS public.recovery_test;
+    CREATE TABLE public.recovery_test(
+        sku  text PRIMARY KEY,
+        qty  integer NOT NULL CHECK (qty >= 0)
+    );
+"""
+
+
+class CopyRecoveryUploadTests(UploadMixin, APITestCase):
+
+    upload_table = "recovery_test"
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute(CREATE_TABLE + "INSERT INTO public.recovery_test VALUES ('OLD', 1);")
+
+    def setUp(self):
+        registry.invalidate()
+        IngestTable.objects.create(name="recovery_test", conflict_key="sku")
+
+    def stored(self):
+        with connection.cursor() as cur:
+            cur.execute("SELECT sku, qty FROM public.recovery_test ORDER BY sku")
+            return cur.fetchall()
+
+    CSV = b"sku,qty\nA,1\nOLD,2\nB,-1\nC,3\nA,4\nD,5\n"
+
+    def test_non_strict_upload_loads_around_rows_the_database_refuses(self):
+        for batch_rows in (50_000, 2, 1):
+            with self.subTest(batch_rows=batch_rows):
+                with connection.cursor() as cur:
+                    cur.execute("DELETE FROM public.recovery_test WHERE sku <> 'OLD'")
+                with override_settings(CSV_INGEST_COPY_BATCH_ROWS=batch_rows):
+                    resp = self.upload(self.CSV, strict=False, force=True)
+
+                self.assertEqual(resp.status_code, 201, resp.data)
+                self.assertEqual(resp.data["inserted_rows"], 3)
+                self.assertEqual(self.stored(), [("A", 1), ("C", 3), ("D", 5), ("OLD", 1)])
+                report = resp.data["diagnostics"]["database_errors"]
+                self.assertEqual(report["rows"], 3)
+                self.assertEqual([m.split(":")[0] for m in report["errors"]], ["row 3", "row 4", "row 6"])
+                self.assertIn("already exists", report["errors"][0])
+                self.assertIn("recovery_test_qty_check", report["errors"][1])
+                self.assertIsNotNone(report["quarantine"])
+
+    def test_upsert_failures_are_bisected(self):
+        resp = self.upload(b"sku,qty\nOLD,7\nB,-1\nC,3\n", strict=False, load_mode="upsert")
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(self.stored(), [("C", 3), ("OLD", 7)])
+        self.assertEqual(resp.data["diagnostics"]["database_errors"]["errors"][0].split(":")[0], "row 3")
+
+    def test_strict_upload_still_fails_as_a_whole(self):
+        resp = self.upload(self.CSV)
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self.stored(), [("OLD", 1)])
+
+    def test_delta_does_not_remember_refused_rows(self):
+        resp = self.upload(b"sku,qty\nA,1\nB,-1\n", strict=False, delta=True)
+        self.assertEqual(resp.data["inserted_rows"], 1)
+
+        with connection.cursor() as cur:
+            cur.execute("ALTER TABLE public.recovery_test DROP CONSTRAINT recovery_test_qty_check")
+        resp = self.upload(b"sku,qty\nA,1\nB,-1\n", strict=False, delta=True, force=True)
+
+        self.assertEqual(resp.data["inserted_rows"], 1)
+        self.assertIn(("B", -1), self.stored())
+
+
+class BulkCopyBatchedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute(CREATE_TABLE)
+
+    def test_one_copy_per_chunk_when_nothing_fails(self):
+        rows = [{"sku": f"S{i}", "qty": i} for i in range(10)]
+        with mock.patch.object(db_insert, "bulk_copy_into", wraps=db_insert.bulk_copy_into) as copy:
+            written = bulk_copy_batched("recovery_test", rows, ["sku", "qty"], reject=None, batch_rows=4)
+
+        self.assertEqual(written, 10)
+        self.assertEqual(copy.call_count, 3)
+
+    def test_rejected_rows_are_passed_on_in_order(self):
+        rows = [{"sku": f"S{i}", "qty": -1 if i in (3, 7) else i} for i in range(10)]
+        rejected = []
+
+        written = bulk_copy_batched(
+            "recovery_test", rows, ["sku", "qty"], reject=lambda row, e: rejected.append(row["sku"]), batch_rows=4
+        )
+
+        self.assertEqual(written, 8)
+        self.assertEqual(rejected, ["S3", "S7"])
@@ -0,0 +1,61 @@
+from django.db import connection
+from rest_framework.test import APITestCase
+
+from ingest.tests.mixins import UploadMixin
+
+
+class CSVFormatDetectionTests(UploadMixin, APITestCase):
+
+    upload_table = "_t"
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public._t;
+                CREATE TABLE public._t(
+                  name text NOT NULL,
+                  qty  integer NOT NULL
+                )
+            """)
+
+    def names(self):
+        with connection.cursor() as cur:
+            cur.execute("SELECT name FROM public._t ORDER BY qty")
+            return [r[0] for r in cur.fetchall()]
+
+    def test_latin1_semicolon_export(self):
+        resp = self.upload("name;qty\nCafé;1\nCrème brûlée;2\n".encode("latin-1"))
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["diagnostics"]["format"]["encoding"], "cp1252")
+        self.assertEqual(resp.data["diagnostics"]["format"]["delimiter"], ";")
+        self.assertEqual(self.names(), ["Café", "Crème brûlée"])
+
+    def test_tab_delimited_utf16(self):
+        resp = self.upload("name\tqty\nÜber\t1\n".encode("utf-16"))
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(self.names(), ["Über"])
+
+    def test_ambiguous_delimiter_is_sniffed(self):
+        # comma inside a quoted header name; the data is semicolon separated
+        resp = self.upload(b'name;qty;"notes, misc"\n"a, b";1;x\nc;2;y\n')
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(self.names(), ["a, b", "c"])
+
+    def test_explicit_overrides(self):
+        resp = self.upload("name|qty\nÀ|1\n".encode("latin-1"), encoding="latin-1", delimiter="|")
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(self.names(), ["À"])
+
+    def test_wrong_encoding_is_a_clean_400(self):
+        resp = self.upload("name,qty\nCafé,1\n".encode("latin-1"), encoding="utf-8")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("not valid utf-8", resp.data["detail"])
+
+    def test_unknown_encoding(self):
+        resp = self.upload(b"name,qty\nA,1\n", encoding="klingon")
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,86 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.test import APITestCase
+
+from ingest.models import IngestTable, RowHash
+from ingest.tests.mixins import UploadMixin
+from ingest.utils.table_registry import registry
+
+
+class DeltaUploadTests(UploadMixin, APITestCase):
+
+    upload_defaults = {"delta": True}
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.products;
+                CREATE TABLE public.products (
+                    sku   text PRIMARY KEY,
+                    price integer NOT NULL
+                );
+                DROP TABLE IF EXISTS public.load_test_table;
+                CREATE TABLE public.load_test_table (
+                    name text,
+                    qty  integer
+                );
+            """)
+        IngestTable.objects.filter(name="products").update(conflict_key="sku")
+
+    def setUp(self):
+        registry.invalidate()
+
+    def table_rows(self, sql):
+        with connection.cursor() as cur:
+            cur.execute(sql)
+            return cur.fetchall()
+
+    def test_keyed_table_loads_only_new_and_changed_rows(self):
+        first = self.upload(b"sku,price\nA,1\nB,2\nC,3\n", table="products")
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(first.data["delta"]["new_rows"], 3)
+
+        second = self.upload(b"sku,price\nA,1\nB,20\nC,3\nD,4\n", table="products")
+
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.data["inserted_rows"], 2)
+        self.assertEqual(
+            {k: second.data["delta"][k] for k in ("new_rows", "changed_rows", "skipped_rows")},
+            {"new_rows": 1, "changed_rows": 1, "skipped_rows": 2},
+        )
+        self.assertEqual(
+            self.table_rows("SELECT sku, price FROM products ORDER BY sku"),
+            [("A", 1), ("B", 20), ("C", 3), ("D", 4)],
+        )
+        self.assertEqual(RowHash.objects.filter(table_name="products").count(), 4)
+
+    def test_unkeyed_table_hashes_whole_rows(self):
+        self.upload(b"name,qty\nx,1\ny,2\n", table="load_test_table")
+        resp = self.upload(b"name,qty\nx,1\ny,3\ny,3\n", table="load_test_table")
+
+        self.assertEqual(resp.data["delta"]["key"], "row")
+        self.assertEqual(resp.data["delta"]["new_rows"], 1)
+        self.assertEqual(resp.data["delta"]["duplicate_rows_in_file"], 1)
+        self.assertEqual(len(self.table_rows("SELECT * FROM load_test_table")), 3)
+
+    def test_dry_run_reports_delta_without_writing(self):
+        self.upload(b"sku,price\nA,1\n", table="products")
+        resp = self.upload(b"sku,price\nA,1\nB,2\n", table="products", dry_run=True)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["delta"]["new_rows"], 1)
+        self.assertEqual(len(self.table_rows("SELECT * FROM products")), 1)
+
+    def test_plain_upload_does_not_touch_index(self):
+        self.upload(b"name,qty\nx,1\n", table="load_test_table", delta=False)
+        self.assertFalse(RowHash.objects.exists())
+
+    def test_forget_row_hashes(self):
+        self.upload(b"name,qty\nx,1\n", table="load_test_table")
+        call_command("forget_row_hashes", "load_test_table", stdout=io.StringIO())
+
+        resp = self.upload(b"name,qty\nx,1\n", table="load_test_table")
+        self.assertEqual(resp.data["delta"]["new_rows"], 1)
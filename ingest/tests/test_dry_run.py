@@ -0,0 +1,79 @@
+
+from django.db import connection
+from rest_framework.test import APITestCase
+
+from ingest.tests.mixins import UploadMixin
+
+
+class DryRunTests(UploadMixin, APITestCase):
+
+    upload_table = "notnull_test"
+    upload_defaults = {"dry_run": True}
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.notnull_test;
+                CREATE TABLE public.notnull_test(
+                    name TEXT NOT NULL,
+                    qty INTEGER
+                );
+            """)
+
+    def make_csv(self, rows=1000, bad_every=10):
+        lines = ["name,qty"]
+        for i in range(rows):
+            qty = "oops" if i % bad_every == 0 else ("" if i % 7 == 0 else str(i))
+            lines.append(f"item{i},{qty}")
+        return ("\n".join(lines) + "\n").encode()
+
+    def count(self):
+        with connection.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM public.notnull_test")
+            return cur.fetchone()[0]
+
+    def test_full_dry_run_does_not_insert(self):
+        resp = self.upload(self.make_csv(), strict=False)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.data["dry_run"])
+        self.assertEqual(resp.data["diagnostics"]["skipped_rows"], 100)
+        self.assertIsNone(resp.data["diagnostics"]["quarantine"])
+        self.assertEqual(self.count(), 0)
+
+    def test_sampled_dry_run_projects_errors(self):
+        resp = self.upload(self.make_csv(), sample=200)
+
+        self.assertEqual(resp.status_code, 200)
+        diag = resp.data["diagnostics"]
+        self.assertEqual(diag["rows_in_csv"], 1000)
+        self.assertEqual(diag["sampled_rows"], 400)
+        # one row in ten is bad; the projection should be in the right ballpark
+        self.assertTrue(50 <= diag["projected_error_rows"] <= 150, diag["projected_error_rows"])
+        self.assertEqual(diag["columns"]["qty"]["errors"], diag["sample_errors"])
+        self.assertGreater(diag["columns"]["qty"]["null_ratio"], 0)
+        self.assertIsNone(diag["copy_check_error"])
+        self.assertGreater(diag["estimated_load_seconds"], 0)
+        self.assertEqual(self.count(), 0)
+
+    def test_sampled_dry_run_copies_into_a_temp_table(self):
+        with connection.cursor() as cur:
+            cur.execute("""
+                CREATE FUNCTION pg_temp.refuse() RETURNS trigger LANGUAGE plpgsql
+                    AS $$ BEGIN RAISE EXCEPTION 'live table written'; END $$;
+                CREATE TRIGGER refuse BEFORE INSERT ON public.notnull_test
+                    FOR EACH STATEMENT EXECUTE FUNCTION pg_temp.refuse();
+                ALTER TABLE public.notnull_test ADD CONSTRAINT small_qty CHECK (qty < 500);
+            """)
+
+        resp = self.upload(self.make_csv(), sample=200)
+
+        # the table's constraints still apply, its triggers do not
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("small_qty", resp.data["diagnostics"]["copy_check_error"])
+
+    def test_sampled_dry_run_reports_missing_columns(self):
+        resp = self.upload(b"qty\n1\n", sample=10)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("missing required columns", resp.data["detail"])
@@ -2,7 +2,8 @@ from django.test import TestCase
 from django.db import connection
 from rest_framework.test import APIClient
 from django.urls import reverse
-from ingest.utils.constants import ALLOWED_TABLES
+from ingest.models import IngestTable
+from ingest.utils.table_registry import registry
 
 
 class TestGetRelations(TestCase):
@@ -10,14 +11,16 @@ class TestGetRelations(TestCase):
     @classmethod
     def setUpTestData(cls):
         # Create mock tables for testing
-        # We only create some of the tables in ALLOWED_TABLES
+        # We only create some of the registered tables
         with connection.cursor() as cursor:
             cursor.execute("CREATE TABLE IF NOT EXISTS products (id serial PRIMARY KEY);")
             cursor.execute("CREATE TABLE IF NOT EXISTS product_purchases (id serial PRIMARY KEY);")
-            # This table exists in DB but is NOT in ALLOWED_TABLES
+            # This table exists in DB but is NOT registered
             cursor.execute("CREATE TABLE IF NOT EXISTS unknown_table (id serial PRIMARY KEY);")
 
     def setUp(self):
+        # The registry snapshot only re-checks which tables exist when it reloads
+        registry.reload()
         self.client = APIClient()
         self.url = reverse("get-relations") + "?mode=relations"
 
@@ -29,7 +32,7 @@ class TestGetRelations(TestCase):
 
         returned = resp.data["relations"]
 
-        # Intersection between ALLOWED_TABLES and existing tables
+        # Intersection between registered tables and existing tables
         with connection.cursor() as c:
             c.execute("""
                 SELECT table_name 
@@ -39,7 +42,7 @@ class TestGetRelations(TestCase):
             existing_tables = {row[0] for row in c.fetchall()}
 
         expected_relations = [
-            t for t in ALLOWED_TABLES if t in existing_tables
+            t.name for t in IngestTable.objects.filter(enabled=True) if t.name in existing_tables
         ]
 
         self.assertListEqual(
@@ -48,6 +51,14 @@ class TestGetRelations(TestCase):
             msg="The endpoint should return only allowed tables that actually exist."
         )
 
+    def test_disabled_table_is_hidden(self):
+        IngestTable.objects.filter(name="products").update(enabled=False)
+        registry.reload()
+
+        resp = self.client.get(self.url)
+        self.assertNotIn("products", resp.data["relations"])
+        self.assertIn("product_purchases", resp.data["relations"])
+
     @classmethod
     def tearDownClass(cls):
         # Clean up tables
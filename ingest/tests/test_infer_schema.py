@@ -0,0 +1,89 @@
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from ingest.tests.mixins import UploadMixin
+from ingest.utils.table_registry import registry
+
+
+@override_settings(CSV_INGEST_INFER_SCHEMA=True)
+class InferSchemaTests(UploadMixin, APITestCase):
+
+    upload_table = "inferred_test"
+    upload_defaults = {"infer_schema": True}
+
+    def tearDown(self):
+        # the registry row is rolled back with the test; drop the cached copy too
+        registry.invalidate()
+
+    def column_types(self):
+        with connection.cursor() as cur:
+            cur.execute("""
+                SELECT column_name, data_type FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = 'inferred_test'
+                ORDER BY ordinal_position
+            """)
+            return dict(cur.fetchall())
+
+    def test_creates_table_with_inferred_types(self):
+        content = (
+            'sku,price,qty,big,in_stock,added,meta\n'
+            'A1,1,3,5000000000,yes,2024-01-01,"{""a"": 1}"\n'
+            'B2,2.50,,1,no,2024-01-02 10:00:00,\n'
+        ).encode()
+        resp = self.upload(content)
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertTrue(resp.data["created_table"])
+        self.assertEqual(resp.data["inserted_rows"], 2)
+        self.assertEqual(self.column_types(), {
+            "sku": "text",
+            "price": "numeric",
+            "qty": "integer",
+            "big": "bigint",
+            "in_stock": "boolean",
+            "added": "timestamp with time zone",
+            "meta": "jsonb",
+        })
+        self.assertTrue(registry.is_allowed("inferred_test"))
+
+    @override_settings(CSV_INGEST_INFER_SAMPLE_ROWS=1)
+    def test_failed_load_does_not_leave_table(self):
+        resp = self.upload(b"qty\n1\nnot-a-number\n", strict=True)
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self.column_types(), {})
+        self.assertFalse(registry.is_allowed("inferred_test"))
+
+    def test_headers_equal_once_truncated_are_refused(self):
+        # Postgres cuts identifiers to 63 bytes, so both become the same column
+        long = "x" * 70
+        resp = self.upload(f"{long}a,{long}b\n1,2\n".encode())
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("Could not create table", resp.data["detail"])
+        self.assertEqual(self.column_types(), {})
+
+    def test_header_with_double_quotes(self):
+        resp = self.upload(b'id,"say ""hi"""\n1,hello\n')
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(self.column_types(), {"id": "integer", 'say "hi"': "text"})
+        with connection.cursor() as cur:
+            cur.execute('SELECT "say ""hi""" FROM public.inferred_test')
+            self.assertEqual(cur.fetchall(), [("hello",)])
+
+    def test_dry_run_only_reports_inferred_schema(self):
+        resp = self.upload(b"name,qty\nPen,1\n", dry_run=True)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["inferred_schema"], [
+            {"column": "name", "data_type": "text"},
+            {"column": "qty", "data_type": "integer"},
+        ])
+        self.assertEqual(self.column_types(), {})
+
+    @override_settings(CSV_INGEST_INFER_SCHEMA=False)
+    def test_disabled_by_default(self):
+        resp = self.upload(b"name\nPen\n")
+        self.assertEqual(resp.status_code, 403)
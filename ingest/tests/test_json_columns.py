@@ -0,0 +1,107 @@
+import unittest
+
+from django.db import connection
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from ingest.models import IngestTable
+from ingest.tests.mixins import UploadMixin
+from ingest.utils import csv_validator
+from ingest.utils.csv_validator import JSONText, column_plan
+from ingest.utils.db_insert import sanitize_value
+from ingest.utils.table_registry import registry
+
+
+class JSONPassThroughTests(UploadMixin, APITestCase):
+
+    upload_table = "jsontest"
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.jsontest;
+                CREATE TABLE public.jsontest(
+                    name  text,
+                    attrs jsonb
+                );
+            """)
+
+    def setUp(self):
+        registry.invalidate()
+
+    def stored(self):
+        with connection.cursor() as cur:
+            cur.execute("SELECT name, attrs::text FROM public.jsontest ORDER BY name")
+            return cur.fetchall()
+
+    def test_escapes_survive_copy(self):
+        resp = self.upload(
+            b'name,attrs\n'
+            b'"back\\slash","{""quote"": ""say \\""hi\\"""", ""path"": ""C:\\\\tmp"", ""nl"": ""a\\nb""}"\n'
+        )
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(
+            self.stored(),
+            [("back\\slash", '{"nl": "a\\nb", "path": "C:\\\\tmp", "quote": "say \\"hi\\""}')],
+        )
+
+    def test_malformed_json_is_rejected(self):
+        for bad in (b'{"a": 1', b"NaN", b"{'a': 1}"):
+            with self.subTest(bad=bad):
+                resp = self.upload(b"name,attrs\nx," + bad + b"\n")
+                self.assertEqual(resp.status_code, 400)
+
+    def test_numbers_jsonb_takes_are_accepted(self):
+        resp = self.upload(b"name,attrs\na,[1e400]\nb,18446744073709551617\n")
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(self.stored(), [("a", "[1" + "0" * 400 + "]"), ("b", "18446744073709551617")])
+
+    def test_json_schema_requires_a_json_column(self):
+        IngestTable.objects.filter(name="jsontest").update(json_schemas={"name": {"type": "object"}})
+
+        resp = self.upload(b'name,attrs\nx,{}\n')
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("not json columns", resp.data["detail"])
+
+    @unittest.skipUnless(csv_validator.jsonschema, "jsonschema not installed")
+    def test_json_schema_validation(self):
+        IngestTable.objects.filter(name="jsontest").update(json_schemas={
+            "attrs": {"type": "object", "required": ["color"], "properties": {"size": {"type": "integer"}}},
+        })
+
+        ok = self.upload(b'name,attrs\nx,"{""color"": ""red"", ""size"": 2}"\n')
+        self.assertEqual(ok.status_code, 201)
+
+        resp = self.upload(b'name,attrs\ny,"{""color"": ""red"", ""size"": ""L""}"\nz,"{}"\n', strict=False)
+        self.assertEqual(resp.data["diagnostics"]["skipped_rows"], 2)
+        self.assertIn("size", resp.data["diagnostics"]["errors"][0])
+
+    @unittest.skipUnless(csv_validator.jsonschema, "jsonschema not installed")
+    def test_json_schema_sees_wide_integers_exactly(self):
+        IngestTable.objects.filter(name="jsontest").update(json_schemas={
+            "attrs": {"type": "integer", "maximum": 2 ** 64},
+        })
+
+        ok = self.upload(b"name,attrs\nx,18446744073709551616\n")
+        self.assertEqual(ok.status_code, 201, ok.data)
+
+        resp = self.upload(b"name,attrs\ny,18446744073709551617\n")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("maximum", resp.data["detail"])
+
+
+class JSONCasterTests(SimpleTestCase):
+
+    def test_cells_pass_through_unchanged(self):
+        plan = column_plan([{"column": "a", "data_type": "jsonb", "is_nullable": True, "default": None}])
+        value = plan[0][1]('{"b":  [1, 2.50]}')
+
+        self.assertIsInstance(value, JSONText)
+        self.assertEqual(value, '{"b":  [1, 2.50]}')
+        self.assertEqual(sanitize_value(JSONText('{"a":\n"x\\ty"}')), '{"a": "x\\\\ty"}')
+
+    def test_text_backslashes_are_escaped_for_copy(self):
+        self.assertEqual(sanitize_value("a\\tb"), "a\\\\tb")
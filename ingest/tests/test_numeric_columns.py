@@ -0,0 +1,88 @@
+from django.db import connection
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from ingest.tests.mixins import UploadMixin
+from ingest.utils.csv_validator import numeric_caster
+from ingest.utils.db_schema import get_table_schema
+
+
+class NumericUploadTests(UploadMixin, APITestCase):
+
+    upload_table = "products_test"
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.products_test;
+                CREATE TABLE public.products_test(
+                    sku    text NOT NULL,
+                    price  numeric(8,2),
+                    ratio  numeric,
+                    weight double precision
+                );
+            """)
+
+    def test_catalog_typmod(self):
+        price = next(c for c in get_table_schema("products_test") if c["column"] == "price")
+        self.assertEqual((price["precision"], price["scale"]), (8, 2))
+
+    def test_values_are_loaded_exactly(self):
+        long_decimal = "3.141592653589793238462643383279"
+        resp = self.upload(f"sku,price,ratio,weight\nA,0.1,{long_decimal},0.1\nB,123456.789,1e-30,\n".encode())
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        with connection.cursor() as cur:
+            cur.execute("SELECT price::text, ratio::text FROM public.products_test ORDER BY sku")
+            self.assertEqual(
+                cur.fetchall(),
+                [("0.10", long_decimal), ("123456.79", "0.000000000000000000000000000001")],
+            )
+
+    def test_value_rounded_past_the_precision_is_a_row_error(self):
+        resp = self.upload(b"sku,price,ratio,weight\nA,999999.994,,\nB,999999.995,,\n", strict=False)
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(resp.data["inserted_rows"], 1)
+        self.assertEqual(resp.data["diagnostics"]["skipped_rows"], 1)
+
+    def test_too_many_integer_digits_is_a_row_error(self):
+        resp = self.upload(b"sku,price,ratio,weight\nA,1.5,,\nB,1234567.1,,\nC,abc,,\n", strict=False)
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["inserted_rows"], 1)
+        self.assertEqual(
+            {(g["column"], g["count"]) for g in resp.data["diagnostics"]["error_summary"]},
+            {("price", 2)},
+        )
+
+
+class NumericCasterTests(SimpleTestCase):
+
+    def test_plain_text_passes_through(self):
+        cast = numeric_caster(6, 2)
+        for raw, expected in ((" 1234.5 ", "1234.5"), ("-0.1", "-0.1"), ("0001.25", "0001.25"), (".5", ".5")):
+            with self.subTest(raw=raw):
+                self.assertEqual(cast(raw), expected)
+
+    def test_out_of_range_and_garbage(self):
+        cast = numeric_caster(6, 2)
+        for raw in ("12345", "1e5", "abc", ".", "Infinity"):
+            with self.subTest(raw=raw):
+                with self.assertRaises(ValueError):
+                    cast(raw)
+
+    def test_rounding_to_the_scale_is_checked(self):
+        cast = numeric_caster(3, 1)
+        for raw in ("99.99", "99.95", "-99.96", "9.999e1"):
+            with self.subTest(raw=raw):
+                with self.assertRaises(ValueError):
+                    cast(raw)
+        self.assertEqual(cast("99.94"), "99.94")
+        self.assertEqual(numeric_caster(2, 0)("0.4"), "0.4")
+
+    def test_exponent_and_nan(self):
+        self.assertEqual(numeric_caster(6, 2)("1.5e2"), "1.5E+2")
+        self.assertEqual(numeric_caster()("nan"), "NaN")
+        self.assertIs(numeric_caster(6, 2), numeric_caster(6, 2))
@@ -0,0 +1,139 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from ingest.models import IngestTable
+from ingest.tests.mixins import UploadMixin
+from ingest.utils.partitions import get_partitioning
+
+
+class PartitionRoutingTests(UploadMixin, APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.product_purchases;
+                CREATE TABLE public.product_purchases (
+                    sku       text NOT NULL,
+                    qty       integer NOT NULL,
+                    bought_at timestamptz NOT NULL
+                ) PARTITION BY RANGE (bought_at);
+                CREATE TABLE public.product_purchases_2024_01 PARTITION OF public.product_purchases
+                    FOR VALUES FROM ('2024-01-01 00:00:00+00') TO ('2024-02-01 00:00:00+00');
+
+                DROP TABLE IF EXISTS public.load_test_table;
+                CREATE TABLE public.load_test_table (name text, qty integer NOT NULL) PARTITION BY RANGE (qty);
+                CREATE TABLE public.load_test_table_low PARTITION OF public.load_test_table
+                    FOR VALUES FROM (MINVALUE) TO (100);
+                CREATE TABLE public.load_test_table_high PARTITION OF public.load_test_table
+                    FOR VALUES FROM (100) TO (200);
+
+                DROP TABLE IF EXISTS public.partition_local_test;
+                CREATE TABLE public.partition_local_test (sku text, sold_at timestamp NOT NULL)
+                    PARTITION BY RANGE (sold_at);
+                CREATE TABLE public.partition_local_test_2024_01 PARTITION OF public.partition_local_test
+                    FOR VALUES FROM ('2024-01-01') TO ('2024-02-01');
+            """)
+        IngestTable.objects.create(name="partition_local_test")
+
+    def leaf_counts(self, table):
+        with connection.cursor() as cur:
+            cur.execute(f"SELECT tableoid::regclass::text, count(*) FROM public.{table} GROUP BY 1 ORDER BY 1")
+            return dict(cur.fetchall())
+
+    def test_catalog_detection(self):
+        part = get_partitioning("product_purchases")
+
+        self.assertEqual((part.column, part.kind), ("bought_at", "datetime"))
+        self.assertEqual([leaf.name for leaf in part.leaves], ["product_purchases_2024_01"])
+        self.assertIsNone(get_partitioning("notnull_test"))
+
+    def test_rows_go_to_existing_and_new_partitions(self):
+        resp = self.upload(
+            b"sku,qty,bought_at\n"
+            b"A,1,2024-01-05 10:00:00\n"
+            b"B,2,2024-03-02 00:00:00+0000\n"
+            b"C,3,2024-03-31 23:59:59\n",
+            table="product_purchases",
+        )
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["inserted_rows"], 3)
+        self.assertEqual(
+            self.leaf_counts("product_purchases"),
+            {"product_purchases_2024_01": 1, "product_purchases_p202403": 2},
+        )
+
+    @override_settings(CSV_INGEST_PARTITION_INTERVAL="day")
+    def test_new_partition_interval(self):
+        self.upload(b"sku,qty,bought_at\nA,1,2024-05-06 12:00:00\n", table="product_purchases")
+        self.assertEqual(self.leaf_counts("product_purchases"), {"product_purchases_p20240506": 1})
+
+    def test_clipped_partitions_of_one_period_get_distinct_names(self):
+        with connection.cursor() as cur:
+            cur.execute("""
+                CREATE TABLE public.product_purchases_mid_march PARTITION OF public.product_purchases
+                    FOR VALUES FROM ('2024-03-10 00:00:00+00') TO ('2024-03-20 00:00:00+00')
+            """)
+        resp = self.upload(
+            b"sku,qty,bought_at\nA,1,2024-03-05 00:00:00\nB,2,2024-03-25 00:00:00\n", table="product_purchases"
+        )
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(self.leaf_counts("product_purchases"), {
+            "product_purchases_p20240301000000_20240310000000": 1,
+            "product_purchases_p20240320000000_20240401000000": 1,
+        })
+
+    def test_timestamp_without_time_zone_keeps_the_wall_time(self):
+        # Postgres drops the offset: this is January 31st in the column, not February 1st
+        resp = self.upload(b"sku,sold_at\nA,2024-01-31 23:00:00-05:00\n", table="partition_local_test")
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(self.leaf_counts("partition_local_test"), {"partition_local_test_2024_01": 1})
+
+    @override_settings(CSV_INGEST_PARTITION_INTERVAL="week")
+    def test_unknown_interval_fails_the_load(self):
+        resp = self.upload(b"sku,qty,bought_at\nA,1,2024-05-06 12:00:00\n", table="product_purchases")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("Unknown partition interval", resp.data["detail"])
+
+    def test_non_strict_load_rejects_rows_without_a_partition(self):
+        resp = self.upload(b"name,qty\nx,5\nz,500\n", table="load_test_table", strict=False)
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["inserted_rows"], 1)
+        errors = resp.data["diagnostics"]["database_errors"]
+        self.assertEqual(errors["rows"], 1)
+        self.assertEqual(
+            [(g["column"], g["kind"], g["count"]) for g in errors["error_summary"]], [("qty", "partition", 1)]
+        )
+        self.assertIn("row 3", errors["errors"][0])
+
+    def test_integer_ranges_without_default_reject_outliers(self):
+        ok = self.upload(b"name,qty\nx,-5\ny,150\n", table="load_test_table")
+        self.assertEqual(ok.status_code, 201)
+        self.assertEqual(self.leaf_counts("load_test_table"), {"load_test_table_high": 1, "load_test_table_low": 1})
+
+        resp = self.upload(b"name,qty\nz,500\n", table="load_test_table")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("No partition", resp.data["detail"])
+
+    def test_outliers_go_to_default_partition(self):
+        with connection.cursor() as cur:
+            cur.execute("CREATE TABLE public.load_test_table_rest PARTITION OF public.load_test_table DEFAULT")
+        self.upload(b"name,qty\nz,500\n", table="load_test_table")
+        self.assertEqual(self.leaf_counts("load_test_table"), {"load_test_table_rest": 1})
+
+    def test_detach_old_partitions(self):
+        self.upload(b"sku,qty,bought_at\nB,2,2024-03-02 00:00:00\n", table="product_purchases")
+        out = io.StringIO()
+        call_command("detach_partitions", "product_purchases", before="2024-03-01", stdout=out)
+
+        self.assertIn("Detached product_purchases_2024_01", out.getvalue())
+        self.assertEqual([leaf.name for leaf in get_partitioning("product_purchases").leaves], ["product_purchases_p202403"])
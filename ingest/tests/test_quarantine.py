@@ -0,0 +1,69 @@
+import csv
+import io
+import tempfile
+
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from ingest.tests.mixins import UploadMixin
+
+
+@override_settings(
+    CSV_INGEST_QUARANTINE_DIR=tempfile.mkdtemp(prefix="quarantine_test_"),
+    CSV_INGEST_MAX_ERROR_MESSAGES=2,
+    CSV_INGEST_ERROR_EXAMPLES=1,
+)
+class QuarantineTests(UploadMixin, APITestCase):
+
+    upload_table = "notnull_test"
+    upload_defaults = {"strict": False}
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.notnull_test;
+                CREATE TABLE public.notnull_test(
+                    name TEXT NOT NULL,
+                    qty INTEGER NOT NULL
+                );
+            """)
+
+    def test_errors_are_aggregated_and_bounded(self):
+        resp = self.upload(b"name,qty\nPen,1\nA,x\nB,y\nC,z\n,4\nMarker,5\n")
+
+        self.assertEqual(resp.status_code, 201)
+        diag = resp.data["diagnostics"]
+        self.assertEqual(resp.data["inserted_rows"], 2)
+        self.assertEqual(diag["skipped_rows"], 4)
+        self.assertEqual(len(diag["errors"]), 2)
+        self.assertTrue(diag["errors_truncated"])
+
+        groups = {(g["column"], g["kind"]): g for g in diag["error_summary"]}
+        self.assertEqual(groups[("qty", "invalid")]["count"], 3)
+        self.assertEqual(groups[("qty", "invalid")]["examples"], [
+            {"row": 3, "message": "column 'qty' failed validation: invalid literal for int() with base 10: 'x'"}
+        ])
+        self.assertEqual(groups[("name", "not_null")]["count"], 1)
+
+    def test_rejected_rows_can_be_downloaded(self):
+        resp = self.upload(b"name,qty\nPen,1\nA,x\n,4\n")
+        quarantine = resp.data["diagnostics"]["quarantine"]
+        self.assertEqual(quarantine["rows"], 2)
+
+        download = self.client.get(quarantine["url"])
+        self.assertEqual(download.status_code, 200)
+        rows = list(csv.reader(io.StringIO(b"".join(download.streaming_content).decode())))
+        self.assertEqual(rows[0], ["_row", "_error", "name", "qty"])
+        self.assertEqual([r[0] for r in rows[1:]], ["3", "4"])
+        self.assertEqual(rows[1][2:], ["A", "x"])
+
+    def test_clean_upload_has_no_quarantine(self):
+        resp = self.upload(b"name,qty\nPen,1\n")
+        self.assertIsNone(resp.data["diagnostics"]["quarantine"])
+
+    def test_unknown_quarantine_id_is_404(self):
+        resp = self.client.get(reverse("quarantine-download", args=["00000000-0000-0000-0000-000000000000"]))
+        self.assertEqual(resp.status_code, 404)
@@ -0,0 +1,122 @@
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from ingest.models import IngestTable
+from ingest.tests.mixins import UploadMixin
+from ingest.utils.table_registry import registry
+
+
+class ReferenceCheckTests(UploadMixin, APITestCase):
+
+    upload_table = "ref_child"
+    upload_defaults = {"check_references": True}
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.ref_child;
+                DROP TABLE IF EXISTS public.ref_parent;
+                DROP TABLE IF EXISTS public.ref_region;
+                CREATE TABLE public.ref_parent(
+                    sku  varchar(32) PRIMARY KEY,
+                    uid  uuid UNIQUE
+                );
+                CREATE TABLE public.ref_region(code text);
+                DROP TABLE IF EXISTS public.ref_small;
+                CREATE TABLE public.ref_small(id integer PRIMARY KEY);
+                INSERT INTO public.ref_small VALUES (1), (2);
+                DROP TABLE IF EXISTS public.ref_big_child;
+                CREATE TABLE public.ref_big_child(big bigint);
+                CREATE TABLE public.ref_child(
+                    sku    varchar(32) REFERENCES public.ref_parent(sku),
+                    uid    uuid REFERENCES public.ref_parent(uid),
+                    region text,
+                    qty    integer NOT NULL
+                );
+                INSERT INTO public.ref_parent VALUES
+                    ('A', 'a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11'),
+                    ('B', 'b0eebc99-9c0b-4ef8-bb6d-6bb9bd380a22');
+                INSERT INTO public.ref_region VALUES ('EU'), ('US');
+            """)
+
+    def setUp(self):
+        registry.invalidate()
+        IngestTable.objects.create(name="ref_child", lookups={"region": "ref_region.code"})
+
+    def stored(self):
+        with connection.cursor() as cur:
+            cur.execute("SELECT sku, qty FROM public.ref_child ORDER BY qty")
+            return cur.fetchall()
+
+    def test_strict_upload_reports_the_row_before_copy(self):
+        resp = self.upload(b"sku,uid,region,qty\nA,,EU,1\nZ,,EU,2\n")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("row 3", resp.data["detail"])
+        self.assertIn("ref_parent(sku)", resp.data["detail"])
+        self.assertEqual(self.stored(), [])
+
+    def test_non_strict_upload_skips_offending_rows(self):
+        csv_body = b"sku,uid,region,qty\nA,,EU,1\nZ,,EU,2\nB,,XX,3\n,,,4\nB,,US,5\n"
+        for probe_batch, analyze in ((10_000, False), (2, False), (10_000, True)):
+            with self.subTest(probe_batch=probe_batch, analyze=analyze):
+                with connection.cursor() as cur:
+                    cur.execute("TRUNCATE public.ref_child")
+                    if analyze:
+                        cur.execute("ANALYZE public.ref_parent; ANALYZE public.ref_region")
+                with override_settings(CSV_INGEST_REFERENCE_PROBE_BATCH=probe_batch):
+                    resp = self.upload(csv_body, strict=False, force=True)
+
+                self.assertEqual(resp.status_code, 201, resp.data)
+                self.assertEqual(self.stored(), [("A", 1), (None, 4), ("B", 5)])
+                summary = {(g["column"], g["kind"]): g["count"] for g in resp.data["diagnostics"]["error_summary"]}
+                self.assertEqual(summary, {("sku", "reference"): 1, ("region", "reference"): 1})
+                self.assertEqual(
+                    [e["row"] for g in resp.data["diagnostics"]["error_summary"] for e in g["examples"]], [3, 4]
+                )
+
+    def test_keys_are_compared_as_the_parent_type(self):
+        resp = self.upload(b"sku,uid,region,qty\nA,A0EEBC99-9C0B-4EF8-BB6D-6BB9BD380A11,EU,1\n")
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+
+    def test_key_the_parent_type_refuses_is_a_reference_error(self):
+        IngestTable.objects.filter(name="ref_child").update(lookups={"region": "ref_parent.uid"})
+        registry.invalidate()
+
+        resp = self.upload(
+            b"sku,uid,region,qty\nA,,not-a-uuid,1\nA,,b0eebc99-9c0b-4ef8-bb6d-6bb9bd380a22,2\n", strict=False
+        )
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(self.stored(), [("A", 2)])
+        self.assertEqual(
+            [(g["column"], g["kind"]) for g in resp.data["diagnostics"]["error_summary"]], [("region", "reference")]
+        )
+
+    def test_key_out_of_the_parent_integer_range_is_a_reference_error(self):
+        # ref_small was never analyzed, so it is probed rather than read into a set
+        IngestTable.objects.create(name="ref_big_child", lookups={"big": "ref_small.id"})
+
+        resp = self.upload(b"big\n2\n99999999999\n", table="ref_big_child")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("row 3", resp.data["detail"])
+        self.assertIn("ref_small(id)", resp.data["detail"])
+
+    def test_lookups_are_checked_without_the_flag(self):
+        resp = self.upload(b"sku,uid,region,qty\nA,,XX,1\n", check_references=False)
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("ref_region(code)", resp.data["detail"])
+
+    def test_unknown_lookup_table(self):
+        IngestTable.objects.filter(name="ref_child").update(lookups={"region": "no_such_table.code"})
+        registry.invalidate()
+
+        resp = self.upload(b"sku,uid,region,qty\nA,,EU,1\n")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("no_such_table", resp.data["detail"])
@@ -0,0 +1,122 @@
+import datetime
+import decimal
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from ingest import renderers
+
+
+class TableDataFormatTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.products_test;
+                CREATE TABLE public.products_test (
+                    id    integer PRIMARY KEY,
+                    price numeric(10,2),
+                    seen  timestamptz,
+                    attrs jsonb
+                );
+                INSERT INTO public.products_test
+                SELECT g, g * 1.5, '2024-01-01T00:00:00Z'::timestamptz + g * interval '1 hour',
+                       jsonb_build_object('n', g)
+                FROM generate_series(1, 25) g;
+            """)
+
+    def get(self, accept=None, **params):
+        extra = {"HTTP_ACCEPT": accept} if accept else {}
+        return self.client.get(reverse("get-table-data"), {"table": "products_test", "order_by": "id", **params}, **extra)
+
+    def test_pagination_runs_in_sql(self):
+        resp = self.get(page=3, limit=10)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["total_rows"], 25)
+        self.assertEqual(resp.data["total_pages"], 3)
+        self.assertEqual([r["id"] for r in resp.data["results"]], [21, 22, 23, 24, 25])
+        self.assertEqual(self.get(page=4, limit=10).status_code, 400)
+        self.assertEqual(self.get(page=0).status_code, 400)
+
+    def test_limit_is_validated(self):
+        self.assertEqual(self.get(limit=0).status_code, 400)
+        self.assertEqual(self.get(limit="ten").status_code, 400)
+
+    def test_json_matches_drf_encoding(self):
+        resp = self.get(limit=1)
+
+        self.assertEqual(resp["Content-Type"], "application/json")
+        row = json.loads(resp.content)["results"][0]
+        self.assertEqual(row["price"], 1.5)
+        self.assertEqual(row["seen"], "2024-01-01T01:00:00Z")
+        self.assertEqual(json.loads(row["attrs"]), {"n": 1})
+
+    @unittest.skipUnless(renderers.msgpack, "msgpack not installed")
+    def test_msgpack(self):
+        resp = self.get(accept="application/msgpack", limit=5)
+
+        self.assertEqual(resp.status_code, 200)
+        body = renderers.msgpack.unpackb(resp.content)
+        self.assertEqual([r["id"] for r in body["results"]], [1, 2, 3, 4, 5])
+
+    @unittest.skipUnless(renderers.pyarrow, "pyarrow not installed")
+    def test_arrow_stream(self):
+        resp = self.get(accept="application/vnd.apache.arrow.stream", limit=5)
+
+        self.assertEqual(resp.status_code, 200)
+        table = renderers.pyarrow.ipc.open_stream(resp.content).read_all()
+        self.assertEqual(table.column_names, ["id", "price", "seen", "attrs"])
+        self.assertEqual(table.column("id").to_pylist(), [1, 2, 3, 4, 5])
+        self.assertEqual(json.loads(table.schema.metadata[b"total_rows"]), 25)
+
+
+@unittest.skipUnless(renderers.orjson, "orjson not installed")
+class ORJSONRendererTests(SimpleTestCase):
+
+    def test_same_output_as_drf_renderer(self):
+        data = {
+            "rows": [(1, decimal.Decimal("2.50"), datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+                      datetime.date(2024, 1, 2), {"a": [1, None]}, None)],
+            "microseconds": [
+                datetime.datetime(2024, 1, 1, 10, 0, 0, 123456, tzinfo=datetime.timezone.utc),
+                datetime.datetime(2024, 1, 1, 10, 0, 0, 999999),
+                datetime.time(8, 30, 0, 500),
+            ],
+        }
+        self.assertEqual(renderers.ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+        # the path taken with a DRF that formats datetimes differently from orjson
+        passthrough = renderers.orjson.OPT_NON_STR_KEYS | renderers.orjson.OPT_PASSTHROUGH_DATETIME
+        with mock.patch.object(renderers, "ORJSON_OPTIONS", passthrough):
+            self.assertEqual(renderers.ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class BenchFormatsCommandTests(TestCase):
+
+    def test_bench_formats_writes_report(self):
+        fd, out = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            call_command(
+                "bench_formats", page_sizes="50,100", rounds=1, warmup=0, output=out,
+                database=connection.settings_dict["NAME"], stdout=io.StringIO(),
+            )
+            with open(out) as fh:
+                report = json.load(fh)
+        finally:
+            os.unlink(out)
+
+        self.assertIn("drf_json@100", report["results"])
+        self.assertGreater(report["results"]["drf_json@100"]["bytes"], report["results"]["drf_json@50"]["bytes"])
@@ -0,0 +1,49 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ingest.utils.replay import load_log
+
+
+class ReplayRequestsTests(TestCase):
+
+    def setUp(self):
+        fd, self.log = tempfile.mkstemp(suffix=".jsonl")
+        with os.fdopen(fd, "w") as fh:
+            fh.write(json.dumps({"endpoint": "get-relations"}) + "\n")
+            fh.write("# comments and blank lines are skipped\n\n")
+            fh.write(json.dumps({"endpoint": "get-relations"}) + "\n")
+            fh.write(json.dumps({"endpoint": "get-table-data", "params": {"table": "fake_table"}}) + "\n")
+
+    def tearDown(self):
+        os.unlink(self.log)
+
+    def test_load_log(self):
+        entries = load_log(self.log)
+        self.assertEqual([e["endpoint"] for e in entries], ["get-relations", "get-relations", "get-table-data"])
+        self.assertEqual(entries[0]["params"], {})
+
+    def test_replay_reports_per_endpoint(self):
+        fd, out = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            call_command("replay_requests", self.log, concurrency=2, output=out, stdout=io.StringIO())
+            with open(out) as fh:
+                report = json.load(fh)
+        finally:
+            os.unlink(out)
+
+        self.assertEqual(report["requests"], 3)
+        relations = report["endpoints"]["get-relations"]
+        self.assertEqual(relations["requests"], 2)
+        self.assertEqual(relations["error_rate"], 0)
+        self.assertGreaterEqual(relations["p99_ms"], relations["p50_ms"])
+
+        # fake_table is not allowed -> 403 counts as an error
+        table_data = report["endpoints"]["get-table-data"]
+        self.assertEqual(table_data["errors"], 1)
+        self.assertEqual(table_data["statuses"], {"403": 1})
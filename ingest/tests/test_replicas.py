@@ -0,0 +1,142 @@
+import io
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from ingest.models import IngestTable
+from ingest.utils.replicas import ReplicaSet, read_alias, replicas
+from ingest.utils.table_registry import registry
+
+
+@override_settings(
+    CSV_INGEST_READ_REPLICAS=["r1", "r2", "r3"], CSV_INGEST_REPLICA_MAX_LAG=10, CSV_INGEST_REPLICA_LAG_CHECK=60
+)
+class ReplicaSetTests(SimpleTestCase):
+
+    def test_round_robin_over_replicas_within_the_lag_limit(self):
+        lags = {"r1": 0.0, "r2": 30.0, "r3": 2.5}
+        rs = ReplicaSet(probe=lags.get)
+
+        self.assertEqual([rs.pick() for _ in range(4)], ["r1", "r3", "r1", "r3"])
+
+    def test_primary_when_no_replica_qualifies(self):
+        rs = ReplicaSet(probe=lambda alias: float("inf"))
+
+        self.assertEqual(rs.pick(), "default")
+
+    def test_lag_is_measured_once_per_check_interval(self):
+        probe = mock.Mock(return_value=0.0)
+        rs = ReplicaSet(probe=probe)
+        for _ in range(5):
+            rs.pick()
+        self.assertEqual(probe.call_count, 3)
+
+        with override_settings(CSV_INGEST_REPLICA_LAG_CHECK=0):
+            rs.pick()
+        self.assertEqual(probe.call_count, 6)
+
+    def test_replica_is_used_again_once_it_catches_up(self):
+        lags = {"r1": 60.0, "r2": 60.0, "r3": 60.0}
+        rs = ReplicaSet(probe=lags.get)
+        self.assertEqual(rs.pick(), "default")
+
+        lags["r2"] = 0.0
+        self.assertEqual(rs.pick(), "default")  # still the old reading
+        rs.reset()
+        self.assertEqual(rs.pick(), "r2")
+
+
+@override_settings(CSV_INGEST_READ_REPLICAS=["replica"], CSV_INGEST_READ_YOUR_WRITES=10)
+class ReadYourWritesTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.replica_test;
+                CREATE TABLE public.replica_test(id integer, name text);
+            """)
+
+    def setUp(self):
+        cache.clear()
+        registry.invalidate()
+        IngestTable.objects.create(name="replica_test")
+        patcher = mock.patch.object(replicas, "pick", return_value="replica")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_from(self, addr):
+        return read_alias(RequestFactory().get("/", REMOTE_ADDR=addr))
+
+    def test_uploading_client_reads_from_the_primary(self):
+        self.assertEqual(self.read_from("10.0.0.1"), "replica")
+
+        resp = self.client.post(
+            reverse("upload-csv"),
+            data={"table_name": "replica_test", "file": io.BytesIO(b"id,name\n1,a\n")},
+            format="multipart",
+            REMOTE_ADDR="10.0.0.1",
+        )
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(self.read_from("10.0.0.1"), "default")
+        self.assertEqual(self.read_from("10.0.0.2"), "replica")
+
+    def test_failed_upload_does_not_pin_the_client(self):
+        self.client.post(
+            reverse("upload-csv"),
+            data={"table_name": "replica_test", "file": io.BytesIO(b"id,name\nx,a\n")},
+            format="multipart",
+            REMOTE_ADDR="10.0.0.1",
+        )
+
+        self.assertEqual(self.read_from("10.0.0.1"), "replica")
+
+    @override_settings(CSV_INGEST_READ_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(self.read_from("10.0.0.1"), "default")
+
+
+@override_settings(CSV_INGEST_READ_REPLICAS=["replica_test"])
+class ReplicaQueryTests(APITransactionTestCase):
+    # A second connection to the test database plays the replica, so data must be committed
+    serialized_rollback = True
+
+    def setUp(self):
+        connections.settings["replica_test"] = dict(connections["default"].settings_dict)
+
+        def drop_alias():
+            connections["replica_test"].close()
+            del connections["replica_test"]
+            del connections.settings["replica_test"]
+        self.addCleanup(drop_alias)
+
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.replica_test;
+                CREATE TABLE public.replica_test(id integer, name text);
+                INSERT INTO public.replica_test VALUES (1, 'a'), (2, 'b');
+            """)
+        IngestTable.objects.create(name="replica_test")
+        registry.invalidate()
+        replicas.reset()
+        cache.clear()
+
+    def tearDown(self):
+        with connection.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS public.replica_test")
+        registry.invalidate()
+
+    def test_reads_run_on_a_replica(self):
+        with CaptureQueriesContext(connections["replica_test"]) as queries:
+            resp = self.client.get(reverse("get-table-data"), {"table": "replica_test"})
+            agg = self.client.get(reverse("aggregate"), {"table": "replica_test", "metrics": "count"})
+
+        self.assertEqual(resp.data["total_rows"], 2)
+        self.assertEqual(agg.data["rows"], [{"count": 2}])
+        self.assertTrue(any("replica_test" in q["sql"] for q in queries.captured_queries))
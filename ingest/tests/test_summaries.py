@@ -0,0 +1,131 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from ingest.models import IngestTable, SummaryView
+from ingest.tests.mixins import UploadMixin
+from ingest.utils.table_registry import registry
+
+
+class SummaryViewTests(UploadMixin, APITestCase):
+
+    upload_table = "summary_test"
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP MATERIALIZED VIEW IF EXISTS public.summary_active;
+                DROP MATERIALIZED VIEW IF EXISTS public.summary_cheap;
+                DROP TABLE IF EXISTS public.summary_test;
+                CREATE TABLE public.summary_test(
+                    id     integer PRIMARY KEY,
+                    sku    text NOT NULL,
+                    status text NOT NULL,
+                    price  numeric(10,2) NOT NULL,
+                    note   text
+                );
+            """)
+
+    def setUp(self):
+        registry.invalidate()
+        IngestTable.objects.create(name="summary_test")
+        SummaryView.objects.create(
+            name="summary_active", table_name="summary_test", filters={"status": "active"},
+            fields=["id", "sku", "status", "price"], unique_key="id",
+        )
+        SummaryView.objects.create(name="summary_cheap", table_name="summary_test", filters={"price__lte": "10"})
+
+    def upload(self, content, refresh=True):
+        with self.captureOnCommitCallbacks(execute=refresh):
+            resp = super().upload(content, force=True)
+        self.assertEqual(resp.status_code, 201, resp.data)
+
+    def query(self, **params):
+        resp = self.client.get(reverse("get-table-data"), {"table": "summary_test", "limit": 100, **params})
+        self.assertEqual(resp.status_code, 200, resp.data)
+        return resp.data
+
+    CSV = (
+        b"id,sku,status,price,note\n"
+        b"1,A,active,5.00,x\n"
+        b"2,B,inactive,5.00,\n"
+        b"3,C,active,20.00,y\n"
+    )
+
+    def test_matching_requests_are_served_from_the_summary(self):
+        self.upload(self.CSV)
+
+        data = self.query(status="active", sku__in="A,C", fields="id,sku", order_by="id DESC")
+        self.assertEqual(data["summary"], "summary_active")
+        self.assertEqual([r["id"] for r in data["results"]], [3, 1])
+
+        data = self.query(price__lte="10")
+        self.assertEqual(data["summary"], "summary_cheap")
+        self.assertEqual([r["note"] for r in data["results"]], ["x", None])
+
+    def test_requests_the_summary_does_not_cover_read_the_table(self):
+        self.upload(self.CSV)
+
+        for params in (
+            {"status": "active"},                        # SELECT * needs the note column
+            {"status": "active", "fields": "id,note"},
+            {"status": "inactive", "fields": "id"},
+            {"status": "active", "fields": "id", "order_by": "lower(sku)"},
+            {"price__lte": "11"},
+        ):
+            with self.subTest(params=params):
+                self.assertNotIn("summary", self.query(**params))
+
+    def test_loads_refresh_the_summaries(self):
+        self.upload(self.CSV)
+        self.upload(b"id,sku,status,price,note\n4,D,active,1.00,z\n")
+
+        data = self.query(status="active", fields="id")
+        self.assertEqual(data["summary"], "summary_active")
+        self.assertEqual(data["total_rows"], 3)
+
+    def test_stale_summaries_are_not_read(self):
+        self.upload(self.CSV)
+        SummaryView.objects.update(version=F("version") + 1)
+
+        data = self.query(status="active", fields="id")
+        self.assertNotIn("summary", data)
+        self.assertEqual(data["total_rows"], 2)
+
+    def test_load_marks_summaries_stale_before_the_refresh(self):
+        self.upload(self.CSV)
+        self.upload(b"id,sku,status,price,note\n4,D,active,1.00,z\n", refresh=False)
+
+        data = self.query(status="active", fields="id")
+        self.assertNotIn("summary", data)
+        self.assertEqual(data["total_rows"], 3)
+
+    def test_changed_definition_is_rebuilt(self):
+        self.upload(self.CSV)
+        summary = SummaryView.objects.get(name="summary_cheap")
+        summary.filters = {"price__lte": "30"}
+        summary.save()
+        registry.invalidate()
+        self.assertNotIn("summary", self.query(price__lte="30"))
+
+        call_command("refresh_summaries", "summary_test", stdout=io.StringIO())
+
+        data = self.query(price__lte="30")
+        self.assertEqual(data["summary"], "summary_cheap")
+        self.assertEqual(data["total_rows"], 3)
+
+    def test_broken_summary_is_left_stale(self):
+        SummaryView.objects.create(name="summary_broken", table_name="summary_test", fields=["missing"])
+
+        with self.assertLogs("ingest.utils.summaries", "ERROR"):
+            self.upload(self.CSV)
+
+        self.assertEqual(
+            dict(SummaryView.objects.values_list("name", "refreshed_version")),
+            {"summary_active": 1, "summary_cheap": 1, "summary_broken": -1},
+        )
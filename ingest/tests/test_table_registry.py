@@ -0,0 +1,83 @@
+from django.db import connection
+from rest_framework.test import APITestCase
+
+from ingest.models import IngestTable
+from ingest.tests.mixins import UploadMixin
+from ingest.utils.table_registry import registry
+
+
+class TableRegistryTests(UploadMixin, APITestCase):
+
+    upload_table = "registry_test"
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.registry_test;
+                CREATE TABLE public.registry_test(
+                    sku TEXT PRIMARY KEY,
+                    qty INTEGER NOT NULL
+                );
+            """)
+
+    def tearDown(self):
+        registry.invalidate()
+
+    def test_saving_a_table_takes_effect_immediately(self):
+        self.assertEqual(self.upload(b"sku,qty\nA,1\n").status_code, 403)
+
+        IngestTable.objects.create(name="registry_test")
+
+        self.assertEqual(self.upload(b"sku,qty\nA,1\n").status_code, 201)
+
+    def test_max_upload_bytes(self):
+        IngestTable.objects.create(name="registry_test", max_upload_bytes=10)
+
+        resp = self.upload(b"sku,qty\nA,1\nB,2\n")
+        self.assertEqual(resp.status_code, 413)
+
+    def test_upsert_load_mode_uses_conflict_key(self):
+        IngestTable.objects.create(name="registry_test", load_mode="upsert", conflict_key="sku")
+
+        self.assertEqual(self.upload(b"sku,qty\nA,1\nB,2\n").status_code, 201)
+        resp = self.upload(b"sku,qty\nA,10\nC,3\nC,4\n")
+
+        self.assertEqual(resp.status_code, 201)
+        with connection.cursor() as cur:
+            cur.execute("SELECT sku, qty FROM public.registry_test ORDER BY sku")
+            self.assertEqual(cur.fetchall(), [("A", 10), ("B", 2), ("C", 4)])
+
+    def test_upsert_without_conflict_key_is_rejected(self):
+        IngestTable.objects.create(name="registry_test")
+
+        resp = self.upload(b"sku,qty\nA,1\n", load_mode="upsert")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_schema_follows_ddl_without_invalidation(self):
+        IngestTable.objects.create(name="registry_test")
+        self.assertEqual([c["column"] for c in registry.schema("registry_test")], ["sku", "qty"])
+
+        with connection.cursor() as cur:
+            cur.execute("ALTER TABLE public.registry_test ADD COLUMN note text")
+        self.assertEqual([c["column"] for c in registry.schema("registry_test")], ["sku", "qty", "note"])
+
+        # same transaction, same xmin: the rewritten catalog row still moves
+        with connection.cursor() as cur:
+            cur.execute("ALTER TABLE public.registry_test ALTER COLUMN qty TYPE bigint")
+        self.assertEqual(registry.schema("registry_test")[1]["data_type"], "bigint")
+
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE public.registry_test;
+                CREATE TABLE public.registry_test(sku text, price numeric);
+            """)
+        self.assertEqual([c["column"] for c in registry.schema("registry_test")], ["sku", "price"])
+
+    def test_schema_cache_outlives_registry_reloads(self):
+        IngestTable.objects.create(name="registry_test")
+        registry.schema("registry_test")
+        registry.reload()
+
+        with self.assertNumQueries(1):
+            registry.schema("registry_test")
@@ -0,0 +1,133 @@
+from django.db import connection
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from ingest.models import IngestTable
+from ingest.tests.mixins import UploadMixin
+from ingest.utils.table_registry import registry
+from ingest.utils.transform import FUNCTIONS, compile_expression, compile_transform
+
+
+class TransformUploadTests(UploadMixin, APITestCase):
+
+    upload_table = "transform_test"
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.transform_test;
+                CREATE TABLE public.transform_test(
+                    sku    text NOT NULL,
+                    status text NOT NULL,
+                    qty    integer NOT NULL,
+                    price  numeric(10,2) NOT NULL,
+                    total  numeric(12,2)
+                );
+            """)
+
+    def setUp(self):
+        registry.invalidate()
+        IngestTable.objects.create(
+            name="transform_test",
+            transform={
+                "rename": {"Product SKU": "sku", "Unit Price": "price"},
+                "trim": True,
+                "defaults": {"qty": "1"},
+                "map": {"status": {"A": "active", "I": "inactive"}},
+                "derive": {"total": "float(price) * int(qty) if price else None"},
+            },
+        )
+
+    def stored(self):
+        with connection.cursor() as cur:
+            cur.execute("SELECT sku, status, qty, price::text, total::text FROM public.transform_test ORDER BY sku")
+            return cur.fetchall()
+
+    def test_transform_is_applied_while_validating(self):
+        resp = self.upload(
+            b"Product SKU,status,qty,Unit Price\n"
+            b"  A-1 ,A,2,1.50\n"
+            b"B-2,I,,3\n"
+            b"C-3, X ,4, 2.25\n"
+        )
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(
+            self.stored(),
+            [
+                ("A-1", "active", 2, "1.50", "3.00"),
+                ("B-2", "inactive", 1, "3.00", "3.00"),
+                ("C-3", "X", 4, "2.25", "9.00"),
+            ],
+        )
+
+    def test_derive_errors_are_row_errors(self):
+        resp = self.upload(b"Product SKU,status,qty,Unit Price\nA-1,A,2,1.50\nB-2,A,two,3\n", strict=False)
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(resp.data["inserted_rows"], 1)
+        self.assertEqual(resp.data["diagnostics"]["error_summary"][0]["column"], "total")
+
+    def test_missing_expression_column_is_rejected(self):
+        resp = self.upload(b"Product SKU,status,qty\nA-1,A,2\n")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("price", resp.data["detail"])
+
+    def test_dry_run_sample_applies_transform(self):
+        resp = self.upload(b"Product SKU,status,qty,Unit Price\nA-1,A,,1.50\n", dry_run=True, sample=10)
+
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual(resp.data["diagnostics"]["sample_errors"], 0)
+        self.assertEqual(resp.data["diagnostics"]["columns"]["qty"]["nulls"], 0)
+
+
+class CompileTransformTests(SimpleTestCase):
+
+    def test_unsafe_expressions_are_refused(self):
+        for source in (
+            "__import__('os')",
+            "price.__class__",
+            "open('/etc/passwd')",
+            "int(x=1)",
+            "2 ** 1000000",
+            "[c for c in sku]",
+            "lambda: 1",
+        ):
+            with self.subTest(source=source):
+                with self.assertRaises(ValueError):
+                    compile_expression(source)
+
+    def test_expression_reads_columns_not_functions(self):
+        _, columns = compile_expression("upper(sku[:3]) + '-' + coalesce(region, 'EU')")
+        self.assertEqual(columns, {"sku", "region"})
+
+    def test_derived_columns_can_use_earlier_ones(self):
+        transform = compile_transform({"derive": {"a": "int(x) + 1", "b": "int(a) * 2"}})
+
+        self.assertEqual(transform.reads, {"x"})
+        self.assertEqual(transform({"x": "3"}), {"x": "3", "a": "4", "b": "8"})
+
+    def test_rows_share_one_scope(self):
+        transform = compile_transform({"derive": {"a": "upper(x)"}})
+        scope = transform.scope
+
+        self.assertEqual([transform({"x": v})["a"] for v in ("p", "q")], ["P", "Q"])
+        self.assertIs(transform.scope, scope)
+        self.assertEqual(set(scope), {"__builtins__", *FUNCTIONS})
+
+    def test_malformed_specs(self):
+        for spec in (
+            {"renames": {}},
+            {"trim": "yes"},
+            {"defaults": {"qty": 0}},
+            {"map": {"status": {"A": 1}}},
+            {"derive": {"total": "price +"}},
+        ):
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    compile_transform(spec)
+
+    def test_empty_spec_is_no_transform(self):
+        self.assertIsNone(compile_transform({}))
@@ -0,0 +1,99 @@
+import hashlib
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from ingest.models import UploadLedger
+from ingest.tests.mixins import UploadMixin
+from ingest.utils import ledger
+from ingest.utils.csv_validator import validate_csv
+
+CONTENT = b"name,qty\nPen,10\nMarker,7\n"
+
+
+class UploadLedgerTests(UploadMixin, APITestCase):
+
+    upload_table = "_t"
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public._t;
+                CREATE TABLE public._t(name text NOT NULL, qty integer NOT NULL);
+                DROP TABLE IF EXISTS public.notnull_test;
+                CREATE TABLE public.notnull_test(name text NOT NULL, qty integer NOT NULL);
+            """)
+
+    def count(self, table="_t"):
+        with connection.cursor() as cur:
+            cur.execute(f"SELECT count(*) FROM public.{table}")
+            return cur.fetchone()[0]
+
+    def test_repeated_upload_returns_original_result(self):
+        first = self.upload(CONTENT)
+        second = self.upload(CONTENT)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(first.data["checksum"], hashlib.blake2b(CONTENT, digest_size=32).hexdigest())
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data["inserted_rows"], 2)
+        self.assertEqual(second.data["duplicate_upload"]["checksum"], first.data["checksum"])
+        self.assertEqual(self.count(), 2)
+
+        entry = UploadLedger.objects.get()
+        self.assertEqual((entry.table_name, entry.row_count, entry.size), ("_t", 2, len(CONTENT)))
+
+    def test_force_loads_again(self):
+        self.upload(CONTENT)
+        resp = self.upload(CONTENT, force=True)
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(self.count(), 4)
+        self.assertEqual(UploadLedger.objects.count(), 1)
+
+    def test_same_file_into_another_table(self):
+        self.upload(CONTENT)
+        resp = self.upload(CONTENT, table="notnull_test")
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(self.count("notnull_test"), 2)
+
+    def test_failed_and_dry_run_uploads_are_not_recorded(self):
+        bad = b"name,qty\nPen,lots\n"
+        self.assertEqual(self.upload(bad).status_code, 400)
+        self.assertEqual(self.upload(bad).status_code, 400)
+        self.assertEqual(self.upload(CONTENT, dry_run=True).status_code, 200)
+
+        self.assertFalse(UploadLedger.objects.exists())
+        self.assertEqual(self.upload(CONTENT).status_code, 201)
+
+    @override_settings(CSV_INGEST_SPOOL_THRESHOLD=0)
+    def test_spooled_upload_is_hashed_while_received(self):
+        first = self.upload(CONTENT)
+        with override_settings(CSV_INGEST_SPOOL_THRESHOLD=10**9):
+            second = self.upload(CONTENT)
+
+        self.assertEqual(first.data["checksum"], hashlib.blake2b(CONTENT, digest_size=32).hexdigest())
+        self.assertEqual(second.status_code, 200)
+
+    def test_file_is_validated_before_the_upload_is_locked(self):
+        calls = []
+
+        def validate(*args, **kwargs):
+            calls.append("validate")
+            return validate_csv(*args, **kwargs)
+
+        def lock(*args):
+            calls.append("lock")
+            return ledger.lock_upload(*args)
+
+        with mock.patch("ingest.views.upload_csv.validate_csv", side_effect=validate), \
+                mock.patch("ingest.views.upload_csv.lock_upload", side_effect=lock):
+            self.assertEqual(self.upload(CONTENT).status_code, 201)
+            self.assertEqual(self.upload(CONTENT).status_code, 200)
+
+        # the repeat is answered from the ledger without reading the file
+        self.assertEqual(calls, ["validate", "lock"])
@@ -0,0 +1,136 @@
+import io
+import json
+import threading
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APITransactionTestCase
+
+from ingest.models import IngestTable
+from ingest.tests.mixins import UploadMixin
+from ingest.utils.csv_validator import validate_csv
+from ingest.utils.db_schema import get_table_schema
+from ingest.utils.partitions import copy_rows
+from ingest.utils.progress import UploadProgress
+from ingest.utils.table_registry import registry
+
+CREATE_TABLE = """
+    DROP TABLE IF EXISTS public.progress_test;
+    CREATE TABLE public.progress_test(id integer PRIMARY KEY, name text NOT NULL);
+"""
+
+
+def csv_body(n, start=0):
+    return ("id,name\n" + "".join(f"{i},name {i}\n" for i in range(start, start + n))).encode()
+
+
+def parse_events(resp):
+    events = []
+    for block in b"".join(resp.streaming_content).decode().split("\n\n"):
+        if block:
+            name, data = block.split("\n")
+            events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+@override_settings(CSV_INGEST_PROGRESS_INTERVAL=0.001)
+class StreamedUploadTests(UploadMixin, APITransactionTestCase):
+
+    upload_table = "progress_test"
+    upload_defaults = {"stream": True}
+    # The upload runs in its own thread, on its own connection, so it must see committed data
+    serialized_rollback = True
+
+    def setUp(self):
+        with connection.cursor() as cur:
+            cur.execute(CREATE_TABLE)
+        IngestTable.objects.create(name="progress_test")
+        registry.invalidate()
+
+    def tearDown(self):
+        with connection.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS public.progress_test")
+        registry.invalidate()
+
+    def test_progress_events_then_result(self):
+        content = csv_body(20_000)
+        resp = self.upload(content)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        events = parse_events(resp)
+        self.assertEqual(events[0][0], "progress")
+        self.assertEqual(events[0][1]["total_bytes"], len(content))
+        self.assertIsNone(events[0][1]["total_rows"])  # in memory: not counted
+        self.assertTrue(all(name == "progress" for name, _ in events[:-1]))
+        counts = [data["rows_validated"] for _, data in events[:-1]]
+        self.assertEqual(counts, sorted(counts))
+
+        name, result = events[-1]
+        self.assertEqual(name, "result")
+        self.assertEqual(result["status"], 201)
+        self.assertEqual(result["inserted_rows"], 20_000)
+        with connection.cursor() as cur:
+            cur.execute("SELECT count(*) FROM public.progress_test")
+            self.assertEqual(cur.fetchone()[0], 20_000)
+
+    @override_settings(CSV_INGEST_SPOOL_THRESHOLD=0)
+    def test_spooled_upload_reports_total_rows(self):
+        events = parse_events(self.upload(csv_body(500)))
+
+        self.assertEqual(events[0][1]["total_rows"], 500)
+        self.assertEqual(events[-1][1]["inserted_rows"], 500)
+
+    def test_upload_finishes_after_the_client_goes_away(self):
+        resp = self.upload(csv_body(100_000))
+        events = iter(resp.streaming_content)
+        self.assertIn(b"event: progress", next(events))
+
+        # what the server does when the client disconnects; this closes the request's uploads
+        resp.close()
+
+        self.assertFalse([t for t in threading.enumerate() if t.name == "upload-stream"])
+        with connection.cursor() as cur:
+            cur.execute("SELECT count(*) FROM public.progress_test")
+            self.assertEqual(cur.fetchone()[0], 100_000)
+
+    def test_failed_load_is_reported_in_the_result_event(self):
+        resp = self.upload(b"id,name\n1,a\nx,b\n")
+
+        name, result = parse_events(resp)[-1]
+        self.assertEqual(name, "result")
+        self.assertEqual(result["status"], 400)
+        self.assertIn("row 3", result["detail"])
+
+    def test_request_errors_are_not_streamed(self):
+        resp = self.upload(csv_body(1), table="not_allowed")
+
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(resp.streaming)
+
+
+class ProgressCountersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute(CREATE_TABLE)
+
+    def test_validation_counts_bytes_and_rows(self):
+        content = csv_body(10_000) + b"x,bad\n"
+        progress = UploadProgress(len(content))
+
+        validate_csv(io.BytesIO(content), get_table_schema("progress_test"), strict=False, progress=progress)
+
+        self.assertEqual(progress.bytes_read, len(content))
+        self.assertEqual((progress.rows_validated, progress.errors), (10_000, 1))
+
+    @override_settings(CSV_INGEST_COPY_BATCH_ROWS=300)
+    def test_copy_counts_rows_per_chunk(self):
+        rows = [{"id": i, "name": "n"} for i in range(1000)]
+        progress = UploadProgress()
+
+        copy_rows("progress_test", rows, ["id", "name"], progress=progress)
+
+        self.assertEqual(progress.rows_copied, 1000)
+        self.assertEqual(progress.snapshot()["rows_copied"], 1000)
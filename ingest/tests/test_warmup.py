@@ -0,0 +1,70 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from ingest.models import IngestTable
+from ingest.utils.table_registry import registry
+from ingest.utils.warmup import warm_up
+
+
+class WarmUpTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cur:
+            cur.execute("""
+                DROP TABLE IF EXISTS public.warmup_test;
+                CREATE TABLE public.warmup_test(
+                    sku TEXT PRIMARY KEY,
+                    attrs JSONB
+                );
+            """)
+
+    def tearDown(self):
+        registry.invalidate()
+
+    def test_caches_every_enabled_table_schema(self):
+        IngestTable.objects.create(name="warmup_test")
+
+        stats = warm_up()
+
+        self.assertIn("warmup_test", registry.relations())
+        self.assertEqual(stats["tables"], len(registry.relations()))
+        self.assertEqual(stats["failed"], [])
+        with self.assertNumQueries(1):  # the catalog version check only
+            schema = registry.schema("warmup_test")
+        self.assertEqual([c["column"] for c in schema], ["sku", "attrs"])
+
+    def test_unreadable_tables_are_reported_not_raised(self):
+        with connection.cursor() as cur:
+            cur.execute("CREATE TABLE public.warmup_empty()")
+        IngestTable.objects.create(name="warmup_empty")
+
+        stats = warm_up()
+
+        self.assertEqual(stats["failed"], ["warmup_empty"])
+
+
+class BenchStartupCommandTests(TestCase):
+
+    def test_bench_writes_json_report(self):
+        fd, out = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            call_command("bench_startup", rounds=1, top=3, output=out, stdout=io.StringIO())
+            with open(out) as fh:
+                report = json.load(fh)
+        finally:
+            os.unlink(out)
+
+        self.assertEqual(
+            set(report["results"]),
+            {"import", "warm_up", "first_lookups_cold", "first_lookups_warm", "uncached_lookups"},
+        )
+        self.assertEqual(len(report["import_profile"]), 3)
+        self.assertIn("django", report["import_profile"])
@@ -0,0 +1,48 @@
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+
+
+class SpoolingUploadHandler(FileUploadHandler):
+    """
+    Streams uploads larger than CSV_INGEST_SPOOL_THRESHOLD straight to a temp file,
+    counting newlines and hashing the chunks as they arrive so the row count and the
+    checksum used by the upload ledger are known without a re-read.
+    The spooled file is later read through mmap (see ingest.utils.csv_source).
+    Smaller uploads are passed on to the next handler (MemoryFileUploadHandler).
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.activated = content_length > settings.CSV_INGEST_SPOOL_THRESHOLD
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        if self.activated:
+            self.file = TemporaryUploadedFile(
+                self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+            )
+            self.line_count = 0
+            self.hasher = hashlib.blake2b(digest_size=32)
+            raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.activated:
+            return raw_data
+        self.file.write(raw_data)
+        self.line_count += raw_data.count(b"\n")
+        self.hasher.update(raw_data)
+
+    def file_complete(self, file_size):
+        if not self.activated:
+            return None
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.line_count = self.line_count
+        self.file.checksum = self.hasher.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        if getattr(self, "file", None) is not None:
+            self.file.close()  # NamedTemporaryFile removes itself on close
@@ -1,9 +1,12 @@
 from django.urls import path
-from .views import UploadCSVView, GetTableDataView
+from .views import UploadCSVView, UploadCSVBatchView, GetTableDataView, QuarantineDownloadView, AggregateTableView
 
 urlpatterns = [
     path("upload-csv/", UploadCSVView.as_view(), name="upload-csv"),
+    path("upload-csv-batch/", UploadCSVBatchView.as_view(), name="upload-csv-batch"),
     path("get-table-data/", GetTableDataView.as_view(), {"mode": "table"}, name="get-table-data"),
-    path("get-relations/", GetTableDataView.as_view(), {"mode": "relations"}, name="get-relations")
+    path("get-relations/", GetTableDataView.as_view(), {"mode": "relations"}, name="get-relations"),
+    path("aggregate/", AggregateTableView.as_view(), name="aggregate"),
+    path("quarantine/<uuid:quarantine_id>/", QuarantineDownloadView.as_view(), name="quarantine-download"),
 ]
 
@@ -0,0 +1,193 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts at a table slot held by another process, doubling up to the cap
+SLOT_POLL = 0.05
+SLOT_POLL_MAX = 1.0
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _slot_name(table: str, slot: int) -> str:
+    return f"ingest-admission:{table}:{slot}"
+
+
+def try_table_slots(table_limits: dict):
+    """
+    Takes one of the `limit` session advisory locks of every table in `table_limits`, so
+    the tables' `parallelism` holds across processes and hosts. Returns the lock names
+    taken, or None (holding nothing) when a table has no free slot. Try-locks never wait,
+    so uploads taking several tables cannot deadlock.
+    """
+    taken = []
+    with connection.cursor() as cur:
+        for table, limit in table_limits.items():
+            for slot in range(limit):
+                name = _slot_name(table, slot)
+                cur.execute("SELECT pg_try_advisory_lock(hashtextextended(%s, 0))", [name])
+                if cur.fetchone()[0]:
+                    taken.append(name)
+                    break
+            else:
+                release_table_slots(taken)
+                return None
+    return taken
+
+
+def release_table_slots(names):
+    """
+    Releases slots taken by try_table_slots(). They go away with the connection anyway, so
+    a failure here is only logged.
+    """
+    try:
+        with connection.cursor() as cur:
+            for name in names:
+                cur.execute("SELECT pg_advisory_unlock(hashtextextended(%s, 0))", [name])
+    except DatabaseError:
+        logger.exception("Could not release upload slots %s", names)
+
+
+class _Ticket:
+    __slots__ = ("tables", "weight", "table_limits")
+
+    def __init__(self, tables, weight, table_limits):
+        self.tables = tables
+        self.weight = weight
+        self.table_limits = table_limits
+
+
+class AdmissionController:
+    """
+    Per-process gate in front of uploads.
+
+    The process has CSV_INGEST_ADMISSION_CAPACITY slots. An upload takes one slot per
+    CSV_INGEST_ADMISSION_SLOT_BYTES of file (at least one, at most all of them), so one huge
+    load can hold as much capacity as many small ones. Each table also admits at most its
+    registry `parallelism` uploads at a time. Uploads that do not fit wait in a FIFO queue of at
+    most CSV_INGEST_ADMISSION_QUEUE entries for up to CSV_INGEST_ADMISSION_TIMEOUT seconds;
+    beyond that they are rejected with a Retry-After estimate. A waiter held back only by its
+    own table's limit does not block waiters for other tables.
+    The capacity is per process (it bounds the process's memory), but the table limits are
+    shared: once admitted here, an upload also takes a slot of each table in Postgres (see
+    try_table_slots), polling for one until the same deadline.
+    `shared=False` keeps the table limits per process, without touching the database.
+    """
+
+    def __init__(self, shared=True):
+        self.shared = shared
+        self._cond = threading.Condition()
+        self._used = 0
+        self._running = {}          # table -> uploads in progress
+        self._waiting = deque()
+        self._avg_hold = None       # moving average of seconds a slot is held
+
+    def weight(self, size: int) -> int:
+        capacity = settings.CSV_INGEST_ADMISSION_CAPACITY
+        return max(1, min(capacity, math.ceil(size / settings.CSV_INGEST_ADMISSION_SLOT_BYTES)))
+
+    def retry_after(self) -> int:
+        avg = self._avg_hold or 1.0
+        return max(1, math.ceil(avg * (len(self._waiting) + 1) / settings.CSV_INGEST_ADMISSION_CAPACITY))
+
+    def _table_free(self, ticket):
+        return all(self._running.get(t, 0) < ticket.table_limits[t] for t in ticket.tables)
+
+    def _can_run(self, ticket):
+        if not self._table_free(ticket):
+            return False
+        if self._used + ticket.weight > settings.CSV_INGEST_ADMISSION_CAPACITY:
+            return False
+        for other in self._waiting:
+            if other is ticket:
+                return True
+            if self._table_free(other):
+                return False  # an earlier upload that could run goes first
+        return True
+
+    def stats(self):
+        with self._cond:
+            return {"used": self._used, "waiting": len(self._waiting), "running": dict(self._running)}
+
+    @contextmanager
+    def admit(self, table_limits: dict, size: int):
+        """
+        Holds slots for an upload of `size` bytes into the tables in `table_limits`
+        ({table: max concurrent uploads}) for the duration of the block.
+        Raises AdmissionRejected when the queue is full or the wait times out.
+        """
+        ticket = _Ticket(tuple(table_limits), self.weight(size), {t: max(1, n) for t, n in table_limits.items()})
+        deadline = time.monotonic() + settings.CSV_INGEST_ADMISSION_TIMEOUT
+
+        with self._cond:
+            if not self._waiting and self._can_run(ticket):
+                pass
+            elif len(self._waiting) >= settings.CSV_INGEST_ADMISSION_QUEUE:
+                raise AdmissionRejected("Too many uploads in progress", self.retry_after())
+            else:
+                self._waiting.append(ticket)
+                try:
+                    while not self._can_run(ticket):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise AdmissionRejected("Timed out waiting for an upload slot", self.retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting.remove(ticket)
+                    # the queue changed; let the next waiter re-check
+                    self._cond.notify_all()
+
+            self._used += ticket.weight
+            for t in ticket.tables:
+                self._running[t] = self._running.get(t, 0) + 1
+
+        try:
+            slots = self._take_table_slots(ticket, deadline) if self.shared else []
+        except BaseException:
+            self._leave(ticket, None)
+            raise
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            if slots:
+                release_table_slots(slots)
+            self._leave(ticket, time.monotonic() - started)
+
+    def _take_table_slots(self, ticket, deadline):
+        pause = SLOT_POLL
+        while True:
+            slots = try_table_slots(ticket.table_limits)
+            if slots is not None:
+                return slots
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AdmissionRejected("Timed out waiting for an upload slot", self.retry_after())
+            time.sleep(min(pause, remaining))
+            pause = min(pause * 2, SLOT_POLL_MAX)
+
+    def _leave(self, ticket, held):
+        with self._cond:
+            self._used -= ticket.weight
+            for t in ticket.tables:
+                self._running[t] -= 1
+                if not self._running[t]:
+                    del self._running[t]
+            if held is not None:
+                self._avg_hold = held if self._avg_hold is None else 0.8 * self._avg_hold + 0.2 * held
+            self._cond.notify_all()
+
+
+admission = AdmissionController()
@@ -0,0 +1,82 @@
+from .build_where_clause import build_where_clause, filter_column
+from .db_schema import normalize_pg_type
+from .sql import quote_ident
+
+METRICS = ("count", "sum", "avg", "min", "max")
+NUMERIC_METRICS = ("sum", "avg")
+BUCKETS = ("minute", "hour", "day", "week", "month", "quarter", "year")
+
+
+def _split(value):
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+def build_aggregate_query(table: str, schema, group_by=None, metrics=None, bucket=None,
+                          filters=None, max_groups=None):
+    """
+    Builds one GROUP BY query over public.<table>.
+
+    group_by: "col1,col2"
+    metrics:  "count,sum:price,avg:price,max:created_at" (count alone counts rows,
+              count:col counts non-null values); defaults to "count"
+    bucket:   "created_at:day" groups a timestamp column by date_trunc
+    filters:  the same {key: value} syntax as get-table-data
+
+    Every column is checked against `schema`. Returns (sql, params, output column names).
+    Raises ValueError for unknown columns, metrics or bucket units.
+    """
+    types = {c["column"]: normalize_pg_type(c["data_type"]) for c in schema}
+
+    def column(name, what):
+        if name not in types:
+            raise ValueError(f"Unknown {what} column '{name}'")
+        return name
+
+    select, group, names = [], [], []
+
+    if bucket:
+        col, _, unit = bucket.partition(":")
+        column(col, "bucket")
+        if types[col] != "datetime":
+            raise ValueError(f"Bucket column '{col}' is not a date or timestamp column")
+        unit = unit or "day"
+        if unit not in BUCKETS:
+            raise ValueError(f"Bucket unit must be one of {', '.join(BUCKETS)}")
+        select.append(f"date_trunc('{unit}', {quote_ident(col)}) AS \"bucket\"")
+        group.append('"bucket"')
+        names.append("bucket")
+
+    for col in _split(group_by):
+        column(col, "group_by")
+        select.append(quote_ident(col))
+        group.append(quote_ident(col))
+        names.append(col)
+
+    for metric in _split(metrics) or ["count"]:
+        fn, _, col = metric.partition(":")
+        if fn not in METRICS:
+            raise ValueError(f"Unknown metric '{fn}'; use one of {', '.join(METRICS)}")
+        if not col:
+            if fn != "count":
+                raise ValueError(f"Metric '{fn}' needs a column, e.g. {fn}:price")
+            select.append('count(*) AS "count"')
+            names.append("count")
+            continue
+        column(col, "metric")
+        if fn in NUMERIC_METRICS and types[col] not in ("int", "float"):
+            raise ValueError(f"Metric '{fn}' needs a numeric column, '{col}' is not")
+        name = f"{fn}_{col}"
+        select.append(f"{fn}({quote_ident(col)}) AS {quote_ident(name)}")
+        names.append(name)
+
+    filters = filters or {}
+    for key in filters:
+        column(filter_column(key), "filter")
+    where_clause, params = build_where_clause(filters)
+
+    sql = f"SELECT {', '.join(select)} FROM public.{table} {where_clause}"
+    if group:
+        sql += f" GROUP BY {', '.join(group)} ORDER BY {', '.join(group)}"
+    if max_groups is not None:
+        sql += f" LIMIT {int(max_groups)}"
+    return sql, params, names
@@ -0,0 +1,80 @@
+import math
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connection
+
+
+def percentile(samples, pct: float):
+    """
+    Nearest-rank percentile of `samples` (pct in 0..100). Returns None for no samples.
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def check_bench_database(name):
+    """
+    The benchmarks create and drop their own tables: outside DEBUG they only run when
+    --database names the configured database, so one is not pointed at production by accident.
+    """
+    if settings.DEBUG or name == connection.settings_dict["NAME"]:
+        return
+    raise CommandError(
+        f"Refusing to benchmark against {connection.settings_dict['NAME']!r} with DEBUG off; "
+        "pass --database with that name to confirm"
+    )
+
+
+def summarize(samples):
+    """
+    pytest-benchmark style statistics (seconds) for a list of timings.
+    """
+    return {
+        "rounds": len(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "mean": statistics.fmean(samples),
+        "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "median": statistics.median(samples),
+        "ops": len(samples) / sum(samples) if sum(samples) else 0.0,
+    }
+
+
+def measure(fn, rounds: int = 5, warmup: int = 0, setup=None):
+    """
+    Calls `fn()` `warmup + rounds` times and returns (stats, last_result).
+    `setup()` runs before every call and is not timed.
+    """
+    samples = []
+    result = None
+    for i in range(warmup + rounds):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            samples.append(elapsed)
+    return summarize(samples), result
+
+
+def format_table(results: dict, title: str = "benchmark"):
+    """
+    Renders {name: stats} as a fixed-width table in the style of pytest-benchmark.
+    Times are shown in milliseconds.
+    """
+    header = f"{'Name':<28}{'Min':>12}{'Max':>12}{'Mean':>12}{'StdDev':>12}{'Median':>12}{'Rounds':>8}"
+    lines = [f"-- {title} (times in ms) ".ljust(len(header), "-"), header, "-" * len(header)]
+    for name, s in results.items():
+        lines.append(
+            f"{name:<28}{s['min'] * 1000:>12.2f}{s['max'] * 1000:>12.2f}{s['mean'] * 1000:>12.2f}"
+            f"{s['stddev'] * 1000:>12.2f}{s['median'] * 1000:>12.2f}{s['rounds']:>8}"
+        )
+    lines.append("-" * len(header))
+    return "\n".join(lines)
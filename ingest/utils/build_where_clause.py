@@ -1,3 +1,17 @@
+# Suffixes build_where_clause looks for in a filter key, in the order it checks them
+FILTER_SUFFIXES = ("__icontains", "__gte", "__lte", "__in")
+
+
+def filter_column(key: str) -> str:
+    """
+    Column a filter key applies to, matched the way build_where_clause does.
+    """
+    for suffix in FILTER_SUFFIXES:
+        if suffix in key:
+            return key.replace(suffix, "")
+    return key
+
+
 def build_where_clause(filters):
     where_parts = []
     params = []
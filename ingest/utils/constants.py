@@ -1 +1,4 @@
-ALLOWED_TABLES = ["products", "product_purchases", "products_query_test", "_t", "load_test_table", "products_test", "notnull_test", "jsontest"]
+# Load modes for IngestTable.load_mode / the upload `load_mode` field
+LOAD_APPEND = "append"
+LOAD_UPSERT = "upsert"
+LOAD_MODES = (LOAD_APPEND, LOAD_UPSERT)
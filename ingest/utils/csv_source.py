@@ -0,0 +1,215 @@
+import codecs
+import csv
+import io
+import mmap
+from dataclasses import dataclass
+
+# Decode/parse granularity. Large enough to amortise per-block overhead,
+# small enough that only a couple of blocks are alive at once.
+BLOCK_SIZE = 1 << 20
+
+# Bytes looked at to detect the encoding and dialect
+SNIFF_BYTES = 64 * 1024
+DELIMITERS = ",;\t|"
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+@dataclass(frozen=True)
+class CSVFormat:
+    encoding: str = "utf-8-sig"
+    delimiter: str = ","
+    quotechar: str = '"'
+    skipinitialspace: bool = False
+
+    def reader_kwargs(self):
+        return {"delimiter": self.delimiter, "quotechar": self.quotechar, "skipinitialspace": self.skipinitialspace}
+
+    def as_dict(self):
+        return {"encoding": self.encoding, "delimiter": self.delimiter, "quotechar": self.quotechar}
+
+
+def _detect_encoding(head: bytes) -> str:
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    # UTF-8 first: for the common case this one incremental decode is the whole cost.
+    # final=False tolerates a multi-byte character cut off at the end of the sample.
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(head, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            pass
+    return "latin-1"  # decodes any byte sequence
+
+
+def _detect_dialect(sample: str, delimiter=None, quotechar=None):
+    # Cut the sample back to whole lines so the sniffer never sees a half record
+    if "\n" in sample:
+        sample = sample[: sample.rfind("\n") + 1]
+    header = sample.split("\n", 1)[0]
+    found = [d for d in DELIMITERS if d in header]
+    kwargs = {}
+    if delimiter is None and len(found) <= 1:
+        # Unambiguous header (the usual case): skip the regex-heavy csv.Sniffer
+        kwargs["delimiter"] = found[0] if found else ","
+    elif delimiter is None or quotechar is None:
+        try:
+            sniffed = csv.Sniffer().sniff(sample, delimiters=delimiter or DELIMITERS)
+            # sniffed.doublequote is unreliable (False whenever the sample has no "" pair),
+            # so keep the standard CSV doubling rule
+            kwargs = {
+                "delimiter": sniffed.delimiter,
+                "quotechar": sniffed.quotechar or '"',
+                "skipinitialspace": sniffed.skipinitialspace,
+            }
+        except csv.Error:
+            kwargs["delimiter"] = found[0] if found else ","
+    if delimiter is not None:
+        kwargs["delimiter"] = delimiter
+    if quotechar is not None:
+        kwargs["quotechar"] = quotechar
+    return kwargs
+
+
+def detect_format(file_obj, encoding=None, delimiter=None, quotechar=None) -> CSVFormat:
+    """
+    Detects encoding (BOM, then UTF-8, cp1252, latin-1) and delimiter/quoting from the first
+    SNIFF_BYTES of the file. Explicit arguments win over detection.
+    Raises ValueError for an unknown encoding.
+    """
+    if encoding is not None:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            raise ValueError(f"Unknown encoding '{encoding}'")
+
+    if hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    head = file_obj.read(SNIFF_BYTES) or b""
+    if hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+
+    encoding = encoding or _detect_encoding(head)
+    sample = codecs.getincrementaldecoder(encoding)(errors="replace").decode(head, final=False)
+    return CSVFormat(encoding=encoding, **_detect_dialect(sample, delimiter, quotechar))
+
+
+def _ascii_compatible(encoding: str) -> bool:
+    # Record boundaries are found by scanning raw bytes for '\n' and '"', which only
+    # works when those characters are single ASCII bytes (not UTF-16/32)
+    try:
+        return '\n"'.encode(encoding) == b'\n"'
+    except (UnicodeError, LookupError):
+        return False
+
+
+def _decode_error(encoding, e):
+    return ValueError(f"File is not valid {encoding} ({e.reason} at byte {e.start} of a block); "
+                      f"pass the correct `encoding`")
+
+
+def _fileno(file_obj):
+    """
+    OS file descriptor behind an upload (spooled temp file or a real file), or None
+    for in-memory uploads.
+    """
+    try:
+        return file_obj.fileno()
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+
+def scan_record_boundaries(buf, start: int = 0, block_size: int = BLOCK_SIZE):
+    """
+    Yields (start, end) byte ranges of `buf` (bytes or mmap) that each hold whole CSV records.
+    Ranges end just after a newline that is outside a quoted field, roughly every `block_size` bytes,
+    so every range can be parsed (or handed to a worker) on its own.
+    Quote state is tracked by counting '"' bytes, which is valid for any ASCII-compatible encoding.
+    """
+    size = len(buf)
+    pos = start
+    while pos < size:
+        end = buf.find(b"\n", min(pos + block_size, size) - 1)
+        # mmap has no count(); slicing copies at most one block
+        quotes = buf[pos:end].count(b'"') if end != -1 else 0
+        while end != -1 and quotes % 2:
+            # newline sits inside a quoted field; move to the next one
+            nxt = buf.find(b"\n", end + 1)
+            quotes += buf[end:nxt].count(b'"') if nxt != -1 else 0
+            end = nxt
+        end = size if end == -1 else end + 1
+        yield pos, end
+        pos = end
+
+
+def _iter_mapped_lines(mm, encoding: str, progress=None):
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        for start, end in scan_record_boundaries(mm):
+            if progress is not None:
+                progress.bytes_read = end
+            try:
+                text = decoder.decode(mm[start:end], final=end == len(mm))
+            except UnicodeDecodeError as e:
+                raise _decode_error(encoding, e)
+            yield from io.StringIO(text, newline="")
+    finally:
+        mm.close()
+
+
+def _iter_chunked_lines(file_obj, encoding: str, progress=None):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    carry = ""
+    while True:
+        chunk = file_obj.read(BLOCK_SIZE)
+        if progress is not None:
+            progress.bytes_read += len(chunk)
+        try:
+            text = carry + decoder.decode(chunk or b"", final=not chunk)
+        except UnicodeDecodeError as e:
+            raise _decode_error(encoding, e)
+        if not chunk:
+            if text:
+                yield from io.StringIO(text, newline="")
+            return
+        cut = text.rfind("\n") + 1
+        carry = text[cut:]
+        if cut:
+            yield from io.StringIO(text[:cut], newline="")
+
+
+def iter_csv_lines(file_obj, encoding: str = "utf-8-sig", progress=None):
+    """
+    Streams decoded lines (line endings kept, as csv.reader expects) from an uploaded file.
+    Files on disk - uploads spooled by SpoolingUploadHandler or any real file - are read through
+    mmap so the OS page cache does the buffering; in-memory uploads are decoded chunk by chunk.
+    Either way the upload is never copied into one big bytes/str object. Decoding is
+    incremental, so multi-byte characters split across blocks are handled.
+    With an UploadProgress, `bytes_read` is updated once per block.
+    """
+    if hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    fileno = _fileno(file_obj)
+    if fileno is not None and getattr(file_obj, "size", None) != 0 and _ascii_compatible(encoding):
+        try:
+            mm = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            pass  # not mappable (pipe, empty file, ...)
+        else:
+            return _iter_mapped_lines(mm, encoding, progress)
+    return _iter_chunked_lines(file_obj, encoding, progress)
+
+
+def known_line_count(file_obj):
+    """
+    Newline count recorded while the upload was spooled, or None if it was not spooled.
+    """
+    return getattr(file_obj, "line_count", None)
@@ -1,9 +1,27 @@
 import csv
-import io
 import json
+import re
 from datetime import datetime
+from decimal import ROUND_HALF_UP, Context, Decimal, InvalidOperation
+from functools import lru_cache
 
-from .db_schema import normalize_pg_type
+from .csv_source import detect_format, iter_csv_lines
+from .db_schema import normalize_pg_type, insertable_columns
+from .errors import RowError
+from .progress import PUBLISH_MASK
+from .quarantine import ErrorCollector
+from .transform import compile_transform
+
+# Optional: a faster JSON parser for the well-formedness check, and JSON Schema support
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
 
 def _to_bool(val: str):
     t = val.strip().lower()
@@ -17,6 +35,55 @@ def _to_int(val: str):
 def _to_float(val: str):
     return float(val.strip())
 
+@lru_cache(maxsize=None)
+def numeric_caster(precision=None, scale=None):
+    """
+    Caster for NUMERIC / NUMERIC(p,s) columns that never builds a float or Decimal for
+    plain decimal text: a regex compiled from the typmod allows at most p-s integer digits
+    and s fraction digits, and the stripped original string goes to COPY unchanged.
+    Longer fractions, exponents and NaN take a slower Decimal path, which checks the value
+    as Postgres stores it, rounded to the scale (99.99 is 100.0 in a NUMERIC(3,1)).
+    """
+    if precision is None:
+        integer, fraction = r"\d+", r"\d*"
+    else:
+        fraction = rf"\d{{0,{scale or 0}}}"
+        if precision > (scale or 0):
+            integer = rf"0*\d{{1,{precision - (scale or 0)}}}"  # leading zeros do not count
+        else:
+            integer = "0+"
+    # digits with an optional fraction, or a bare fraction
+    plain = re.compile(rf"[+-]?(?:{integer}(?:\.{fraction})?|0*\.(?=\d){fraction})")
+    match = plain.fullmatch
+    if precision is not None:
+        exponent = Decimal(1).scaleb(-(scale or 0))
+        # room for every digit the column holds plus a carry; Postgres rounds half away from zero
+        context = Context(prec=precision + 1, rounding=ROUND_HALF_UP)
+
+    def cast(val: str):
+        if match(val):
+            return val
+        s = val.strip()
+        if match(s):
+            return s
+        try:
+            d = Decimal(s)
+        except InvalidOperation:
+            raise ValueError("invalid numeric")
+        if d.is_nan():
+            return "NaN"
+        if not d.is_finite():
+            raise ValueError("invalid numeric")
+        if precision is not None:
+            # rounding only adds digits, so a value already too wide is refused first
+            if d.adjusted() + 1 > precision - (scale or 0) or (
+                d.quantize(exponent, context=context).adjusted() + 1 > precision - (scale or 0)
+            ):
+                raise ValueError(f"numeric value out of range for numeric({precision},{scale or 0})")
+        return str(d)
+
+    return cast
+
 def _to_datetime(val: str):
     # be pragmatic; add formats as needed
     for fmt in ("%Y-%m-%d %H:%M:%S%z", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
@@ -26,8 +93,53 @@ def _to_datetime(val: str):
             pass
     raise ValueError("invalid datetime")
 
+class JSONText(str):
+    """
+    A JSON cell that passed validation, kept as the original text so COPY hands it to
+    jsonb unchanged instead of re-serializing a parsed copy.
+    """
+    __slots__ = ()
+
+
+def _reject_constant(name):
+    raise ValueError(f"invalid JSON number {name}")  # jsonb refuses NaN and Infinity too
+
+def _parse_json(val: str):
+    # exact ints however wide and 1e400 as a float, like the numeric jsonb keeps
+    return json.loads(val, parse_constant=_reject_constant)
+
 def _to_json(val: str):
-    return json.loads(val)
+    if orjson is not None:
+        try:
+            orjson.loads(val)
+            return JSONText(val)
+        except orjson.JSONDecodeError:
+            pass  # also refuses numbers jsonb takes, such as 1e400: json decides
+    _parse_json(val)
+    return JSONText(val)
+
+def json_schema_caster(json_schema):
+    """
+    Caster for a json column that must match `json_schema`. The validator is compiled once,
+    when the column plan is built, and the cell is still passed through as text.
+    """
+    if jsonschema is None:
+        raise ValueError("Validating json_schemas needs the jsonschema package")
+    cls = jsonschema.validators.validator_for(json_schema)
+    try:
+        cls.check_schema(json_schema)
+    except jsonschema.exceptions.SchemaError as e:
+        raise ValueError(f"Invalid JSON Schema: {e.message}")
+    validator = cls(json_schema)
+
+    def cast(val: str):
+        error = jsonschema.exceptions.best_match(validator.iter_errors(_parse_json(val)))
+        if error is not None:
+            path = "/".join(str(p) for p in error.absolute_path)
+            raise ValueError(f"does not match JSON Schema{' at ' + path if path else ''}: {error.message}")
+        return JSONText(val)
+
+    return cast
 
 CASTERS = {
     "bool": _to_bool,
@@ -38,89 +150,152 @@ CASTERS = {
     "string": lambda v: v,  # no-op
 }
 
-def validate_csv(file_obj, schema, strict=True):
+def check_header(schema, csv_cols):
     """
-    Returns (validated_rows:list[dict], diagnostics:dict)
-    Validates header names, nullability, and attempts type casting.
+    Returns (missing, extra) CSV columns compared to the table.
+    Raises ValueError when a required column is missing; extra columns are allowed and ignored.
     """
-    content = file_obj.read().decode("utf-8-sig")
-    reader = csv.DictReader(io.StringIO(content))
-
-    # Expected columns from DB (keep order)
-    # db_cols = [c["column"] for c in schema]
-    ignored_required_cols = []
-    for col in schema:
-        if (col["default"] is not None and "nextval(" in str(col["default"])):
-            ignored_required_cols.append(col["column"])
-
-    db_cols = [c["column"] for c in schema if c["column"] not in ignored_required_cols]
-
-    # Header alignment
-    csv_cols = reader.fieldnames or []
+    # Sequence-backed columns (ids) are filled by Postgres and not required
+    db_cols = [
+        c["column"] for c in schema
+        if not (c["default"] is not None and "nextval(" in str(c["default"]))
+    ]
     missing = [c for c in db_cols if c not in csv_cols]
     extra = [c for c in csv_cols if c not in db_cols]
     if missing:
         raise ValueError(f"CSV missing required columns: {missing}")
-    # Extra columns allowed — we’ll ignore them during insert
+    return missing, extra
 
-    # Build per-column validators
-    validators = {}
-    nullables = {}
-    for col in db_cols:
-        info = next(x for x in schema if x["column"] == col)
-        validators[col] = CASTERS.get(normalize_pg_type(info["data_type"]), CASTERS["string"])
-        nullables[col] = info["is_nullable"]
 
-    validated_rows = []
-    errors = []
-    rownum = 1  # for 1-based indexing including header as line 1
+def column_plan(schema, json_schemas=None):
+    """
+    [(column, caster, nullable), ...] for every column the loader writes to, in DB order.
+    Columns filled by defaults (id, created_at, ...) are skipped. `json_schemas` maps json
+    columns to a JSON Schema their values must match.
+    """
+    json_schemas = json_schemas or {}
+    types = {c["column"]: normalize_pg_type(c["data_type"]) for c in schema}
+    unknown = [col for col in json_schemas if types.get(col) != "json"]
+    if unknown:
+        raise ValueError(f"json_schemas given for columns that are not json columns: {unknown}")
 
-    insertable_cols = []
-    for col in schema:
-        default = col["default"]
-        colname = col["column"]
-        if default and ("nextval(" in default or "now()" in default):
+    insertable = set(insertable_columns(schema))
+    plan = []
+    for c in schema:
+        col = c["column"]
+        if col not in insertable:
             continue
-        insertable_cols.append(colname)
+        if col in json_schemas:
+            caster = json_schema_caster(json_schemas[col])
+        elif c["data_type"].lower() in ("numeric", "decimal"):
+            caster = numeric_caster(c.get("precision"), c.get("scale"))
+        else:
+            caster = CASTERS.get(types[col], CASTERS["string"])
+        plan.append((col, caster, c["is_nullable"]))
+    return plan
 
-    for row in reader:
-        rownum += 1
-        clean = {}
+
+def cast_row(row, plan):
+    """
+    Casts one CSV row (dict of raw strings) with a column plan. Raises RowError on the first bad value.
+    """
+    clean = {}
+    for col, caster, nullable in plan:
+        raw = row.get(col, "")
+
+        # Handle empty or missing values
+        if raw is None or raw == "":
+            if not nullable:
+                raise RowError(col, "not_null", f"column '{col}' is NOT NULL but value is empty")
+            clean[col] = None
+            continue
+
+        # Apply type validator (int, float, json, datetime, etc.)
         try:
-            for col in db_cols:
-                # Skip columns that should not be inserted (id, created_at defaults, identity, etc.)
-                if col not in insertable_cols:
-                    continue
-
-                raw = row.get(col, "")
-
-                # Handle empty or missing values
-                if raw is None or raw == "":
-                    if not nullables[col]:
-                        raise ValueError(f"column '{col}' is NOT NULL but value is empty")
-                    clean[col] = None
-                    continue
-
-                # Apply type validator (int, float, json, datetime, etc.)
-                try:
-                    clean[col] = validators[col](raw)
-                except Exception as e:
-                    raise ValueError(f"column '{col}' failed validation: {e}")
-
-            validated_rows.append(clean)
+            clean[col] = caster(raw)
         except Exception as e:
-            msg = f"row {rownum}: {e}"
-            if strict:
-                raise ValueError(msg)
-            errors.append(msg)
+            raise RowError(col, "invalid", f"column '{col}' failed validation: {e}")
+    return clean
+
+
+def validate_csv(file_obj, schema, strict=True, quarantine=True, fmt=None, json_schemas=None, transform=None,
+                 references=None, row_numbers=None, progress=None):
+    """
+    Returns (validated_rows:list[dict], diagnostics:dict)
+    Validates header names, nullability, and attempts type casting.
+    In non-strict mode failures go to an ErrorCollector, so diagnostics stay bounded and
+    (with `quarantine`) the rejected rows can be downloaded as a CSV afterwards.
+    `fmt` (a CSVFormat) is detected from the file when not given.
+    jsonb cells are only checked for well-formedness (and against `json_schemas`, if given)
+    and passed through as their original text.
+    A `transform` spec (see compile_transform) is applied to each row before it is cast,
+    in the same pass. With a ReferenceChecker as `references`, rows whose keys are missing
+    from the referenced tables fail like any other invalid row, before anything is loaded.
+    `row_numbers`, if given (e.g. an array("Q")), gets the CSV row number of every
+    validated row appended, for reporting errors found after validation.
+    An UploadProgress, if given, gets bytes read and row counts as the pass goes.
+    """
+    fmt = fmt or detect_format(file_obj)
+    reader = csv.DictReader(iter_csv_lines(file_obj, fmt.encoding, progress), **fmt.reader_kwargs())
+    transform = compile_transform(transform)
+
+    # Header alignment
+    fieldnames = reader.fieldnames or []
+    provided = fieldnames
+    if transform is not None:
+        fieldnames = reader.fieldnames = transform.header(fieldnames)
+        provided = fieldnames + transform.adds
+    missing, extra = check_header(schema, provided)
+    plan = column_plan(schema, json_schemas)
+
+    validated_rows = []
+    errors = ErrorCollector(fieldnames, quarantine=quarantine)
+    rownum = 1  # for 1-based indexing including header as line 1
+
+    def reject(rownum, e, row):
+        if strict:
+            raise ValueError(f"row {rownum}: {e}")
+        errors.add(rownum, e, row)
+
+    def settle(decided):
+        for n, raw, clean, error in decided:
+            if error is None:
+                validated_rows.append(clean)
+                if row_numbers is not None:
+                    row_numbers.append(n)
+            else:
+                reject(n, error, raw)
+
+    try:
+        for row in reader:
+            rownum += 1
+            if progress is not None and not rownum & PUBLISH_MASK:
+                progress.rows_validated, progress.errors = len(validated_rows), errors.count
+            try:
+                clean = cast_row(row if transform is None else transform(row), plan)
+            except ValueError as e:
+                reject(rownum, e, row)
+                continue
+            if references is None:
+                validated_rows.append(clean)
+                if row_numbers is not None:
+                    row_numbers.append(rownum)
+            else:
+                settle(references.add(rownum, row, clean))
+        if references is not None:
+            settle(references.flush())
+    finally:
+        errors.close()
+    if progress is not None:
+        progress.rows_validated, progress.errors = len(validated_rows), errors.count
 
     diagnostics = {
         "rows_in_csv": rownum - 1,
         "validated_rows": len(validated_rows),
-        "skipped_rows": len(errors),
+        "skipped_rows": errors.count,
         "extra_columns_ignored": extra,
         "missing_columns": missing,
-        "errors": errors,
+        "format": fmt.as_dict(),
+        **errors.summary(),
     }
     return validated_rows, diagnostics
-
@@ -1,13 +1,32 @@
 import io
-from django.db import connection, transaction
+import json
+import re
+import uuid
+from django.db import connection, transaction, DatabaseError
 import logging
 
+import psycopg2
+
+from .constants import LOAD_APPEND, LOAD_UPSERT
+from .csv_validator import JSONText
+from .errors import RowError
+from .quarantine import ErrorCollector
+from .result_cache import mark_table_changed
+from .sql import quote_ident
+
 logger = logging.getLogger(__name__)
 
+_COPY_LINE_RE = re.compile(r"^COPY \S+, line (\d+)")
+
 def sanitize_value(v):
     if v is None:
         return "\\N"
-    s = str(v)
+    if isinstance(v, JSONText):
+        # Validated JSON goes through as written. Raw newlines and tabs can only be
+        # whitespace between tokens, so only COPY's own escaping is needed.
+        return v.replace("\\", "\\\\").replace("\r", " ").replace("\n", " ").replace("\t", " ")
+    # str() of a parsed JSON cell is Python repr, which jsonb rejects
+    s = json.dumps(v) if isinstance(v, (dict, list)) else str(v)
 
     # Remove all variations of newline
     s = s.replace("\r\n", " ")
@@ -25,11 +44,27 @@ def sanitize_value(v):
     import unicodedata
     s = unicodedata.normalize("NFKC", s)
 
-    return s
+    # Backslash is the escape character of COPY's text format (after NFKC, which maps
+    # the full-width backslash to a plain one)
+    return s.replace("\\", "\\\\")
 
-def bulk_copy_into(table_name: str, rows: list[dict], ordered_cols: list[str]):
+def bulk_copy_into(table_name: str, rows: list[dict], ordered_cols: list[str],
+                   load_mode: str = LOAD_APPEND, conflict_key=(), target=None):
+    """
+    COPYs rows into public.<table_name>. In upsert mode the rows are COPYed into a
+    temp staging table and merged with INSERT ... ON CONFLICT (conflict_key) DO UPDATE;
+    the last row wins when a key repeats within the file.
+    Returns the number of rows written (inserted or updated). Cached aggregates for the
+    table are invalidated once the surrounding transaction commits.
+    `target` appends to another (already quoted) relation instead, e.g. a temp copy of
+    the table; the table itself is then left alone.
+    """
     if not rows:
         return 0
+    if load_mode == LOAD_UPSERT and not conflict_key:
+        raise ValueError("upsert load mode needs a conflict key")
+    if target is not None and load_mode == LOAD_UPSERT:
+        raise ValueError("upsert load mode writes to the table itself")
 
     # Re-render a CSV purely for COPY
     buf = io.StringIO()
@@ -52,14 +87,122 @@ def bulk_copy_into(table_name: str, rows: list[dict], ordered_cols: list[str]):
         buf.write("\t".join(values) + "\n")
     buf.seek(0)
 
-    quoted_cols = [f'"{c}"' for c in ordered_cols]
+    quoted_cols = [quote_ident(c) for c in ordered_cols]
+    copy_options = "WITH (FORMAT text, DELIMITER E'\\t', NULL '\\N')"
 
     with transaction.atomic():
+        if target is None:
+            transaction.on_commit(lambda: mark_table_changed(table_name))
         with connection.cursor() as cur:
-            # Use TEXT format (default) with DELIMITER = E'\t' to avoid field commas
-            cur.copy_expert(
-                f"COPY public.{table_name} ({', '.join(quoted_cols)}) FROM STDIN WITH (FORMAT text, DELIMITER E'\\t', NULL '\\N')",
-                buf,
+            if load_mode != LOAD_UPSERT:
+                # Use TEXT format (default) with DELIMITER = E'\t' to avoid field commas
+                cur.copy_expert(
+                    f"COPY {target or f'public.{table_name}'} ({', '.join(quoted_cols)}) FROM STDIN {copy_options}",
+                    buf,
+                )
+                return len(rows)
+
+            stage = f"_ingest_stage_{uuid.uuid4().hex}"
+            key = [quote_ident(c) for c in conflict_key]
+            updates = [f"{c} = EXCLUDED.{c}" for c in quoted_cols if c not in key]
+            cur.execute(
+                f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+                f"SELECT {', '.join(quoted_cols)} FROM public.{table_name} WITH NO DATA"
             )
-    return len(rows)
+            cur.copy_expert(f"COPY {stage} ({', '.join(quoted_cols)}) FROM STDIN {copy_options}", buf)
+            # ctid follows COPY order in a fresh temp table, so DESC keeps the last duplicate
+            cur.execute(
+                f"INSERT INTO public.{table_name} ({', '.join(quoted_cols)}) "
+                f"SELECT DISTINCT ON ({', '.join(key)}) {', '.join(quoted_cols)} FROM {stage} "
+                f"ORDER BY {', '.join(key)}, ctid DESC "
+                f"ON CONFLICT ({', '.join(key)}) "
+                + (f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING")
+            )
+            written = cur.rowcount
+            cur.execute(f"DROP TABLE {stage}")
+    return written
+
+
+def _pg_error(e):
+    # copy_expert is not wrapped by Django, so COPY raises psycopg2 errors directly
+    return e if isinstance(e, psycopg2.Error) else e.__cause__
+
+
+def describe_db_error(e) -> str:
+    """
+    One-line message for a database error: the primary message plus its detail, if any.
+    """
+    pg = _pg_error(e)
+    diag = getattr(pg, "diag", None)
+    if diag is None or diag.message_primary is None:
+        return str(e).splitlines()[0]
+    return f"{diag.message_primary} ({diag.message_detail})" if diag.message_detail else diag.message_primary
+
+
+def _copy_line(e):
+    """
+    1-based line of the COPY input that failed, when Postgres reports one.
+    """
+    context = getattr(getattr(_pg_error(e), "diag", None), "context", None) or ""
+    m = _COPY_LINE_RE.match(context)
+    return int(m.group(1)) if m else None
+
+
+def bulk_copy_batched(table_name: str, rows: list[dict], ordered_cols: list[str], reject,
+                      load_mode: str = LOAD_APPEND, conflict_key=(), batch_rows: int = 50_000, progress=None):
+    """
+    bulk_copy_into in chunks of `batch_rows`, each under its own savepoint, so rows the
+    database refuses (unique or check violations, overflow, ...) cost only themselves.
+    A failed chunk is split at the line COPY reports, or bisected when there is none
+    (upsert merges), until the offending rows are isolated; each is passed to
+    `reject(row, error)` and the rest of the chunk is loaded. When nothing fails this is
+    one COPY per chunk. Returns the number of rows written.
+    With reject=None the first failure is raised as is. An UploadProgress, if given, has
+    `rows_copied` advanced after every chunk.
+    """
+    written = 0
+    stack = [(lo, min(lo + batch_rows, len(rows))) for lo in range(0, len(rows), batch_rows)][::-1]
+    while stack:
+        lo, hi = stack.pop()
+        try:
+            with transaction.atomic():
+                n = bulk_copy_into(table_name, rows[lo:hi], ordered_cols, load_mode, conflict_key)
+        except (DatabaseError, psycopg2.Error) as e:
+            if reject is None:
+                raise
+            if hi - lo == 1:
+                reject(rows[lo], e)
+                continue
+            line = _copy_line(e)
+            if line is not None and line <= hi - lo:
+                # rows before it passed: reload them, retry it alone (it may only clash
+                # with an earlier row of this chunk) and carry on after it
+                bad = lo + line - 1
+                parts = [(lo, bad), (bad, bad + 1), (bad + 1, hi)]
+            else:
+                mid = (lo + hi) // 2
+                parts = [(lo, mid), (mid, hi)]
+            stack.extend(p for p in reversed(parts) if p[0] < p[1])
+            continue
+        written += n
+        if progress is not None:
+            progress.rows_copied += n
+    return written
+
 
+def rejected_rows_report(rows, row_numbers, rejected, fieldnames):
+    """
+    Diagnostics for the rows bulk_copy_batched rejected, in the same shape as validation
+    errors (with a quarantine file of their own). `rows` and `row_numbers` are what
+    validate_csv returned; `rejected` is [(row, error), ...], where a RowError (a row
+    copy_rows could not route) is reported as it is.
+    """
+    position = {id(row): i for i, row in enumerate(rows)}
+    numbered = sorted(((row_numbers[position[id(row)]], row, error) for row, error in rejected), key=lambda t: t[0])
+    errors = ErrorCollector(fieldnames)
+    for rownum, row, error in numbered:
+        if not isinstance(error, RowError):
+            column = getattr(getattr(_pg_error(error), "diag", None), "column_name", None)
+            error = RowError(column, "database", describe_db_error(error))
+        errors.add(rownum, error, row)
+    return {"rows": errors.count, **errors.summary()}
@@ -4,14 +4,15 @@ def get_table_schema(table_name: str):
     """
     Returns ordered schema for a public table:
     [
-      {'column':'id','data_type':'integer','is_nullable':False},
+      {'column':'id','data_type':'integer','is_nullable':False, 'default': ..., 'precision': 32, 'scale': 0},
       ...
     ]
+    precision/scale are the declared NUMERIC(p,s) typmod (None when unconstrained).
     """
     with connection.cursor() as cur:
         cur.execute(
             """
-            SELECT column_name, data_type, is_nullable, column_default
+            SELECT column_name, data_type, is_nullable, column_default, numeric_precision, numeric_scale
             FROM information_schema.columns
             WHERE table_schema = 'public' AND table_name = %s
             ORDER BY ordinal_position
@@ -24,7 +25,8 @@ def get_table_schema(table_name: str):
         raise ValueError(f"Table '{table_name}' does not exist or has no columns.")
 
     return [
-        {"column": r[0], "data_type": r[1], "is_nullable": (r[2] == "YES"), "default": r[3]}
+        {"column": r[0], "data_type": r[1], "is_nullable": (r[2] == "YES"), "default": r[3],
+         "precision": r[4], "scale": r[5]}
         for r in rows
     ]
 
@@ -47,3 +49,59 @@ def normalize_pg_type(data_type: str) -> str:
     # text, varchar, uuid, inet, etc. -> string
     return "string"
 
+
+def insertable_columns(schema):
+    """
+    Columns the loader writes to, in DB order. Columns filled by a sequence or
+    now() default (ids, created_at, ...) are left to Postgres.
+    """
+    cols = []
+    for col in schema:
+        default = col["default"]
+        if default and ("nextval(" in default or "now()" in default):
+            continue
+        cols.append(col["column"])
+    return cols
+
+
+def get_foreign_key_parents(tables):
+    """
+    Returns {table: {parent_table, ...}} for foreign keys between the given public tables.
+    Self-references and references to tables outside `tables` are ignored.
+    """
+    tables = list(tables)
+    deps = {t: set() for t in tables}
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT child.relname, parent.relname
+            FROM pg_constraint con
+            JOIN pg_class child ON child.oid = con.conrelid
+            JOIN pg_class parent ON parent.oid = con.confrelid
+            JOIN pg_namespace ns ON ns.oid = child.relnamespace
+            WHERE con.contype = 'f' AND ns.nspname = 'public'
+              AND child.relname = ANY(%s) AND parent.relname = ANY(%s)
+            """,
+            [tables, tables],
+        )
+        for child, parent in cur.fetchall():
+            if child != parent:
+                deps[child].add(parent)
+    return deps
+
+
+def dependency_order(deps):
+    """
+    Orders tables so every table comes after the tables it references.
+    `deps` is {table: {parent, ...}}; ties keep the input order. Raises ValueError on cycles.
+    """
+    ordered = []
+    remaining = dict(deps)
+    while remaining:
+        ready = [t for t, parents in remaining.items() if not (parents & remaining.keys())]
+        if not ready:
+            raise ValueError(f"Circular foreign keys between tables: {sorted(remaining)}")
+        for t in ready:
+            ordered.append(t)
+            del remaining[t]
+    return ordered
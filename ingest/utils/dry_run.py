@@ -0,0 +1,136 @@
+import csv
+import random
+import time
+import uuid
+
+from django.db import connection, transaction
+
+from .csv_source import detect_format, iter_csv_lines
+from .csv_validator import check_header, column_plan, cast_row
+from .db_insert import bulk_copy_into
+from .db_schema import insertable_columns, normalize_pg_type
+from .errors import RowError
+from .transform import compile_transform
+
+
+def profile_csv(file_obj, schema, table: str, sample: int, seed=None, fmt=None, json_schemas=None, transform=None):
+    """
+    Quick pass/fail forecast for a file without loading it.
+    One streaming pass parses every row but only casts the first `sample` rows plus a
+    reservoir sample of `sample` rows from the rest. The cast rows are then COPYed into a
+    temp copy of the table, inside a rolled-back transaction, to measure insert speed.
+    Returns a diagnostics dict with projected error counts, per-column stats and an
+    estimated load time.
+    """
+    scan_start = time.perf_counter()
+    fmt = fmt or detect_format(file_obj)
+    reader = csv.reader(iter_csv_lines(file_obj, fmt.encoding), **fmt.reader_kwargs())
+    header = next(reader, [])
+    transform = compile_transform(transform)
+    provided = header
+    if transform is not None:
+        header = transform.header(header)
+        provided = header + transform.adds
+    missing, extra = check_header(schema, provided)
+
+    head = []        # (rownum, raw values) of the first `sample` rows
+    reservoir = []   # uniform sample of the remaining rows
+    rnd = random.Random(seed)
+    rows = 0
+    for values in reader:
+        rows += 1
+        if rows <= sample:
+            head.append((rows + 1, values))
+            continue
+        # Algorithm R over rows sample+1 .. n
+        seen = rows - sample
+        if len(reservoir) < sample:
+            reservoir.append((rows + 1, values))
+        else:
+            j = rnd.randrange(seen)
+            if j < sample:
+                reservoir[j] = (rows + 1, values)
+    scan_seconds = time.perf_counter() - scan_start
+
+    plan = column_plan(schema, json_schemas)
+    types = {c["column"]: normalize_pg_type(c["data_type"]) for c in schema}
+    stats = {col: {"type": types[col], "nulls": 0, "errors": 0} for col, _, _ in plan}
+    sampled = head + reservoir
+    valid_rows = []
+    bad_rows = 0
+    examples = []
+    cast_start = time.perf_counter()
+    for rownum, values in sampled:
+        row = dict(zip(header, values))
+        try:
+            if transform is not None:
+                row = transform(row)
+            for col, _, _ in plan:
+                if row.get(col, "") in ("", None):
+                    stats[col]["nulls"] += 1
+            valid_rows.append(cast_row(row, plan))
+        except RowError as e:
+            bad_rows += 1
+            if e.column in stats:
+                stats[e.column]["errors"] += 1
+            if len(examples) < 10:
+                examples.append(f"row {rownum}: {e}")
+    cast_seconds = time.perf_counter() - cast_start
+
+    copy_seconds, copy_error = _timed_copy(table, valid_rows, insertable_columns(schema))
+
+    n = len(sampled)
+    for col_stats in stats.values():
+        col_stats["null_ratio"] = col_stats["nulls"] / n if n else 0.0
+        col_stats["error_ratio"] = col_stats["errors"] / n if n else 0.0
+
+    error_ratio = bad_rows / n if n else 0.0
+    cast_rate = n / cast_seconds if cast_seconds else None
+    copy_rate = len(valid_rows) / copy_seconds if copy_seconds else None
+    valid_total = rows * (1 - error_ratio)
+    estimate = scan_seconds
+    if cast_rate:
+        estimate += rows / cast_rate
+    if copy_rate:
+        estimate += valid_total / copy_rate
+
+    return {
+        "rows_in_csv": rows,
+        "sampled_rows": n,
+        "sample_errors": bad_rows,
+        "projected_error_rows": round(rows * error_ratio),
+        "projected_valid_rows": round(valid_total),
+        "extra_columns_ignored": extra,
+        "missing_columns": missing,
+        "format": fmt.as_dict(),
+        "columns": stats,
+        "errors": examples,
+        "copy_check_error": copy_error,
+        "rows_per_sec": {"scan": rows / scan_seconds if scan_seconds else None,
+                         "validate": cast_rate, "copy": copy_rate},
+        "estimated_load_seconds": round(estimate, 3),
+    }
+
+
+def _timed_copy(table, rows, cols):
+    """
+    COPYs `rows` into a temp table LIKE `table` (defaults, constraints and indexes, so
+    the timing and DB-side failures such as check constraints or overflow are those of the
+    real table) and rolls back, returning (seconds, error message or None).
+    The live table is not written, so its locks, triggers and sequences are left alone;
+    foreign keys and uniqueness against rows already stored are not checked.
+    """
+    if not rows:
+        return None, None
+    scratch = f"_ingest_dry_run_{uuid.uuid4().hex}"
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cur:
+                cur.execute(f'CREATE TEMP TABLE {scratch} (LIKE public.{table} INCLUDING ALL)')
+            start = time.perf_counter()
+            bulk_copy_into(table, rows, cols, target=scratch)
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+    except Exception as e:
+        return None, str(e)
+    return elapsed, None
@@ -0,0 +1,11 @@
+class RowError(ValueError):
+    """
+    A value that failed validation; `kind` is "not_null", "invalid", "reference", or
+    "database" for a row the database refused during a non-strict load ("partition" when
+    no partition takes it).
+    """
+
+    def __init__(self, column, kind, message):
+        super().__init__(message)
+        self.column = column
+        self.kind = kind
@@ -0,0 +1,47 @@
+import hashlib
+
+from django.db import connection
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_checksum(file_obj) -> str:
+    """
+    blake2b-256 hex digest of an uploaded file. Spooled uploads were hashed while they
+    were received (see SpoolingUploadHandler); others are hashed here in one pass.
+    """
+    checksum = getattr(file_obj, "checksum", None)
+    if checksum is not None:
+        return checksum
+    hasher = hashlib.blake2b(digest_size=32)
+    file_obj.seek(0)
+    for chunk in file_obj.chunks(CHUNK_SIZE):
+        hasher.update(chunk)
+    file_obj.seek(0)
+    file_obj.checksum = hasher.hexdigest()
+    return file_obj.checksum
+
+
+def lock_upload(table: str, checksum: str):
+    """
+    Serializes concurrent uploads of the same file to the same table until the current
+    transaction ends, so a retry racing the original waits for its ledger entry.
+    """
+    with connection.cursor() as cur:
+        cur.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))", [f"ingest-upload:{table}:{checksum}"])
+
+
+def find_upload(table: str, checksum: str):
+    from ingest.models import UploadLedger
+
+    return UploadLedger.objects.filter(table_name=table, checksum=checksum).first()
+
+
+def record_upload(table: str, checksum: str, size: int, response: dict):
+    from ingest.models import UploadLedger
+
+    UploadLedger.objects.update_or_create(
+        table_name=table,
+        checksum=checksum,
+        defaults={"size": size, "row_count": response.get("inserted_rows", 0), "response": response},
+    )
@@ -0,0 +1,294 @@
+import bisect
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .errors import RowError
+from .db_insert import bulk_copy_batched, bulk_copy_into
+from .db_schema import normalize_pg_type
+from .constants import LOAD_APPEND
+from .result_cache import mark_table_changed
+from .summaries import mark_summaries_stale, refresh_summaries
+
+_BOUND_RE = re.compile(r"^FOR VALUES FROM \((.+)\) TO \((.+)\)$")
+_MIN_TS = datetime.min.replace(tzinfo=timezone.utc)
+_MAX_TS = datetime.max.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class Leaf:
+    name: str
+    lo: object   # inclusive, comparable key (see _key); MINVALUE is the type's minimum
+    hi: object   # exclusive; MAXVALUE is the type's maximum
+
+
+@dataclass
+class Partitioning:
+    """
+    Single-column RANGE partitioning of a public table, read from the catalog.
+    `kind` is the coarse validator type of the key ("int" or "datetime").
+    Keys and bounds are compared in the form _key() gives them for the column's type.
+    """
+    table: str
+    column: str
+    data_type: str
+    kind: str
+    leaves: list = field(default_factory=list)   # sorted by lo
+    default: str | None = None
+    _los: list = field(default_factory=list, repr=False)
+
+    def _bounds(self):
+        return (float("-inf"), float("inf")) if self.kind == "int" else (_MIN_TS, _MAX_TS)
+
+    @property
+    def aware(self):
+        return self.data_type == "timestamp with time zone"
+
+    def key(self, value):
+        return _key(value, self.kind, self.aware)
+
+    def find(self, key):
+        """
+        The leaf whose range contains `key` (already passed through _key), or None.
+        """
+        i = bisect.bisect_right(self._los, key) - 1
+        if i >= 0 and key < self.leaves[i].hi:
+            return self.leaves[i]
+        return None
+
+    def add(self, leaf):
+        i = bisect.bisect_right(self._los, leaf.lo)
+        self.leaves.insert(i, leaf)
+        self._los.insert(i, leaf.lo)
+
+    def literal(self, key: datetime):
+        """
+        A new partition bound for `key` in the column's own type, so creating it needs no
+        time-zone dependent cast.
+        """
+        if self.data_type == "date":
+            return key.date()
+        if "without time zone" in self.data_type:
+            return key.replace(tzinfo=None)
+        return key
+
+
+def _key(value, kind, aware=True):
+    """
+    Comparable form of a key value: ints as-is, dates and datetimes as UTC-tagged datetimes.
+    For a timestamptz column (`aware`) values are converted to UTC and naive ones taken as
+    UTC, matching the connection's time zone. For date and timestamp columns Postgres drops
+    any offset and keeps the wall time as written, so the key does too.
+    """
+    if value is None:
+        return None
+    if kind == "int":
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None or not aware:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _parse_bound(literal, part, unbounded):
+    literal = literal.strip()
+    if literal in ("MINVALUE", "MAXVALUE"):
+        return unbounded
+    # pg_get_expr quotes non-numeric literals: '2024-01-01 00:00:00+00'
+    return part.key(literal.split("::")[0].strip("'"))
+
+
+def get_partitioning(table: str):
+    """
+    Returns a Partitioning for a table that is RANGE partitioned on a single int or
+    date/timestamp column whose partitions are all plain public tables, else None
+    (other layouts are loaded through the parent and routed by Postgres).
+    """
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT pt.partstrat, pt.partnatts, a.attname, format_type(a.atttypid, a.atttypmod)
+            FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+            WHERE n.nspname = 'public' AND c.relname = %s
+            """,
+            [table],
+        )
+        row = cur.fetchone()
+        if row is None:
+            return None
+        strategy, natts, column, data_type = row
+        kind = normalize_pg_type(data_type or "")
+        if strategy != "r" or natts != 1 or column is None or kind not in ("int", "datetime"):
+            return None
+
+        cur.execute(
+            """
+            SELECT c.relname, c.relkind, cn.nspname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_namespace cn ON cn.oid = c.relnamespace
+            WHERE i.inhparent = %s::regclass
+            """,
+            [f"public.{table}"],
+        )
+        children = cur.fetchall()
+
+    part = Partitioning(table=table, column=column, data_type=data_type, kind=kind)
+    low, high = part._bounds()
+    for name, relkind, schema_name, bound in children:
+        if relkind != "r" or schema_name != "public":
+            return None  # sub-partitioned or foreign leaves: let Postgres route
+        if bound == "DEFAULT":
+            part.default = name
+            continue
+        m = _BOUND_RE.match(bound)
+        if not m:
+            return None
+        part.add(Leaf(name, _parse_bound(m.group(1), part, low), _parse_bound(m.group(2), part, high)))
+    return part
+
+
+def _period(key: datetime, interval: str):
+    if interval == "day":
+        lo = key.replace(hour=0, minute=0, second=0, microsecond=0)
+        return lo, datetime.fromordinal(lo.toordinal() + 1).replace(tzinfo=timezone.utc), lo.strftime("%Y%m%d")
+    if interval == "year":
+        lo = key.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        return lo, lo.replace(year=lo.year + 1), lo.strftime("%Y")
+    if interval == "month":
+        lo = key.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        hi = lo.replace(year=lo.year + 1, month=1) if lo.month == 12 else lo.replace(month=lo.month + 1)
+        return lo, hi, lo.strftime("%Y%m")
+    raise ValueError(f"Unknown partition interval {interval!r}; use day, month or year")
+
+
+def create_partition(part: Partitioning, key):
+    """
+    Creates the CSV_INGEST_PARTITION_INTERVAL range partition holding `key`, clipped so it
+    does not overlap existing partitions, and adds it to `part`. Only for date/timestamp keys.
+    A clipped partition is named after its actual bounds, since several pieces of one
+    period can exist side by side.
+    """
+    lo, hi, suffix = _period(key, settings.CSV_INGEST_PARTITION_INTERVAL)
+    period = (lo, hi)
+    i = bisect.bisect_right(part._los, key)
+    if i > 0:
+        lo = max(lo, part.leaves[i - 1].hi)
+    if i < len(part.leaves):
+        hi = min(hi, part.leaves[i].lo)
+    if (lo, hi) == period:
+        name = f"{part.table[:50]}_p{suffix}"
+    else:
+        name = f"{part.table[:30]}_p{lo:%Y%m%d%H%M%S}_{hi:%Y%m%d%H%M%S}"
+    with connection.cursor() as cur:
+        cur.execute(
+            f'CREATE TABLE public."{name}" PARTITION OF public.{part.table} FOR VALUES FROM (%s) TO (%s)',
+            [part.literal(lo), part.literal(hi)],
+        )
+    leaf = Leaf(name, lo, hi)
+    part.add(leaf)
+    return leaf
+
+
+def copy_rows(table: str, rows, cols, load_mode: str = LOAD_APPEND, conflict_key=(), reject=None, progress=None):
+    """
+    bulk_copy_into with partition routing: for a RANGE-partitioned table the rows are
+    bucketed by partition key and COPYed straight into each leaf, creating missing
+    partitions first when CSV_INGEST_CREATE_PARTITIONS is on. Rows outside every partition
+    go to the DEFAULT partition if there is one; with `reject` the ones no partition takes
+    are rejected with kind "partition", otherwise they fail the load. Other tables are
+    COPYed as before.
+    All leaves are written in one transaction. Returns the number of rows written.
+    The table's summaries are marked stale in that transaction and refreshed once it commits.
+    With `reject(row, error)`, COPYs go through bulk_copy_batched and rows the database
+    refuses are handed to it instead of failing the load. With an UploadProgress, rows are
+    COPYed in those chunks too, so `rows_copied` moves during the load.
+    """
+    def copy(target, target_rows):
+        if reject is None and progress is None:
+            return bulk_copy_into(target, target_rows, cols, load_mode, conflict_key)
+        return bulk_copy_batched(
+            target, target_rows, cols, reject, load_mode, conflict_key, settings.CSV_INGEST_COPY_BATCH_ROWS, progress
+        )
+
+    part = get_partitioning(table) if settings.CSV_INGEST_PARTITION_ROUTING and rows else None
+    if part is None or part.column not in cols:
+        with transaction.atomic():
+            written = copy(table, rows)
+            if mark_summaries_stale(table):
+                transaction.on_commit(lambda: refresh_summaries(table))
+        return written
+
+    with transaction.atomic():
+        buckets = {}
+        missing = []
+        for row in rows:
+            key = part.key(row[part.column])
+            leaf = part.find(key) if key is not None else None
+            if leaf is not None:
+                buckets.setdefault(leaf.name, []).append(row)
+            else:
+                missing.append((key, row))
+
+        if missing:
+            can_create = settings.CSV_INGEST_CREATE_PARTITIONS and part.kind == "datetime"
+            if can_create:
+                # Serialize partition creation per table; another upload may have just added it
+                with connection.cursor() as cur:
+                    cur.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))", [f"ingest-partition:{table}"])
+                part = get_partitioning(table)
+            for key, row in missing:
+                leaf = part.find(key) if key is not None else None
+                if leaf is None and key is not None and can_create:
+                    leaf = create_partition(part, key)
+                target = leaf.name if leaf is not None else part.default
+                if target is None:
+                    error = RowError(
+                        part.column, "partition", f"No partition of {table} for {part.column} = {row[part.column]!r}"
+                    )
+                    if reject is None:
+                        raise error
+                    reject(row, error)
+                    continue
+                buckets.setdefault(target, []).append(row)
+
+        written = 0
+        for leaf_name, leaf_rows in buckets.items():
+            written += copy(leaf_name, leaf_rows)
+        transaction.on_commit(lambda: mark_table_changed(table))
+        if mark_summaries_stale(table):
+            transaction.on_commit(lambda: refresh_summaries(table))
+    return written
+
+
+def detach_partitions(table: str, before, concurrently: bool = False, drop: bool = False):
+    """
+    Detaches (and optionally drops) the partitions of `table` whose whole range lies before
+    `before`. Returns their names. CONCURRENTLY must run outside a transaction.
+    """
+    part = get_partitioning(table)
+    if part is None:
+        raise ValueError(f"Table '{table}' is not range partitioned on a single column")
+    try:
+        cutoff = part.key(before)
+    except (TypeError, ValueError):
+        raise ValueError(f"Cutoff {before!r} does not match the type of partition key {part.column}")
+    old = [leaf.name for leaf in part.leaves if leaf.hi <= cutoff]
+    with connection.cursor() as cur:
+        for name in old:
+            cur.execute(
+                f'ALTER TABLE public.{table} DETACH PARTITION public."{name}"'
+                + (" CONCURRENTLY" if concurrently else "")
+            )
+            if drop:
+                cur.execute(f'DROP TABLE public."{name}"')
+    return old
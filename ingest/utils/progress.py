@@ -0,0 +1,106 @@
+import json
+import logging
+import threading
+import time
+
+from django.db import connections
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+# validate_csv publishes its row counts every this many rows (a power of two minus one, as a mask)
+PUBLISH_MASK = 4095
+
+
+class UploadProgress:
+    """
+    Counters of one running upload. The pipeline only assigns plain attributes (bytes per
+    block read, rows every PUBLISH_MASK + 1 rows, copied rows per COPY chunk); whoever reports
+    progress samples them on its own clock with snapshot(), so nothing in the row loop
+    looks at the time.
+    `total_lines` is the newline count the spooling upload handler took, if any; the rows
+    after the header are reported as total_rows, an upper bound when quoted values span lines.
+    """
+
+    def __init__(self, total_bytes=None, total_lines=None):
+        self.phase = "waiting"      # waiting (admission, checksum), validating, copying
+        self.total_bytes = total_bytes
+        self.total_rows = max(total_lines - 1, 0) if total_lines is not None else None
+        self.bytes_read = 0
+        self.rows_validated = 0
+        self.rows_copied = 0
+        self.errors = 0
+        self._started = self._last_time = time.monotonic()
+        self._last_rows = 0
+
+    def snapshot(self):
+        now = time.monotonic()
+        # the rate of whichever counter is moving: validated rows, then copied rows
+        rows = self.rows_validated + self.rows_copied
+        elapsed = now - self._last_time
+        rate = (rows - self._last_rows) / elapsed if elapsed > 0 else 0.0
+        self._last_time, self._last_rows = now, rows
+        return {
+            "phase": self.phase,
+            "bytes_read": self.bytes_read,
+            "total_bytes": self.total_bytes,
+            "total_rows": self.total_rows,
+            "rows_validated": self.rows_validated,
+            "rows_copied": self.rows_copied,
+            "rows_per_sec": round(rate, 1),
+            "errors": self.errors,
+            "elapsed": round(now - self._started, 3),
+        }
+
+
+def sse_event(name: str, data) -> bytes:
+    return f"event: {name}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n".encode()
+
+
+def _events(run, progress, interval):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["response"] = run()
+        except Exception:
+            logger.exception("Streamed upload failed")
+        finally:
+            # the thread's own connection; the request thread's is untouched
+            connections.close_all()
+
+    # not a daemon: a worker shutting down waits for the load instead of killing it mid-COPY
+    worker = threading.Thread(target=target, name="upload-stream")
+    worker.start()
+    try:
+        yield sse_event("progress", progress.snapshot())
+        while True:
+            worker.join(interval)
+            if not worker.is_alive():
+                break
+            yield sse_event("progress", progress.snapshot())
+
+        resp = outcome.get("response")
+        if resp is None:
+            yield sse_event("result", {"status": 500, "detail": "Internal server error"})
+        else:
+            yield sse_event("result", {"status": resp.status_code, **(resp.data or {})})
+    finally:
+        # A client that goes away closes the stream early; the response closes the request,
+        # and with it the uploaded files, only after this, so they stay open for the worker
+        worker.join()
+
+
+def stream_progress(run, progress, interval):
+    """
+    Runs `run` (the upload, returning a DRF Response) in a thread and answers with a
+    text/event-stream: a `progress` event with progress.snapshot() right away and every
+    `interval` seconds while it runs, then one `result` event with the response body and
+    its status code. The upload runs to completion even if the client goes away: closing
+    the response waits for it.
+    """
+    resp = StreamingHttpResponse(_events(run, progress, interval), content_type="text/event-stream")
+    resp["Cache-Control"] = "no-cache"
+    resp["X-Accel-Buffering"] = "no"  # nginx would otherwise hold the events back
+    return resp
@@ -0,0 +1,46 @@
+import re
+
+from .sql import quote_ident
+
+# One `fields=` item: a column, optionally followed by jsonb path steps, e.g. tags->>'color'
+# or payload->'dims'->>'width'. Keys are quoted with single quotes and passed as parameters.
+FIELD_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)((?:\s*->>?\s*'[^']*')*)$")
+STEP_RE = re.compile(r"(->>?)\s*'([^']*)'")
+# Splits on commas that are not inside a quoted jsonb key
+ITEM_RE = re.compile(r"(?:[^,']|'[^']*')+")
+
+
+def build_select_list(fields: str, schema):
+    """
+    Turns a `fields=` value into a SELECT list for a table with the given schema.
+    Every column must exist in the schema, and path steps are only allowed on json/jsonb
+    columns. Each item is returned under its name as written, so `tags->>'color'` comes
+    back as a column called tags->>'color'.
+    Returns (select_sql, params). Raises ValueError for unknown columns or bad syntax.
+    """
+    types = {c["column"]: c["data_type"].lower() for c in schema}
+    items = [item.strip() for item in ITEM_RE.findall(fields) if item.strip()]
+    if not items:
+        raise ValueError("fields must name at least one column")
+
+    exprs = []
+    params = []
+    for item in items:
+        m = FIELD_RE.match(item)
+        if not m:
+            raise ValueError(f"Invalid field '{item}'")
+        col, path = m.groups()
+        if col not in types:
+            raise ValueError(f"Unknown field '{col}'")
+
+        expr = quote_ident(col)
+        if path:
+            if types[col] not in ("json", "jsonb"):
+                raise ValueError(f"Field '{col}' is not a json column")
+            for op, key in STEP_RE.findall(path):
+                expr += f" {op} %s"
+                params.append(key)
+        # the alias is part of the SQL text, so escape % for the driver's param formatting
+        exprs.append(f"{expr} AS {quote_ident(item).replace('%', '%%')}")
+
+    return ", ".join(exprs), params
@@ -0,0 +1,103 @@
+import csv
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.urls import reverse
+
+
+def quarantine_path(quarantine_id) -> str:
+    return os.path.join(settings.CSV_INGEST_QUARANTINE_DIR, f"{quarantine_id}.csv")
+
+
+def purge_expired_quarantine():
+    """
+    Deletes quarantine files older than CSV_INGEST_QUARANTINE_TTL seconds.
+    """
+    directory = settings.CSV_INGEST_QUARANTINE_DIR
+    cutoff = time.time() - settings.CSV_INGEST_QUARANTINE_TTL
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            if entry.name.endswith(".csv") and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+class ErrorCollector:
+    """
+    Keeps memory and response size bounded no matter how many rows fail:
+    failures are counted per (column, kind) with the first few examples of each,
+    only the first CSV_INGEST_MAX_ERROR_MESSAGES messages are kept verbatim, and
+    the rejected rows themselves are streamed to a quarantine CSV on disk that
+    can be downloaded from the quarantine endpoint.
+    """
+
+    def __init__(self, fieldnames, quarantine=True):
+        self.fieldnames = list(fieldnames)
+        self.quarantine = quarantine
+        self.count = 0
+        self.messages = []
+        self.groups = {}
+        self._id = None
+        self._fh = None
+        self._writer = None
+
+    def add(self, rownum: int, error, row):
+        """
+        Records one rejected row. `error` is a RowError (or any ValueError), `row` the raw CSV dict.
+        """
+        self.count += 1
+        msg = f"row {rownum}: {error}"
+        if len(self.messages) < settings.CSV_INGEST_MAX_ERROR_MESSAGES:
+            self.messages.append(msg)
+
+        key = (getattr(error, "column", None), getattr(error, "kind", "invalid"))
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {"column": key[0], "kind": key[1], "count": 0, "examples": []}
+        group["count"] += 1
+        if len(group["examples"]) < settings.CSV_INGEST_ERROR_EXAMPLES:
+            group["examples"].append({"row": rownum, "message": str(error)})
+
+        if self.quarantine:
+            self._spool(rownum, str(error), row)
+
+    def _spool(self, rownum, message, row):
+        if self._writer is None:
+            os.makedirs(settings.CSV_INGEST_QUARANTINE_DIR, exist_ok=True)
+            purge_expired_quarantine()
+            self._id = str(uuid.uuid4())
+            self._fh = open(quarantine_path(self._id), "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._fh)
+            self._writer.writerow(["_row", "_error", *self.fieldnames])
+        self._writer.writerow([rownum, message, *(row.get(f, "") for f in self.fieldnames)])
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def summary(self):
+        """
+        Diagnostics fragment: bounded messages, per (column, kind) counts and the quarantine handle.
+        """
+        self.close()
+        quarantine = None
+        if self._id is not None:
+            quarantine = {
+                "id": self._id,
+                "rows": self.count,
+                "url": reverse("quarantine-download", args=[self._id]),
+            }
+        return {
+            "errors": self.messages,
+            "errors_truncated": self.count > len(self.messages),
+            "error_summary": sorted(self.groups.values(), key=lambda g: -g["count"]),
+            "quarantine": quarantine,
+        }
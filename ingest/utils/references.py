@@ -0,0 +1,233 @@
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection
+
+from .db_schema import normalize_pg_type
+from .errors import RowError
+from .sql import quote_ident
+
+# Key columns compared in Python: ints as ints, everything string-like as text
+_KINDS = ("int", "string")
+
+
+@dataclass(frozen=True)
+class Reference:
+    """
+    Child `columns` must match `parent_columns` of public.`parent`; `types` are the parent
+    columns' SQL types, used to cast probe parameters so the parent's index is used.
+    """
+    columns: tuple
+    parent: str
+    parent_columns: tuple
+    types: tuple
+    kinds: tuple
+
+    def describe(self):
+        return f"{self.parent}({', '.join(self.parent_columns)})"
+
+    @property
+    def exact(self):
+        """
+        True when the parent's values compare equal to the CSV text as Python values, so the
+        parent can be read into a set. Other types (uuid, char(n), citext, ...) are only
+        compared by Postgres.
+        """
+        return all(
+            t in ("smallint", "integer", "bigint") if kind == "int" else t == "text" or t.startswith("character varying")
+            for kind, t in zip(self.kinds, self.types)
+        )
+
+
+def _column_types(cur, table, columns):
+    cur.execute(
+        """
+        SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+        FROM pg_attribute a
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relname = %s AND a.attname = ANY(%s)
+          AND a.attnum > 0 AND NOT a.attisdropped
+        """,
+        [table, list(columns)],
+    )
+    return dict(cur.fetchall())
+
+
+def get_references(table: str, schema, foreign_keys: bool = True, lookups=None):
+    """
+    The references to check for uploads to `table`: its foreign keys to other public tables
+    (when `foreign_keys`) plus registry `lookups` ({column: "parent.column"}), which need no
+    constraint. Keys on column types other than integers and text are skipped.
+    Raises ValueError for a lookup naming an unknown table or column.
+    """
+    child_types = {c["column"]: c["data_type"] for c in schema}
+    found = []
+    with connection.cursor() as cur:
+        if foreign_keys:
+            cur.execute(
+                """
+                SELECT parent.relname,
+                       ARRAY(SELECT attname FROM unnest(con.conkey) WITH ORDINALITY k(n, i)
+                             JOIN pg_attribute ON attrelid = con.conrelid AND attnum = k.n ORDER BY k.i),
+                       ARRAY(SELECT attname FROM unnest(con.confkey) WITH ORDINALITY k(n, i)
+                             JOIN pg_attribute ON attrelid = con.confrelid AND attnum = k.n ORDER BY k.i)
+                FROM pg_constraint con
+                JOIN pg_class child ON child.oid = con.conrelid
+                JOIN pg_class parent ON parent.oid = con.confrelid
+                JOIN pg_namespace cn ON cn.oid = child.relnamespace
+                JOIN pg_namespace pn ON pn.oid = parent.relnamespace
+                WHERE con.contype = 'f' AND cn.nspname = 'public' AND pn.nspname = 'public'
+                  AND child.relname = %s
+                ORDER BY con.conname
+                """,
+                [table],
+            )
+            found = [(parent, tuple(cols), tuple(pcols)) for parent, cols, pcols in cur.fetchall()]
+
+        for column, target in (lookups or {}).items():
+            parent, _, parent_column = target.partition(".")
+            if column not in child_types or not parent_column:
+                raise ValueError(f"Invalid lookup {column!r} -> {target!r}; expected column: \"table.column\"")
+            found.append((parent, (column,), (parent_column,)))
+
+        references = []
+        for parent, cols, pcols in found:
+            if parent == table:
+                continue  # self-references may point at rows of the same file
+            types = _column_types(cur, parent, pcols)
+            if len(types) != len(pcols):
+                raise ValueError(f"Lookup table {parent}({', '.join(pcols)}) does not exist")
+            kinds = tuple(normalize_pg_type(child_types[c]) for c in cols)
+            if any(k not in _KINDS for k in kinds):
+                continue
+            references.append(Reference(cols, parent, pcols, tuple(types[c] for c in pcols), kinds))
+    return references
+
+
+class ReferenceChecker:
+    """
+    Checks validated rows against their references during validate_csv.
+
+    A parent with at most CSV_INGEST_REFERENCE_SET_MAX_ROWS rows (by the planner's estimate)
+    is read once into a set and rows are checked as they come. For larger parents, rows are
+    held back in batches of CSV_INGEST_REFERENCE_PROBE_BATCH and the batch's distinct unseen
+    keys are probed with one query per parent (an unnest of the keys against the parent's
+    index); keys found stay cached for the upload.
+    Either way rows come out in file order, each with the RowError that rejects it or None.
+    """
+
+    def __init__(self, references):
+        self.references = list(references)
+        self._keys = None          # per reference: set of keys present in the parent
+        self._complete = None      # per reference: True when the set holds the whole parent
+        self._all_complete = False
+        self._pending = []
+        # Single-column keys are plain values, composite keys tuples (cast values are already
+        # ints or strs, as the parent key sets are read)
+        self._getters = [self._getter(ref.columns) for ref in self.references]
+
+    @staticmethod
+    def _getter(columns):
+        if len(columns) == 1:
+            column = columns[0]
+            return lambda clean: clean.get(column)
+
+        def key(clean):
+            values = tuple(clean.get(c) for c in columns)
+            return None if None in values else values  # MATCH SIMPLE: a NULL skips the check
+        return key
+
+    def _load(self):
+        self._keys, self._complete = [], []
+        with connection.cursor() as cur:
+            for ref in self.references:
+                cur.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [f'public."{ref.parent}"'])
+                estimate = cur.fetchone()[0]
+                small = ref.exact and 0 <= estimate <= settings.CSV_INGEST_REFERENCE_SET_MAX_ROWS
+                keys = set()
+                if small:
+                    cur.execute(f'SELECT {self._select(ref)} FROM public."{ref.parent}"')
+                    keys.update(self._unpack(ref, cur.fetchall()))
+                self._keys.append(keys)
+                self._complete.append(small)
+        self._all_complete = all(self._complete)
+
+    @staticmethod
+    def _select(ref):
+        return ", ".join(
+            quote_ident(c) if kind == "int" else f"{quote_ident(c)}::text"
+            for c, kind in zip(ref.parent_columns, ref.kinds)
+        )
+
+    @staticmethod
+    def _unpack(ref, rows):
+        return (r[0] for r in rows) if len(ref.columns) == 1 else rows
+
+    def _probe(self, i, keys):
+        """
+        Adds the `keys` (as they appear in the CSV) that exist in the parent to the key set.
+        Postgres compares them after casting to the parent's column types; a key the type
+        does not accept (not a uuid, out of the column's integer range, ...) compares as
+        NULL, so it is reported as missing instead of failing the query.
+        """
+        ref = self.references[i]
+        names = [f"k{n}" for n in range(len(ref.columns))]
+        arrays = ", ".join("%s::bigint[]" if kind == "int" else "%s::text[]" for kind in ref.kinds)
+        # CASE, not AND: only CASE guarantees the cast is skipped for invalid input
+        match = " AND ".join(
+            f"p.{quote_ident(c)} = CASE WHEN pg_input_is_valid(k.{name}::text, '{t.replace(chr(39), chr(39) * 2)}') "
+            f"THEN k.{name}::{t} END"
+            for c, name, t in zip(ref.parent_columns, names, ref.types)
+        )
+        sql = (
+            f"SELECT {', '.join('k.' + name for name in names)} FROM unnest({arrays}) AS k({', '.join(names)}) "
+            f'WHERE EXISTS (SELECT 1 FROM public."{ref.parent}" p WHERE {match})'
+        )
+        batch = settings.CSV_INGEST_REFERENCE_PROBE_BATCH
+        keys = list(keys)
+        with connection.cursor() as cur:
+            for start in range(0, len(keys), batch):
+                chunk = keys[start:start + batch]
+                params = [chunk] if len(names) == 1 else [[k[n] for k in chunk] for n in range(len(names))]
+                cur.execute(sql, params)
+                self._keys[i].update(self._unpack(ref, cur.fetchall()))
+
+    def _check(self, clean):
+        for ref, key_of, keys in zip(self.references, self._getters, self._keys):
+            key = key_of(clean)
+            if key is not None and key not in keys:
+                return RowError(
+                    ",".join(ref.columns), "reference",
+                    f"{', '.join(ref.columns)} = {key!r} not found in {ref.describe()}",
+                )
+        return None
+
+    def add(self, rownum, raw, clean):
+        """
+        Takes one validated row; returns the rows that are now decided, as
+        [(rownum, raw row, clean row, RowError or None), ...].
+        """
+        if self._keys is None:
+            self._load()
+        if self._all_complete:
+            return [(rownum, raw, clean, self._check(clean))]
+        self._pending.append((rownum, raw, clean))
+        if len(self._pending) >= settings.CSV_INGEST_REFERENCE_PROBE_BATCH:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """
+        Decides every row still held back.
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return []
+        for i, key_of in enumerate(self._getters):
+            if self._complete[i]:
+                continue
+            unseen = {key_of(clean) for _, _, clean in pending} - self._keys[i] - {None}
+            if unseen:
+                self._probe(i, unseen)
+        return [(rownum, raw, clean, self._check(clean)) for rownum, raw, clean in pending]
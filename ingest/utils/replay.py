@@ -0,0 +1,195 @@
+import json
+import mimetypes
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib import error as urlerror
+from urllib import parse, request as urlrequest
+
+from .bench import percentile
+
+
+def load_log(path: str):
+    """
+    Reads a JSONL replay log. Each line describes one API call:
+      {"endpoint": "upload-csv", "params": {"table_name": "products"}, "file": "products.csv"}
+      {"endpoint": "get-table-data", "params": {"table": "products", "page": 2}}
+      {"endpoint": "get-relations"}
+    `file` paths are resolved relative to the log file. Blank lines and lines starting with # are skipped.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    entries = []
+    with open(path) as fh:
+        for lineno, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {lineno}: invalid JSON: {e}")
+            if "endpoint" not in entry:
+                raise ValueError(f"line {lineno}: missing 'endpoint'")
+            entry.setdefault("params", {})
+            if entry.get("file"):
+                entry["file"] = os.path.join(base, entry["file"])
+            entries.append(entry)
+    return entries
+
+
+def _method(entry):
+    return entry.get("method", "POST" if entry.get("file") else "GET").upper()
+
+
+class InProcessTransport:
+    """
+    Sends requests through Django's test client, one client per thread.
+    """
+
+    def __init__(self):
+        from django.test import Client
+        from django.urls import reverse
+
+        self._reverse = reverse
+        self._client_cls = Client
+        self._local = threading.local()
+
+    def send(self, entry):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self._client_cls()
+        url = self._reverse(entry["endpoint"])
+        if _method(entry) == "GET":
+            return client.get(url, entry["params"]).status_code
+        data = dict(entry["params"])
+        if entry.get("file"):
+            with open(entry["file"], "rb") as fh:
+                data["file"] = fh
+                return client.post(url, data).status_code
+        return client.post(url, data).status_code
+
+    def close_thread(self):
+        from django.db import connections
+        connections.close_all()
+
+
+class HTTPTransport:
+    """
+    Sends requests to a running server, e.g. http://localhost:8000/api/.
+    Endpoint names are appended to the base URL as path segments.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 300):
+        self.base_url = base_url.rstrip("/") + "/"
+        self.timeout = timeout
+
+    def send(self, entry):
+        url = parse.urljoin(self.base_url, entry["endpoint"].strip("/") + "/")
+        params = {k: str(v).lower() if isinstance(v, bool) else str(v) for k, v in entry["params"].items()}
+        if _method(entry) == "GET":
+            req = urlrequest.Request(f"{url}?{parse.urlencode(params)}" if params else url)
+        else:
+            body, content_type = self._multipart(params, entry.get("file"))
+            req = urlrequest.Request(url, data=body, headers={"Content-Type": content_type}, method="POST")
+        try:
+            with urlrequest.urlopen(req, timeout=self.timeout) as resp:
+                resp.read()
+                return resp.status
+        except urlerror.HTTPError as e:
+            return e.code
+
+    def close_thread(self):
+        pass
+
+    @staticmethod
+    def _multipart(fields, file_path):
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in fields.items():
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            )
+        if file_path:
+            filename = os.path.basename(file_path)
+            ctype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            with open(file_path, "rb") as fh:
+                payload = fh.read()
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                f"Content-Type: {ctype}\r\n\r\n".encode() + payload + b"\r\n"
+            )
+        parts.append(f"--{boundary}--\r\n".encode())
+        return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def replay(entries, transport, concurrency: int = 1, rate: float = 0):
+    """
+    Replays `entries` with up to `concurrency` requests in flight.
+    With `rate` > 0 request i is released at start + i / rate (open loop), so a slow
+    server shows up as latency instead of silently lowering the offered load.
+    Returns (per-endpoint samples, wall time in seconds).
+    """
+    samples = defaultdict(list)
+    lock = threading.Lock()
+    pending = iter(enumerate(entries))
+    start = time.perf_counter()
+
+    def worker():
+        try:
+            while True:
+                with lock:
+                    item = next(pending, None)
+                if item is None:
+                    return
+                i, entry = item
+                if rate:
+                    delay = start + i / rate - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                t0 = time.perf_counter()
+                try:
+                    code = transport.send(entry)
+                except Exception as e:
+                    code = f"{type(e).__name__}: {e}"
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    samples[entry["endpoint"]].append((elapsed, code))
+        finally:
+            # release per-thread resources (DB connections for the in-process transport)
+            transport.close_thread()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, concurrency))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return samples, time.perf_counter() - start
+
+
+def summarize_replay(samples, wall_time: float):
+    """
+    Per-endpoint latency percentiles (ms), throughput and error rate.
+    Non-2xx/3xx status codes and transport exceptions count as errors.
+    """
+    report = {}
+    for endpoint, results in samples.items():
+        latencies = [t for t, _ in results]
+        errors = [c for _, c in results if not (isinstance(c, int) and c < 400)]
+        statuses = defaultdict(int)
+        for _, c in results:
+            statuses[str(c) if isinstance(c, int) else "exception"] += 1
+        report[endpoint] = {
+            "requests": len(results),
+            "errors": len(errors),
+            "error_rate": len(errors) / len(results),
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": max(latencies) * 1000,
+            "throughput_rps": len(results) / wall_time if wall_time else 0.0,
+            "statuses": dict(statuses),
+        }
+    return report
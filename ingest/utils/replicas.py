@@ -0,0 +1,122 @@
+import itertools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind: 0 on a primary (or a plain second database) and on a standby
+# that has replayed everything it received; infinite on one that has replayed nothing yet
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8, 'Infinity')
+    END
+"""
+
+
+def measure_lag(alias: str) -> float:
+    """
+    Replication lag of `alias` in seconds; infinite when it cannot be reached.
+    """
+    try:
+        with connections[alias].cursor() as cur:
+            cur.execute(LAG_SQL)
+            return float(cur.fetchone()[0])
+    except DatabaseError as e:
+        logger.warning("Read replica %s is unavailable: %s", alias, e)
+        connections[alias].close()
+        return float("inf")
+
+
+class ReplicaSet:
+    """
+    Picks the database for a read: round-robin over the CSV_INGEST_READ_REPLICAS whose last
+    measured lag is within CSV_INGEST_REPLICA_MAX_LAG, or the primary when none is.
+    A replica's lag is measured by the first request that finds its reading older than
+    CSV_INGEST_REPLICA_LAG_CHECK seconds, so a replica that goes away is skipped until a
+    later check finds it back.
+    """
+
+    def __init__(self, probe=measure_lag):
+        self._probe = probe
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self._lag = {}  # alias -> (checked at, seconds behind)
+
+    def lag(self, alias: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            checked = self._lag.get(alias)
+        if checked is not None and now - checked[0] < settings.CSV_INGEST_REPLICA_LAG_CHECK:
+            return checked[1]
+        lag = self._probe(alias)
+        with self._lock:
+            self._lag[alias] = (now, lag)
+        return lag
+
+    def pick(self) -> str:
+        usable = [
+            alias for alias in settings.CSV_INGEST_READ_REPLICAS
+            if self.lag(alias) <= settings.CSV_INGEST_REPLICA_MAX_LAG
+        ]
+        if not usable:
+            return DEFAULT_DB_ALIAS
+        return usable[next(self._turn) % len(usable)]
+
+    def reset(self):
+        with self._lock:
+            self._lag.clear()
+
+
+replicas = ReplicaSet()
+
+
+def _client_key(request) -> str:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"ingest:wrote:user:{user.pk}"
+    return f"ingest:wrote:addr:{request.META.get('REMOTE_ADDR')}"
+
+
+def note_write(request):
+    """
+    Sends the client's reads to the primary for the next CSV_INGEST_READ_YOUR_WRITES seconds,
+    so it sees its own upload whatever the replicas' lag. Kept in the cache: with the default
+    per-process cache, only the process that took the upload knows.
+    """
+    if settings.CSV_INGEST_READ_REPLICAS and settings.CSV_INGEST_READ_YOUR_WRITES > 0:
+        cache.set(_client_key(request), 1, timeout=settings.CSV_INGEST_READ_YOUR_WRITES)
+
+
+def read_alias(request) -> str:
+    """
+    Database alias to run a read-only query for `request` on.
+    """
+    if not settings.CSV_INGEST_READ_REPLICAS or cache.get(_client_key(request)) is not None:
+        return DEFAULT_DB_ALIAS
+    return replicas.pick()
+
+
+class ReplicaRouter:
+    """
+    The ORM (registry, upload ledger, row hashes) stays on the primary, including reads that
+    must see the upload's own transaction; replicas are only used through read_alias() and
+    are never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.CSV_INGEST_READ_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,43 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _generation_key(table: str) -> str:
+    return f"ingest:gen:{table}"
+
+
+def table_generation(table: str) -> int:
+    return cache.get(_generation_key(table), 0)
+
+
+def mark_table_changed(table: str):
+    """
+    Bumps the table's generation so results cached for older data are never served again.
+    With a shared cache backend this is seen by every process; with the default
+    per-process cache other workers rely on CSV_INGEST_RESULT_CACHE_TTL.
+    """
+    key = _generation_key(table)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def cached_result(table: str, params: dict, compute, timeout=None):
+    """
+    Returns (result, hit). Results are keyed by table, generation and the request params,
+    and kept for `timeout` seconds (CSV_INGEST_RESULT_CACHE_TTL by default).
+    """
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    key = f"ingest:result:{table}:{table_generation(table)}:{digest}"
+    result = cache.get(key)
+    if result is not None:
+        return result, True
+    result = compute()
+    cache.set(key, result, timeout=settings.CSV_INGEST_RESULT_CACHE_TTL if timeout is None else timeout)
+    return result, False
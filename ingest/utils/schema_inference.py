@@ -0,0 +1,81 @@
+import csv
+import re
+from itertools import islice
+
+from django.db import connection
+
+from .csv_source import detect_format, iter_csv_lines
+from .csv_validator import CASTERS
+from .sql import quote_ident
+
+IDENTIFIER_RE = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+
+# Candidate coarse types, most specific first. A column keeps the first candidate whose
+# caster accepted every non-empty sampled value, so int is promoted to float, then to text.
+CANDIDATES = ("int", "float", "bool", "datetime", "json")
+
+PG_TYPES = {
+    "int": "INTEGER",
+    "bigint": "BIGINT",
+    "float": "NUMERIC",
+    "bool": "BOOLEAN",
+    "datetime": "TIMESTAMPTZ",
+    "json": "JSONB",
+    "string": "TEXT",
+}
+
+_INT32 = 2**31 - 1
+
+
+def infer_schema(file_obj, sample_rows: int, fmt=None):
+    """
+    Infers column types from the header and the first `sample_rows` rows, using the
+    same casters the validator applies. Returns [{'column', 'data_type', 'is_nullable', 'default'}, ...]
+    in CSV order - the same shape as get_table_schema - with Postgres type names.
+    """
+    fmt = fmt or detect_format(file_obj)
+    reader = csv.reader(iter_csv_lines(file_obj, fmt.encoding), **fmt.reader_kwargs())
+    header = next(reader, None)
+    if not header:
+        raise ValueError("Cannot infer a schema from an empty CSV")
+    if len(set(header)) != len(header) or any(not h.strip() for h in header):
+        raise ValueError("CSV header must have unique, non-empty column names to infer a schema")
+
+    candidates = [list(CANDIDATES) for _ in header]
+    wide_int = [False] * len(header)
+    for values in islice(reader, sample_rows):
+        for i, raw in enumerate(values[: len(header)]):
+            if raw == "" or not candidates[i]:
+                continue
+            kept = []
+            for kind in candidates[i]:
+                # json only for objects/arrays; bare numbers and booleans belong to other types
+                if kind == "json" and raw.lstrip()[:1] not in ("{", "["):
+                    continue
+                try:
+                    value = CASTERS[kind](raw)
+                except Exception:
+                    continue
+                if kind == "int" and abs(value) > _INT32:
+                    wide_int[i] = True
+                kept.append(kind)
+            candidates[i] = kept
+
+    schema = []
+    for i, name in enumerate(header):
+        kind = candidates[i][0] if candidates[i] else "string"
+        if kind == "int" and wide_int[i]:
+            kind = "bigint"
+        schema.append({"column": name, "data_type": PG_TYPES[kind].lower(), "is_nullable": True, "default": None})
+    return schema
+
+
+def create_table(table_name: str, schema):
+    """
+    Creates public.<table_name> from an inferred schema. The name must be a plain identifier.
+    """
+    if not IDENTIFIER_RE.match(table_name):
+        raise ValueError(f"Invalid table name '{table_name}'")
+    cols = ", ".join(f"{quote_ident(c['column'])} {c['data_type'].upper()}" for c in schema)
+    with connection.cursor() as cur:
+        cur.execute(f"CREATE TABLE public.{table_name} ({cols})")
@@ -0,0 +1,5 @@
+def quote_ident(name: str) -> str:
+    """
+    `name` as a double-quoted SQL identifier, with embedded double quotes doubled.
+    """
+    return '"' + name.replace('"', '""') + '"'
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import logging
+import re
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+
+from .build_where_clause import build_where_clause, filter_column
+from .db_schema import get_table_schema
+from .projection import FIELD_RE, ITEM_RE
+from .sql import quote_ident
+
+logger = logging.getLogger(__name__)
+
+# One ORDER BY item get-table-data may pass through when reading a summary
+_ORDER_ITEM_RE = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)(?:\s+(?:ASC|DESC))?(?:\s+NULLS\s+(?:FIRST|LAST))?\s*$", re.I)
+
+
+def _unique_key(summary):
+    return [c.strip() for c in summary.unique_key.split(",") if c.strip()]
+
+
+def summary_definition(summary, schema):
+    """
+    (SELECT sql, params, columns) of a SummaryView over a table with the given schema.
+    Raises ValueError for columns the table does not have.
+    """
+    if not all(isinstance(v, str) for v in summary.filters.values()):
+        raise ValueError(f"Summary {summary.name}: filter values must be strings, as in a query string")
+    table_columns = [c["column"] for c in schema]
+    columns = list(summary.fields) or table_columns
+    unique = _unique_key(summary)
+    unknown = sorted(
+        {*columns, *(filter_column(k) for k in summary.filters)} - set(table_columns)
+        | set(unique) - set(columns)
+    )
+    if unknown:
+        raise ValueError(f"Summary {summary.name} uses columns {unknown} that {summary.table_name} does not provide")
+    where_clause, params = build_where_clause(summary.filters)
+    select_list = ", ".join(quote_ident(c) for c in columns)
+    sql = f"SELECT {select_list} FROM public.{quote_ident(summary.table_name)} {where_clause}"
+    return sql, params, columns
+
+
+def refresh_summary(summary):
+    """
+    Brings one summary up to date: rebuilds the materialized view when its definition (or
+    the table's columns, for an all-columns summary) changed, otherwise refreshes it,
+    CONCURRENTLY when it has a unique key. Without one, REFRESH takes an ACCESS EXCLUSIVE
+    lock on the view until it is done, so reads of the summary wait for it. Only then is it
+    marked as matching the table version read beforehand, so a load committed meanwhile
+    leaves it stale.
+    The view's comment records the definition digest and its columns for pick_summary().
+    """
+    rel = f"public.{quote_ident(summary.name)}"
+    with connection.cursor() as cur:
+        cur.execute("SELECT version, updated_at FROM ingest_summaryview WHERE id = %s", [summary.pk])
+        row = cur.fetchone()
+        if row is None:
+            return
+        version, updated_at = row
+
+        sql, params, columns = summary_definition(summary, get_table_schema(summary.table_name))
+        unique = _unique_key(summary)
+        digest = hashlib.sha1(
+            json.dumps([summary.table_name, summary.filters, columns, unique], sort_keys=True).encode()
+        ).hexdigest()
+        cur.execute("SELECT obj_description(to_regclass(%s), 'pg_class')", [rel])
+        comment = cur.fetchone()[0]
+
+        if comment is None or json.loads(comment).get("definition") != digest:
+            with transaction.atomic():
+                cur.execute(f"DROP MATERIALIZED VIEW IF EXISTS {rel}")
+                cur.execute(f"CREATE MATERIALIZED VIEW {rel} AS {sql}", params)
+                if unique:
+                    cur.execute(f"CREATE UNIQUE INDEX ON {rel} ({', '.join(quote_ident(c) for c in unique)})")
+                cur.execute(
+                    f"COMMENT ON MATERIALIZED VIEW {rel} IS %s",
+                    [json.dumps({"definition": digest, "columns": columns})],
+                )
+        else:
+            cur.execute(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if unique else ''}{rel}")
+
+        # An edit of the summary since it was read leaves it stale (save() reset it)
+        cur.execute(
+            """
+            UPDATE ingest_summaryview
+            SET refreshed_version = GREATEST(refreshed_version, %s), refreshed_at = now()
+            WHERE id = %s AND updated_at = %s
+            """,
+            [version, summary.pk, updated_at],
+        )
+
+
+def mark_summaries_stale(table: str) -> bool:
+    """
+    Moves the table version of `table`'s summaries on, so they are not read until refreshed.
+    Called inside the load's transaction: the summaries turn stale when its rows become
+    visible, not only once a refresh starts. Returns whether the table has any summaries.
+    """
+    from ingest.models import SummaryView
+
+    return SummaryView.objects.filter(table_name=table).update(version=F("version") + 1) > 0
+
+
+def refresh_summaries(table: str):
+    """
+    Refreshes each enabled summary of `table`. Runs in the uploading request after the
+    load's transaction, which marked them stale, commits. A summary that fails to refresh
+    is logged and left stale, so it is not read.
+    """
+    from ingest.models import SummaryView
+
+    for summary in SummaryView.objects.filter(table_name=table, enabled=True):
+        try:
+            refresh_summary(summary)
+        except (ValueError, DatabaseError):
+            logger.exception("Could not refresh summary %s of %s", summary.name, table)
+
+
+def _request_columns(fields, filters, order_by):
+    """
+    Columns a get-table-data request reads, as (columns, reads all columns), or None when
+    they cannot be told from the request.
+    """
+    columns = {filter_column(k) for k in filters}
+    all_columns = not fields
+    if fields:
+        for item in ITEM_RE.findall(fields):
+            m = FIELD_RE.match(item.strip())
+            if item.strip() and not m:
+                return None
+            if m:
+                columns.add(m.group(1))
+    for item in order_by.split(",") if order_by else ():
+        m = _ORDER_ITEM_RE.match(item)
+        if not m:
+            return None
+        columns.add(m.group(1))
+    return columns, all_columns
+
+
+def pick_summary(cur, table, schema, filters, fields=None, order_by=None):
+    """
+    The fresh summary of `table` that holds every row and column a get-table-data request
+    needs: its filters are a subset of the request's, with the same values, and it has
+    every column read. Returns (view name, filters still to apply), or (None, filters).
+    The summary with the most filters wins. Runs on `cur`, so a replica answers from its
+    own copy of the summary state.
+    """
+    needed = _request_columns(fields, filters, order_by)
+    if needed is None:
+        return None, filters
+    columns, all_columns = needed
+    table_columns = [c["column"] for c in schema]
+
+    cur.execute(
+        """
+        SELECT name, filters::text, obj_description(to_regclass('public.' || quote_ident(name)), 'pg_class')
+        FROM ingest_summaryview
+        WHERE table_name = %s AND enabled AND refreshed_version = version
+        ORDER BY id
+        """,
+        [table],
+    )
+    best = None
+    for name, summary_filters, comment in cur.fetchall():
+        summary_filters = json.loads(summary_filters)
+        if comment is None or any(filters.get(k) != v for k, v in summary_filters.items()):
+            continue
+        view_columns = json.loads(comment).get("columns", [])
+        if all_columns and view_columns != table_columns:
+            continue  # SELECT * must return the table's columns, in order
+        if not columns <= set(view_columns):
+            continue
+        if best is None or len(summary_filters) > len(best[1]):
+            best = (name, summary_filters)
+    if best is None:
+        return None, filters
+    name, summary_filters = best
+    return name, {k: v for k, v in filters.items() if k not in summary_filters}
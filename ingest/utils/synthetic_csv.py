@@ -0,0 +1,86 @@
+import csv
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+# Postgres type used for each synthetic column kind
+PG_TYPES = {
+    "int": "INTEGER",
+    "numeric": "NUMERIC(12,2)",
+    "bool": "BOOLEAN",
+    "timestamptz": "TIMESTAMPTZ",
+    "jsonb": "JSONB",
+    "text": "TEXT",
+}
+
+# Values that must fail validation for each kind ("text" accepts anything)
+_BAD_VALUES = {
+    "int": "12x",
+    "numeric": "not-a-number",
+    "bool": "maybe",
+    "timestamptz": "2024-13-45",
+    "jsonb": "{broken",
+}
+
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def column_spec(width: int, types: list[str]):
+    """
+    Returns [(column_name, kind), ...] cycling through `types` until `width` columns exist.
+    """
+    unknown = [t for t in types if t not in PG_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown column types: {unknown}. Choose from {sorted(PG_TYPES)}")
+    return [(f"c{i}_{types[i % len(types)]}", types[i % len(types)]) for i in range(width)]
+
+
+def create_table_sql(table_name: str, columns):
+    cols = ",\n    ".join(f'"{name}" {PG_TYPES[kind]}' for name, kind in columns)
+    return (
+        f"DROP TABLE IF EXISTS public.{table_name};\n"
+        f"CREATE TABLE public.{table_name}(\n"
+        f"    id BIGSERIAL PRIMARY KEY,\n"
+        f"    {cols}\n"
+        f")"
+    )
+
+
+def _good_value(kind: str, rnd: random.Random, i: int):
+    if kind == "int":
+        return str(rnd.randint(-100_000, 100_000))
+    if kind == "numeric":
+        return f"{rnd.uniform(0, 10_000):.2f}"
+    if kind == "bool":
+        return "true" if rnd.random() < 0.5 else "false"
+    if kind == "timestamptz":
+        return (_EPOCH + timedelta(seconds=rnd.randint(0, 365 * 86400))).strftime("%Y-%m-%d %H:%M:%S%z")
+    if kind == "jsonb":
+        return json.dumps({"id": i, "color": rnd.choice(["red", "green", "blue"]), "size": rnd.randint(1, 5)})
+    return f"item_{i}_{rnd.randint(0, 1_000_000)}"
+
+
+def write_csv(fh, columns, rows: int, null_ratio: float = 0.0, error_ratio: float = 0.0, seed: int = 0):
+    """
+    Writes a header plus `rows` synthetic records to the text file `fh`.
+    Roughly `null_ratio` of cells are empty and `error_ratio` of rows carry one invalid value.
+    Output is deterministic for a given seed.
+    Returns the number of rows that were made invalid.
+    """
+    rnd = random.Random(seed)
+    writer = csv.writer(fh, lineterminator="\n")
+    writer.writerow([name for name, _ in columns])
+
+    breakable = [idx for idx, (_, kind) in enumerate(columns) if kind in _BAD_VALUES]
+    bad_rows = 0
+    for i in range(rows):
+        record = [
+            "" if null_ratio and rnd.random() < null_ratio else _good_value(kind, rnd, i)
+            for _, kind in columns
+        ]
+        if breakable and error_ratio and rnd.random() < error_ratio:
+            idx = rnd.choice(breakable)
+            record[idx] = _BAD_VALUES[columns[idx][1]]
+            bad_rows += 1
+        writer.writerow(record)
+    return bad_rows
@@ -0,0 +1,156 @@
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .constants import LOAD_APPEND
+from .db_schema import get_table_schema
+
+# Changes with any DDL on a public table's columns: every ALTER rewrites the catalog rows it
+# touches (new xmin, or a new ctid within the same transaction) and a re-created table gets
+# a new oid. NULL when the table does not exist.
+SCHEMA_VERSION_SQL = """
+    SELECT concat_ws('/', c.oid, c.xmin::text, c.ctid::text,
+        (SELECT string_agg(a.xmin::text || ':' || a.ctid::text, ',' ORDER BY a.attnum)
+         FROM pg_attribute a WHERE a.attrelid = c.oid AND a.attnum > 0),
+        (SELECT string_agg(d.xmin::text || ':' || d.ctid::text, ',' ORDER BY d.adnum)
+         FROM pg_attrdef d WHERE d.adrelid = c.oid))
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relname = %s
+"""
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    name: str
+    max_upload_bytes: int | None = None
+    load_mode: str = LOAD_APPEND
+    conflict_key: tuple = ()
+    parallelism: int = 1
+    json_schemas: dict = field(default_factory=dict)
+    transform: dict = field(default_factory=dict)
+    lookups: dict = field(default_factory=dict)
+    summaries: tuple = ()  # names of the table's enabled SummaryViews
+
+
+class TableRegistry:
+    """
+    In-memory view of the enabled IngestTable rows.
+    Lookups are dict/frozenset hits; the snapshot is reloaded when it is older than
+    CSV_INGEST_REGISTRY_TTL seconds (picks up edits made by other processes) or right
+    away when this process saves or deletes an IngestTable. The reload also checks which
+    tables exist, so get-relations never has to touch the catalog. Column schemas are
+    cached by schema() across reloads, each with the catalog version it was read at.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._specs = {}
+        self._names = frozenset()
+        self._existing = ()
+        self._schemas = {}
+
+    def _fresh(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > settings.CSV_INGEST_REGISTRY_TTL:
+            self.reload()
+
+    def reload(self):
+        from ingest.models import IngestTable, SummaryView
+
+        with self._lock:
+            summaries = {}
+            for table_name, name in SummaryView.objects.filter(enabled=True).values_list("table_name", "name"):
+                summaries.setdefault(table_name, []).append(name)
+            specs = {
+                t.name: TableSpec(
+                    name=t.name,
+                    max_upload_bytes=t.max_upload_bytes,
+                    load_mode=t.load_mode,
+                    conflict_key=tuple(c.strip() for c in t.conflict_key.split(",") if c.strip()),
+                    parallelism=t.parallelism,
+                    json_schemas=t.json_schemas or {},
+                    transform=t.transform or {},
+                    lookups=t.lookups or {},
+                    summaries=tuple(summaries.get(t.name, ())),
+                )
+                for t in IngestTable.objects.filter(enabled=True)
+            }
+            with connection.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT c.relname
+                    FROM pg_class c
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    WHERE n.nspname = 'public' AND c.relname = ANY(%s)
+                    """,
+                    [list(specs)],
+                )
+                existing = {r[0] for r in cur.fetchall()}
+
+            # Swap everything in one assignment each so readers never see a half-built state
+            self._specs = specs
+            self._names = frozenset(specs)
+            self._existing = tuple(name for name in specs if name in existing)
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def is_allowed(self, name: str) -> bool:
+        self._fresh()
+        return name in self._names
+
+    def get(self, name: str):
+        self._fresh()
+        return self._specs.get(name)
+
+    def relations(self):
+        """
+        Enabled tables that exist in the database, in registry order.
+        """
+        self._fresh()
+        return list(self._existing)
+
+    def schema(self, name: str):
+        """
+        Column schema of an allowed table (see get_table_schema). Cached until the table's
+        DDL changes: each call costs one indexed catalog lookup (SCHEMA_VERSION_SQL) instead
+        of the information_schema query.
+        """
+        self._fresh()
+        with connection.cursor() as cur:
+            cur.execute(SCHEMA_VERSION_SQL, [name])
+            row = cur.fetchone()
+        version = row[0] if row else None
+        cached = self._schemas.get(name)
+        if version is not None and cached is not None and cached[0] == version:
+            return cached[1]
+        schema = get_table_schema(name)
+        self._schemas[name] = (version, schema)
+        return schema
+
+    def register(self, name: str, **fields):
+        """
+        Adds (or re-enables) a table, e.g. one created by infer_schema.
+        """
+        from ingest.models import IngestTable
+
+        IngestTable.objects.update_or_create(name=name, defaults={"enabled": True, **fields})
+
+
+registry = TableRegistry()
+
+
+def table_changed(sender, **kwargs):
+    """
+    post_save/post_delete receiver for IngestTable and SummaryView. Reloads on next access, and again after
+    commit so a rolled-back or not yet committed change is not cached for a whole TTL.
+    Other processes pick the change up when their TTL expires.
+    """
+    registry.invalidate()
+    transaction.on_commit(registry.invalidate)
@@ -0,0 +1,192 @@
+import ast
+from dataclasses import dataclass, field
+
+from .errors import RowError
+
+SPEC_KEYS = ("rename", "trim", "defaults", "map", "derive")
+
+
+def _coalesce(*values):
+    for v in values:
+        if v not in (None, ""):
+            return v
+    return ""
+
+
+# The only names an expression may call; anything else is a column
+FUNCTIONS = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "round": round,
+    "abs": abs,
+    "len": len,
+    "min": min,
+    "max": max,
+    "upper": str.upper,
+    "lower": str.lower,
+    "strip": str.strip,
+    "replace": str.replace,
+    "coalesce": _coalesce,
+}
+
+_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load, ast.Call, ast.IfExp, ast.Tuple, ast.List,
+    ast.Subscript, ast.Slice,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.UnaryOp, ast.UAdd, ast.USub, ast.Not,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+)
+
+
+def compile_expression(source: str):
+    """
+    Compiles a derive expression to (code, columns it reads). Only literals, column names,
+    arithmetic (no **), comparisons, and/or/not, `x if c else y`, slicing and calls to
+    FUNCTIONS are allowed, so an expression cannot reach attributes, builtins or imports.
+    Raises ValueError for anything else.
+    """
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"invalid expression {source!r}: {e.msg}")
+    columns = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _NODES):
+            raise ValueError(f"{type(node).__name__} is not allowed in expression {source!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ValueError(f"only calls to {sorted(FUNCTIONS)} are allowed in expression {source!r}")
+        elif isinstance(node, ast.Name) and node.id not in FUNCTIONS:
+            columns.add(node.id)
+    return compile(tree, "<transform>", "eval"), columns
+
+
+def _scope():
+    # Globals of every derive expression: FUNCTIONS and nothing else. Expressions cannot
+    # assign, so one dict serves every row of an upload
+    return {"__builtins__": {}, **FUNCTIONS}
+
+
+def _text(value):
+    # Derived values are fed to the column's caster like any CSV cell
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+@dataclass
+class Transform:
+    """
+    A table's transform spec, compiled once per upload. `rename` is applied to the CSV
+    header (no per-row cost); calling the transform on a row dict returns a new dict with
+    trim, defaults, map and derive applied in that order.
+    """
+    rename: dict = field(default_factory=dict)
+    trim: object = False            # True for every column, or a list of columns
+    defaults: dict = field(default_factory=dict)
+    maps: dict = field(default_factory=dict)
+    derive: list = field(default_factory=list)   # [(column, code), ...] in spec order
+    reads: set = field(default_factory=set)      # columns the expressions refer to
+    scope: dict = field(default_factory=_scope, repr=False)
+
+    @property
+    def adds(self):
+        """
+        Columns the transform fills in even when the CSV does not have them.
+        """
+        return list(dict.fromkeys([*self.defaults, *(col for col, _ in self.derive)]))
+
+    def header(self, fieldnames):
+        """
+        Renamed header. Raises ValueError when an expression reads a column that neither
+        the CSV, the defaults nor an earlier derive provides.
+        """
+        renamed = [self.rename.get(f, f) for f in fieldnames]
+        unknown = sorted(self.reads - set(renamed) - set(self.defaults))
+        if unknown:
+            raise ValueError(f"transform expressions use columns missing from the CSV: {unknown}")
+        return renamed
+
+    def __call__(self, row):
+        if self.trim is True:
+            row = {k: v.strip() if isinstance(v, str) else v for k, v in row.items()}
+        else:
+            row = dict(row)
+        if self.trim and self.trim is not True:
+            for k in self.trim:
+                v = row.get(k)
+                if v:
+                    row[k] = v.strip()
+        for k, default in self.defaults.items():
+            if row.get(k) in (None, ""):
+                row[k] = default
+        for k, mapping in self.maps.items():
+            v = row.get(k)
+            if isinstance(v, str) and v in mapping:
+                row[k] = mapping[v]
+        if self.derive:
+            for k, code in self.derive:
+                try:
+                    row[k] = _text(eval(code, self.scope, row))
+                except Exception as e:
+                    raise RowError(k, "invalid", f"column '{k}' could not be derived: {e}")
+        return row
+
+
+def compile_transform(spec):
+    """
+    Builds a Transform from an IngestTable `transform` spec, or returns None for an empty one:
+
+        {"rename": {"Product SKU": "sku"},
+         "trim": true,                          # or ["sku", "name"]
+         "defaults": {"qty": "0"},              # for empty or missing cells
+         "map": {"status": {"A": "active", "I": "inactive"}},
+         "derive": {"total": "float(price) * int(qty)"}}
+
+    Cells are strings; derived values are converted back to text and cast like any other
+    cell (None becomes empty, i.e. NULL). Raises ValueError for a malformed spec.
+    """
+    if not spec:
+        return None
+    if not isinstance(spec, dict):
+        raise ValueError("transform must be an object")
+    unknown = [k for k in spec if k not in SPEC_KEYS]
+    if unknown:
+        raise ValueError(f"unknown transform keys {unknown}; expected some of {list(SPEC_KEYS)}")
+
+    def mapping(key, values=str):
+        value = spec.get(key) or {}
+        if not isinstance(value, dict) or not all(isinstance(v, values) for v in value.values()):
+            raise ValueError(f"transform '{key}' must map column names to {values.__name__} values")
+        return value
+
+    trim = spec.get("trim", False)
+    if not (isinstance(trim, bool) or (isinstance(trim, list) and all(isinstance(c, str) for c in trim))):
+        raise ValueError("transform 'trim' must be true, false or a list of columns")
+
+    derive = []
+    reads = set()
+    for col, source in mapping("derive").items():
+        code, columns = compile_expression(source)
+        # a derived column may use the ones defined before it
+        reads |= columns - {c for c, _ in derive}
+        derive.append((col, code))
+
+    maps = mapping("map", dict)
+    for col, values in maps.items():
+        if not all(isinstance(v, str) for v in values.values()):
+            raise ValueError(f"transform 'map' values for {col} must be strings")
+
+    return Transform(
+        rename=mapping("rename"),
+        trim=trim,
+        defaults=mapping("defaults"),
+        maps=maps,
+        derive=derive,
+        reads=reads,
+        scope=_scope(),
+    )
@@ -1,7 +1,13 @@
 from .upload_csv import UploadCSVView
+from .upload_batch import UploadCSVBatchView
 from .table_data import GetTableDataView
+from .quarantine import QuarantineDownloadView
+from .aggregate import AggregateTableView
 
 __all__ = [
     "UploadCSVView",
+    "UploadCSVBatchView",
     "GetTableDataView",
+    "QuarantineDownloadView",
+    "AggregateTableView",
 ]
@@ -0,0 +1,69 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from ingest.utils.aggregation import build_aggregate_query
+from ingest.utils.replicas import read_alias
+from ingest.utils.result_cache import cached_result
+from ingest.utils.table_registry import registry
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, DatabaseError
+
+
+class AggregateTableView(APIView):
+    """
+    Totals, group counts and time series computed in Postgres:
+    GET /api/aggregate/?table=purchases&group_by=sku&metrics=count,sum:qty&bucket=created_at:month&qty__gte=1
+    Any parameter other than table/group_by/metrics/bucket is a get-table-data style filter.
+    Results are cached until the table is loaded again (or CSV_INGEST_RESULT_CACHE_TTL expires).
+    """
+
+    reserved = ("table", "group_by", "metrics", "bucket")
+
+    def get(self, request):
+        table = request.GET.get("table")
+        if not table:
+            return Response({"detail": "table parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if not registry.is_allowed(table):
+            return Response({"detail": "Table not allowed"}, status=status.HTTP_403_FORBIDDEN)
+
+        filters = {k: v for k, v in request.GET.items() if k not in self.reserved}
+        max_groups = settings.CSV_INGEST_AGGREGATE_MAX_GROUPS
+        try:
+            sql, params, columns = build_aggregate_query(
+                table,
+                registry.schema(table),
+                group_by=request.GET.get("group_by"),
+                metrics=request.GET.get("metrics"),
+                bucket=request.GET.get("bucket"),
+                filters=filters,
+                max_groups=max_groups + 1,
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        alias = read_alias(request)
+
+        def run():
+            with connections[alias].cursor() as cur:
+                cur.execute(sql, params)
+                return cur.fetchall()
+
+        # A replica may not have the latest load yet, so its results are not kept for longer
+        # than it is allowed to lag
+        timeout = None if alias == DEFAULT_DB_ALIAS else settings.CSV_INGEST_REPLICA_MAX_LAG
+        try:
+            rows, hit = cached_result(table, dict(request.GET.items()), run, timeout)
+        except DatabaseError as e:
+            return Response({"detail": f"Invalid aggregation: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "table": table,
+                "columns": columns,
+                "rows": [dict(zip(columns, row)) for row in rows[:max_groups]],
+                "truncated": len(rows) > max_groups,
+                "cached": hit,
+            }
+        )
@@ -0,0 +1,19 @@
+from ingest.utils.quarantine import quarantine_path
+
+from django.http import FileResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+
+class QuarantineDownloadView(APIView):
+    """
+    Serves the CSV of rows rejected by a non-strict upload (see diagnostics.quarantine).
+    """
+
+    def get(self, request, quarantine_id):
+        try:
+            fh = open(quarantine_path(quarantine_id), "rb")
+        except FileNotFoundError:
+            return Response({"detail": "Quarantine file not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(fh, as_attachment=True, filename=f"rejected_{quarantine_id}.csv", content_type="text/csv")
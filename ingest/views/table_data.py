@@ -1,15 +1,25 @@
+import math
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
 from ingest.utils.build_where_clause import build_where_clause
-from ingest.utils.constants import ALLOWED_TABLES
-
-from django.db import connection, DatabaseError
+from ingest.utils.projection import build_select_list
+from ingest.utils.replicas import read_alias
+from ingest.utils.sql import quote_ident
+from ingest.utils.summaries import pick_summary
+from ingest.utils.table_registry import registry
+from ingest.renderers import table_data_renderers
+
+from django.conf import settings
+from django.db import connections, DatabaseError
 from django.db.utils import ProgrammingError
-from django.core.paginator import Paginator, EmptyPage
 
 class GetTableDataView(APIView):
+    # JSON by default; msgpack, Arrow IPC and Parquet via the Accept header when installed
+    renderer_classes = table_data_renderers()
+
     def get(self, request, *args, **kwargs):
         mode = kwargs.get("mode")
         if mode == "table":
@@ -20,21 +30,8 @@ class GetTableDataView(APIView):
             return Response({"error": "invalid mode"}, status=status.HTTP_400_BAD_REQUEST)
 
     def get_relations(self, request):
-        with connection.cursor() as cur:
-            cur.execute(
-                """
-                  SELECT table_name
-                  FROM information_schema.tables
-                  WHERE table_schema = 'public'  
-                """
-            )
-            rows = cur.fetchall()
-
-        existing_relations = {row[0] for row in rows}
-        allowed_relations = [
-            rel for rel in ALLOWED_TABLES
-            if rel in existing_relations
-        ]
+        # Served from the registry snapshot, which already knows which tables exist
+        allowed_relations = registry.relations()
 
         return Response(
             {
@@ -48,30 +45,76 @@ class GetTableDataView(APIView):
         if not table:
             return Response({"detail": "table parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        if ALLOWED_TABLES is not None and table not in ALLOWED_TABLES:
+        if not registry.is_allowed(table):
             return Response({"detail": "Table not allowed"}, status=status.HTTP_403_FORBIDDEN)
 
 
-        page = int(request.GET.get("page", 1))
-        limit = int(request.GET.get("limit", 10))
+        try:
+            page = int(request.GET.get("page", 1))
+            limit = int(request.GET.get("limit", 10))
+        except ValueError:
+            return Response({"detail": "page and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1 or limit > settings.CSV_INGEST_MAX_PAGE_SIZE:
+            return Response(
+                {"detail": f"limit must be between 1 and {settings.CSV_INGEST_MAX_PAGE_SIZE}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         order_by = (
             f"ORDER BY {request.GET.get('order_by')}"
             if request.GET.get('order_by', None)
             else ""
         )
 
-        reserved = ["table", "page", "limit", "order_by", "mode"]
+        # format=columnar returns {"columns": [...], "rows": [[...], ...]} instead of one dict per row.
+        # Arrow/Parquet renderers always get the columnar shape.
+        response_format = request.GET.get("format", "records")
+        if response_format not in ("records", "columnar"):
+            return Response({"detail": "format must be 'records' or 'columnar'"}, status=status.HTTP_400_BAD_REQUEST)
+        columnar = response_format == "columnar" or getattr(request.accepted_renderer, "columnar", False)
+
+        select_list, select_params = "*", []
+        fields = request.GET.get("fields")
+        if fields:
+            try:
+                select_list, select_params = build_select_list(fields, registry.schema(table))
+            except ValueError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        reserved = ["table", "page", "limit", "order_by", "mode", "fields", "format"]
         filters = {k: v for k, v in request.GET.items() if k not in reserved}
 
         where_clause, params = build_where_clause(filters)
-
-        query = f"SELECT * FROM {table} {where_clause} {order_by}"
+        source, summary = table, None
+        spec = registry.get(table)
 
         try:
-            with connection.cursor() as cur:
-                cur.execute(query, params)
+            # Read-only, so it may run on a replica
+            with connections[read_alias(request)].cursor() as cur:
+                if spec is not None and spec.summaries:
+                    # A fresh materialized summary holding every row and column needed answers instead
+                    summary, remaining = pick_summary(
+                        cur, table, registry.schema(table), filters, fields, request.GET.get("order_by")
+                    )
+                    if summary is not None:
+                        source = quote_ident(summary)
+                        where_clause, params = build_where_clause(remaining)
+
+                # Paginate in SQL so only the requested page leaves the database
+                cur.execute(f"SELECT count(*) FROM {source} {where_clause}", params)
+                total_rows = cur.fetchone()[0]
+                total_pages = max(1, math.ceil(total_rows / limit))
+                if page < 1 or page > total_pages:
+                    return Response({"detail": "Page out of range"}, status=status.HTTP_400_BAD_REQUEST)
+
+                cur.execute(
+                    f"SELECT {select_list} FROM {source} {where_clause} {order_by} LIMIT %s OFFSET %s",
+                    select_params + params + [limit, (page - 1) * limit],
+                )
                 columns = [col[0] for col in cur.description]
-                rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+                if columnar:
+                    rows = cur.fetchall()
+                else:
+                    rows = [dict(zip(columns, row)) for row in cur.fetchall()]
 
         except ProgrammingError as e:
             # Typically invalid column, bad filter, or malformed SQL
@@ -94,19 +137,17 @@ class GetTableDataView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        paginator = Paginator(rows, limit)
-        try:
-            page_obj = paginator.page(page)
-        except EmptyPage:
-            return Response({"detail": "Page out of range"}, status=status.HTTP_400_BAD_REQUEST)
-
-        return Response(
-            {
-                "page": page,
-                "limit": limit,
-                "total_rows": paginator.count,
-                "total_pages": paginator.num_pages,
-                "results": page_obj.object_list
-            }
-        )
-
+        body = {
+            "page": page,
+            "limit": limit,
+            "total_rows": total_rows,
+            "total_pages": total_pages,
+        }
+        if summary is not None:
+            body["summary"] = summary
+        if columnar:
+            body["columns"] = columns
+            body["rows"] = rows
+        else:
+            body["results"] = rows
+        return Response(body)
@@ -0,0 +1,128 @@
+from array import array
+
+from ingest.serializers import CSVBatchUploadSerializer
+from ingest.utils.db_schema import insertable_columns, get_foreign_key_parents, dependency_order
+from ingest.utils.csv_validator import validate_csv
+from ingest.utils.db_insert import rejected_rows_report
+from ingest.utils.partitions import copy_rows
+from ingest.utils.references import ReferenceChecker
+from ingest.utils.replicas import note_write
+from ingest.utils.table_registry import registry
+from ingest.views.upload_csv import UploadCSVView
+
+from django.db import transaction
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+class UploadCSVBatchView(APIView):
+    """
+    Loads several CSVs in one request: one multipart file part per table, named after the table
+    (e.g. -F products=@products.csv -F product_purchases=@purchases.csv).
+    Files are validated one after the other, stopping at the first invalid one, then COPYed
+    in foreign-key order inside a single transaction, so either every table is loaded or
+    none is. Registry lookups are checked as in upload-csv; foreign keys are left to
+    Postgres, since a parent may be loaded by the same batch. Batches are not recorded in
+    the upload ledger and have no delta mode.
+    """
+
+    def post(self, request):
+        serializer = CSVBatchUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        strict = serializer.validated_data["strict"]
+
+        files = dict(request.FILES.items())
+        if not files:
+            return Response(
+                {"detail": "Send one file per table, using the table name as the field name"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        not_allowed = [t for t in files if not registry.is_allowed(t)]
+        if not_allowed:
+            return Response({"detail": f"Tables not allowed: {not_allowed}"}, status=status.HTTP_403_FORBIDDEN)
+        specs = {table: registry.get(table) for table in files}
+
+        too_big = [
+            t for t, spec in specs.items()
+            if spec.max_upload_bytes is not None and files[t].size > spec.max_upload_bytes
+        ]
+        if too_big:
+            return Response(
+                {"detail": f"Files exceed the upload limit for tables: {too_big}"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        try:
+            schemas = {table: registry.schema(table) for table in files}
+            references = {
+                table: UploadCSVView.table_references(table, schemas[table], specs[table], foreign_keys=False)
+                for table in files
+            }
+            load_order = dependency_order(get_foreign_key_parents(files))
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return UploadCSVView.admitted(
+            {table: spec.parallelism for table, spec in specs.items()},
+            sum(f.size for f in files.values()),
+            lambda: self.load(files, specs, schemas, references, load_order, strict),
+        )
+
+    def load(self, files, specs, schemas, references, load_order, strict):
+        # Validation is pure Python and holds the GIL, so threads would not overlap it
+        row_numbers = {table: None if strict else array("Q") for table in files}
+        validated = {}
+        for table in files:
+            spec = specs[table]
+            try:
+                validated[table] = validate_csv(
+                    files[table], schemas[table], strict=strict, json_schemas=spec.json_schemas,
+                    transform=spec.transform, row_numbers=row_numbers[table],
+                    references=ReferenceChecker(references[table]) if references[table] else None,
+                )
+            except ValueError as e:
+                return Response({"detail": f"{table}: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        try:
+            with transaction.atomic():
+                for table in load_order:
+                    rows, diag = validated[table]
+                    cols = insertable_columns(schemas[table])
+                    rejected = []
+                    reject = None if strict else lambda row, error: rejected.append((row, error))
+                    try:
+                        spec = specs[table]
+                        inserted = copy_rows(table, rows, cols, spec.load_mode, spec.conflict_key, reject)
+                    except Exception as e:
+                        raise BatchInsertError(table, e)
+                    if rejected:
+                        diag["database_errors"] = rejected_rows_report(rows, row_numbers[table], rejected, cols)
+                    results.append({"table": table, "inserted_rows": inserted, "diagnostics": diag})
+        except BatchInsertError as e:
+            return Response(
+                {"detail": f"Insert failed for table {e.table}: {e.error}. No tables were loaded."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        note_write(self.request)
+        return Response(
+            {
+                "load_order": load_order,
+                "inserted_rows": sum(r["inserted_rows"] for r in results),
+                "tables": results,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class BatchInsertError(Exception):
+    def __init__(self, table, error):
+        super().__init__(f"{table}: {error}")
+        self.table = table
+        self.error = error
@@ -1,13 +1,27 @@
 from ingest.serializers import CSVUploadSerializer
-from ingest.utils.db_schema import get_table_schema
+from ingest.utils.db_schema import insertable_columns
+from ingest.utils.db_insert import rejected_rows_report
 from ingest.utils.csv_validator import validate_csv
-from ingest.utils.db_insert import bulk_copy_into
-from ingest.utils.constants import ALLOWED_TABLES
+from ingest.utils.csv_source import detect_format, known_line_count
+from ingest.utils.partitions import copy_rows
+from ingest.utils.progress import UploadProgress, stream_progress
+from ingest.utils.replicas import note_write
+from ingest.utils.references import ReferenceChecker, get_references
+from ingest.utils.delta import plan_delta, record_hashes
+from ingest.utils.ledger import file_checksum, find_upload, lock_upload, record_upload
+from ingest.utils.admission import admission, AdmissionRejected
+from ingest.utils.dry_run import profile_csv
+from ingest.utils.schema_inference import infer_schema, create_table
+from ingest.utils.table_registry import registry
+from ingest.utils.constants import LOAD_APPEND, LOAD_UPSERT
 
+from django.conf import settings
+from django.db import transaction, DatabaseError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
+from array import array
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,41 +34,264 @@ class UploadCSVView(APIView):
         table = serializer.validated_data["table_name"]
         strict = serializer.validated_data["strict"]
         file_obj = serializer.validated_data["file"]
+        dry_run = serializer.validated_data["dry_run"]
+        sample = serializer.validated_data.get("sample")
+        infer = serializer.validated_data["infer_schema"]
+        delta = serializer.validated_data["delta"]
+        force = serializer.validated_data["force"]
+        check_references = serializer.validated_data["check_references"]
+        progress = None
+        if serializer.validated_data["stream"]:
+            progress = UploadProgress(file_obj.size, known_line_count(file_obj))
 
-        if ALLOWED_TABLES is not None and table not in ALLOWED_TABLES:
-            return Response({"detail": "Table not allowed"}, status=status.HTTP_403_FORBIDDEN)
+        def respond(run):
+            # stream=true: the upload runs in a thread while progress events are sent back
+            if progress is None:
+                return run()
+            return stream_progress(run, progress, settings.CSV_INGEST_PROGRESS_INTERVAL)
 
         try:
-            schema = get_table_schema(table)
+            fmt = detect_format(
+                file_obj,
+                encoding=serializer.validated_data.get("encoding"),
+                delimiter=serializer.validated_data.get("delimiter"),
+                quotechar=serializer.validated_data.get("quotechar"),
+            )
         except ValueError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        if infer and not settings.CSV_INGEST_INFER_SCHEMA:
+            return Response({"detail": "Schema inference is disabled"}, status=status.HTTP_403_FORBIDDEN)
+
+        if not infer and not registry.is_allowed(table):
+            return Response({"detail": "Table not allowed"}, status=status.HTTP_403_FORBIDDEN)
+
         try:
-            rows, diag = validate_csv(file_obj, schema, strict=strict)
+            schema = registry.schema(table)
         except ValueError as e:
-            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            if not infer:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            def load_new():
+                return self.load_new_table(table, file_obj, fmt, strict, dry_run, progress)
+
+            if dry_run:
+                return respond(load_new)
+            return respond(lambda: self.admitted({table: 1}, file_obj.size, lambda: self.once(table, file_obj, force, load_new)))
+
+        spec = registry.get(table)
+        if spec is None:
+            # infer_schema may create new tables, not open up existing ones
+            return Response({"detail": "Table not allowed"}, status=status.HTTP_403_FORBIDDEN)
+
+        if spec.max_upload_bytes is not None and file_obj.size > spec.max_upload_bytes:
+            return Response(
+                {"detail": f"File exceeds the {spec.max_upload_bytes} byte limit for table {table}"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        load_mode = serializer.validated_data.get("load_mode") or spec.load_mode
+        if load_mode == LOAD_UPSERT and not spec.conflict_key:
+            return Response(
+                {"detail": f"Table {table} has no conflict key configured for upsert"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        references = ()
+        if not (dry_run and sample):
+            try:
+                references = self.table_references(table, schema, spec, check_references)
+            except ValueError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if dry_run and sample:
+            try:
+                diag = profile_csv(
+                    file_obj, schema, table, sample, fmt=fmt, json_schemas=spec.json_schemas, transform=spec.transform
+                )
+            except ValueError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({"table": table, "dry_run": True, "diagnostics": diag})
+
+        def load():
+            return self.load(
+                table, schema, file_obj, fmt, strict, dry_run, load_mode, spec.conflict_key, delta,
+                spec.json_schemas, spec.transform, references, progress,
+            )
+
+        if dry_run:
+            return respond(load)
+        return respond(
+            lambda: self.admitted({table: spec.parallelism}, file_obj.size, lambda: self.once(table, file_obj, force, load))
+        )
+
+    @staticmethod
+    def table_references(table, schema, spec, foreign_keys):
+        """
+        References an upload into `table` is checked against: the registry lookups, plus the
+        table's foreign keys when `foreign_keys`. Raises ValueError for a bad lookup.
+        """
+        if not (foreign_keys or spec.lookups):
+            return ()
+        return get_references(table, schema, foreign_keys=foreign_keys, lookups=spec.lookups)
+
+    @staticmethod
+    def admitted(table_limits, size, load):
+        """
+        Runs `load` once the admission controller has room for it, or answers 429.
+        """
+        try:
+            with admission.admit(table_limits, size):
+                return load()
+        except AdmissionRejected as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(e.retry_after)},
+            )
 
-        ordered_cols = [c["column"] for c in schema]
-        # Drop columns not present in CSV (they’d be missing/None); we validated requireds above
-        # Ensure insert order aligns with DB schema order
-        insertable_cols = []
-        for col in schema:
-            colname = col["column"]
-            default = col["default"]
-            if default and ("nextval(" in default or "now()" in default):
-                continue
-            insertable_cols.append(colname)
+    def once(self, table, file_obj, force, load):
+        """
+        Loads the file unless this exact file was already loaded into `table`, in which case
+        the original result is returned (200) without reading the file again. force=true loads
+        anyway. `load` validates without holding anything and returns either a final Response
+        or the step that COPYs; only that step runs in the transaction that takes the upload's
+        lock, checks the ledger again for a concurrent twin and records the entry, so the
+        entry commits together with the rows. After a load the client reads its tables from
+        the primary for a while (see note_write).
+        """
+        checksum = file_checksum(file_obj)
+        previous = None if force else find_upload(table, checksum)
+        if previous is None:
+            write = load()
+            if isinstance(write, Response):
+                return write
+            with transaction.atomic():
+                lock_upload(table, checksum)
+                previous = None if force else find_upload(table, checksum)
+                if previous is None:
+                    resp = write()
+                    if resp.status_code == status.HTTP_201_CREATED:
+                        record_upload(table, checksum, file_obj.size, resp.data)
+                        resp.data["checksum"] = checksum
+
+        if previous is not None:
+            logger.info("Skipping repeated upload of %s into %s", checksum, table)
+            return Response(
+                {
+                    **previous.response,
+                    "duplicate_upload": {"checksum": checksum, "first_loaded_at": previous.created_at},
+                },
+                status=status.HTTP_200_OK,
+            )
+        if resp.status_code == status.HTTP_201_CREATED:
+            note_write(self.request)
+        return resp
+
+    def load(self, table, schema, file_obj, fmt, strict, dry_run, load_mode=LOAD_APPEND, conflict_key=(),
+             delta=False, json_schemas=None, transform=None, references=(), progress=None):
+        """
+        Validates the file. Returns the Response of a dry run or of a failed validation,
+        otherwise a function that COPYs the validated rows and returns the 201 Response.
+        """
+        if progress is not None:
+            progress.phase = "validating"
+        # Non-strict loads keep going past rows the database refuses and report them by row number
+        row_numbers = None if strict else array("Q")
         try:
-            inserted = bulk_copy_into(table, rows, insertable_cols)
-        except Exception as e:
-            return Response({"detail": f"Insert failed: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+            # a dry run reports its errors but keeps no quarantine file to download
+            rows, diag = validate_csv(
+                file_obj, schema, strict=strict, quarantine=not dry_run, fmt=fmt,
+                json_schemas=json_schemas, transform=transform,
+                references=ReferenceChecker(references) if references else None, row_numbers=row_numbers,
+                progress=progress,
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Ensure insert order aligns with DB schema order; defaulted columns are left to Postgres
+        insertable_cols = insertable_columns(schema)
 
-        return Response(
-            {
+        if dry_run:
+            body = {"table": table, "dry_run": True, "diagnostics": diag}
+            if delta:
+                body["delta"] = plan_delta(table, rows, insertable_cols, conflict_key)[2]
+            return Response(body)
+
+        def write():
+            to_copy, mode = rows, load_mode
+            delta_stats = None
+            rejected = []
+            reject = None if strict else lambda row, error: rejected.append((row, error))
+            if progress is not None:
+                progress.phase = "copying"
+            try:
+                # In delta mode the hash index is updated in the same transaction as the COPY
+                with transaction.atomic():
+                    if delta:
+                        to_copy, hashes, delta_stats = plan_delta(table, rows, insertable_cols, conflict_key)
+                        if conflict_key:
+                            # changed rows replace the stored version of their key
+                            mode = LOAD_UPSERT
+                    inserted = copy_rows(table, to_copy, insertable_cols, mode, conflict_key, reject, progress)
+                    if delta:
+                        if rejected:
+                            refused = {id(row) for row, _ in rejected}
+                            hashes = [h for row, h in zip(to_copy, hashes) if id(row) not in refused]
+                        record_hashes(table, hashes)
+            except Exception as e:
+                return Response({"detail": f"Insert failed: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+            if rejected:
+                diag["database_errors"] = rejected_rows_report(rows, row_numbers, rejected, insertable_cols)
+
+            body = {
                 "table": table,
                 "inserted_rows": inserted,
                 "diagnostics": diag,
-            },
-            status=status.HTTP_201_CREATED,
-        )
+            }
+            if delta_stats is not None:
+                body["delta"] = delta_stats
+            return Response(body, status=status.HTTP_201_CREATED)
+
+        return write
+
+    def load_new_table(self, table, file_obj, fmt, strict, dry_run, progress=None):
+        """
+        infer_schema path for a table that does not exist yet: infer column types from a
+        sample and validate the file against them, then create the table and load it through
+        the normal COPY path. The DDL shares the load's transaction, so a failed load leaves
+        no empty table behind.
+        """
+        try:
+            inferred = infer_schema(file_obj, settings.CSV_INGEST_INFER_SAMPLE_ROWS, fmt=fmt)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        columns = [{"column": c["column"], "data_type": c["data_type"]} for c in inferred]
+
+        load = self.load(table, inferred, file_obj, fmt, strict, dry_run, progress=progress)
+        if isinstance(load, Response):
+            if dry_run and load.status_code < 400:
+                load.data["inferred_schema"] = columns
+            return load
+
+        def write():
+            with transaction.atomic():
+                try:
+                    # its own savepoint: the load's transaction stays usable after a failed CREATE
+                    with transaction.atomic():
+                        create_table(table, inferred)
+                except (ValueError, DatabaseError) as e:
+                    return Response({"detail": f"Could not create table: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+                resp = load()
+                if resp.status_code >= 400:
+                    transaction.set_rollback(True)
+                    return resp
+
+                registry.register(table)
+
+            logger.info("Created table %s from inferred schema %s", table, columns)
+            resp.data["created_table"] = True
+            resp.data["inferred_schema"] = columns
+            return resp
 
+        return write